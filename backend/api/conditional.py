@@ -0,0 +1,36 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def conditional_response(request, version, render):
+    """
+    GET conditionnel : si la requête porte l'ETag (If-None-Match) ou la date (If-Modified-Since)
+    de `version`, répond 304 sans appeler `render` ; sinon appelle `render()` et pose les en-têtes.
+    `version` : selector.versions.Version, ou None si la ressource n'existe pas (render gère le 404).
+    """
+    if version is None:
+        return render()
+
+    etag, last_modified = quote_etag(version.etag), int(version.last_modified.timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    response = not_modified or render()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Le client garde sa copie mais revalide à chaque ouverture
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Mixin de ViewSet : retrieve() répond 304 sans charger ni sérialiser l'objet quand le client
+    a déjà la version courante. `version_selector(pk)` renvoie la Version de l'objet.
+    """
+    version_selector = None
+
+    def retrieve(self, request, *args, **kwargs):
+        version = type(self).version_selector(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return conditional_response(request, version, lambda: super(ConditionalRetrieveMixin, self).retrieve(
+            request, *args, **kwargs
+        ))
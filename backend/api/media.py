@@ -0,0 +1,129 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class _FileRange:
+    """Lecteur limité à `length` octets à partir de `start` : FileResponse le diffuse par blocs."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file, self.remaining = file, length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (début, fin incluse) de l'en-tête Range `bytes=a-b`, `bytes=a-` ou `bytes=-n`.
+    None si l'en-tête est absent, malformé ou multiple (le fichier entier est alors servi),
+    ValueError si la plage est hors du fichier (416).
+    """
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def _sendfile(name, path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_SENDFILE_PREFIX.rstrip('/') + '/' + name
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def media_name(prefix, path):
+    """
+    Nom de stockage de `path` (déjà décodé depuis l'URL) sous le répertoire `prefix`.
+    Http404 si le chemin en sort (`..`, y compris encodé %2e%2e ou %2F) : le stockage peut
+    avoir pour racine tout le répertoire de l'application (MEDIA_ROOT = '').
+    """
+    name = posixpath.normpath(f'{prefix}{path}')
+    if not name.startswith(prefix) or '..' in name.split('/'):
+        raise Http404
+    return name
+
+
+def serve_file(request, storage, name, immutable=False):
+    """
+    Sert le fichier `name` de `storage` (FileSystemStorage) sans le charger en mémoire :
+    GET conditionnel (ETag, Last-Modified), requêtes Range, et délégation au serveur web
+    (X-Accel-Redirect / X-Sendfile) si MEDIA_SENDFILE est configuré. Les fichiers `immutable`
+    (noms adressés par le contenu) sont mis en cache un an par le navigateur.
+    """
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None and settings.MEDIA_SENDFILE:
+        # Le serveur web gère lui-même Range et l'envoi sans copie (sendfile)
+        response = _sendfile(name, path, content_type)
+    elif response is None:
+        response = _range_response(request, path, stat.st_size, content_type, etag, last_modified)
+
+    response['Accept-Ranges'] = 'bytes'
+    if response.status_code in (200, 206, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if immutable:
+            patch_cache_control(response, private=True, max_age=settings.MEDIA_IMMUTABLE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _range_response(request, path, size, content_type, etag, last_modified):
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (etag, http_date(last_modified)):
+        header = None
+    try:
+        byte_range = parse_range(header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        # Fichier entier : le serveur WSGI peut utiliser wsgi.file_wrapper (sendfile)
+        return FileResponse(file, content_type=content_type)
+
+    start, end = byte_range
+    response = FileResponse(_FileRange(file, start, end - start + 1), status=206, content_type=content_type)
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,137 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from utils.models.functions import Row
+
+
+def estimate_count(queryset):
+    """
+    Nombre de lignes estimé par Postgres, sans COUNT(*) :
+    pg_class.reltuples pour une table non filtrée, sinon l'estimation du plan (EXPLAIN).
+    """
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 : table jamais analysée
+        if row and row[0] >= 0:
+            return row[0]
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return plan[0]['Plan']['Plan Rows']
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Pagination par clé (created, id) décroissante, activée par la présence du paramètre `cursor`
+    (vide pour la première page) ; sans lui, pagination limit/offset habituelle.
+
+    Chaque page est une seule requête `WHERE (created, id) < (...)` servie par l'index composite,
+    quelle que soit sa profondeur. Le curseur est opaque (base64) ; `count` est une estimation
+    (voir estimate_count) ou absent si `estimated_count` vaut False.
+    En mode curseur, l'ordre est toujours celui de la clé (le classement de la recherche est ignoré).
+    """
+    cursor_query_param = 'cursor'
+    keyset_fields = ('created', 'id')
+    estimated_count = True
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        position, reverse = self.decode_cursor(request, queryset.model)
+        self.count = estimate_count(queryset) if self.estimated_count else None
+
+        direction = '' if reverse else '-'
+        page = queryset.order_by(*(f'{direction}{field}' for field in self.keyset_fields))
+        if position is not None:
+            lookup = '_keyset__gt' if reverse else '_keyset__lt'
+            page = page.alias(_keyset=Row(*self.keyset_fields)).filter(
+                **{lookup: Row(*(Value(value) for value in position))}
+            )
+
+        rows = list(page[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        response = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        return [*super().get_schema_operation_parameters(view), {
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Keyset pagination cursor (empty for the first page).',
+            'schema': {'type': 'string'},
+        }]
+
+    def cursor_for(self, instance, reverse=False):
+        """Curseur opaque positionné sur `instance` (page suivante, ou précédente si `reverse`)."""
+        position = [
+            instance._meta.get_field(field).value_to_string(instance) for field in self.keyset_fields
+        ]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def encode_cursor(self, instance, reverse):
+        url = replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.cursor_for(instance, reverse)
+        )
+        return replace_query_param(url, self.limit_query_param, self.limit)
+
+    def decode_cursor(self, request, model):
+        """Retourne (position, reverse) ; position vaut None pour la première page."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.keyset_fields, payload['p'], strict=True)
+            ]
+            return position, bool(payload['r'])
+        except (BinasciiError, ValidationError, ValueError, TypeError, KeyError):
+            raise NotFound('Invalid cursor')
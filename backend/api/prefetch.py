@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+@dataclass(frozen=True)
+class PrefetchPlan:
+    """
+    Arbre de chargement déduit d'un serializer :
+    - select_related : relations mono-valuées (FK/O2O) jointes dans la requête principale
+    - prefetch : relations multi-valuées (reverse FK/M2M), chacune avec son propre sous-plan
+    """
+    model: type
+    select_related: tuple = ()
+    prefetch: tuple = field(default=())  # ((lookup, PrefetchPlan), ...)
+
+    def queryset(self, queryset=None):
+        queryset = self.model._default_manager.all() if queryset is None else queryset
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetches())
+        return queryset
+
+    def prefetches(self):
+        # Des Prefetch neufs à chaque appel : les querysets ne sont pas partagés entre requêtes
+        return [Prefetch(lookup, queryset=plan.queryset()) for lookup, plan in self.prefetch]
+
+
+def _relation(model, source):
+    """Retourne le champ de relation du modèle correspondant à `source` (nom ou accessor inverse)."""
+    for rel in model._meta.related_objects:
+        if rel.get_accessor_name() == source:
+            return rel
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+def _build_plan(serializer, model) -> PrefetchPlan:
+    select_related = list(getattr(getattr(serializer, 'Meta', None), 'select_related', ()))
+    prefetch = [
+        (lookup, PrefetchPlan(model=_relation(model, lookup).related_model))
+        for lookup in getattr(getattr(serializer, 'Meta', None), 'prefetch_related', ())
+    ]
+
+    for serializer_field in serializer.fields.values():
+        source = serializer_field.source
+        if serializer_field.write_only or source == '*' or '.' in source:
+            continue
+        relation = _relation(model, source)
+        if relation is None or not relation.is_relation:
+            continue
+        related_model = relation.related_model
+
+        if isinstance(serializer_field, serializers.ListSerializer):
+            child = serializer_field.child
+            plan = _build_plan(child, related_model) if isinstance(child, serializers.BaseSerializer) else PrefetchPlan(related_model)
+            prefetch.append((source, plan))
+        elif isinstance(serializer_field, serializers.ManyRelatedField):
+            prefetch.append((source, PrefetchPlan(related_model)))
+        elif isinstance(serializer_field, serializers.BaseSerializer):
+            if relation.many_to_many or relation.one_to_many:
+                prefetch.append((source, _build_plan(serializer_field, related_model)))
+                continue
+            # FK/O2O (directe ou inverse) : on joint et on remonte les sous-relations avec le préfixe
+            child_plan = _build_plan(serializer_field, related_model)
+            select_related.append(source)
+            select_related.extend(f'{source}__{path}' for path in child_plan.select_related)
+            prefetch.extend((f'{source}__{lookup}', plan) for lookup, plan in child_plan.prefetch)
+
+    return PrefetchPlan(model=model, select_related=tuple(select_related), prefetch=tuple(prefetch))
+
+
+@lru_cache(maxsize=None)
+def prefetch_plan(serializer_class) -> PrefetchPlan:
+    """Plan de chargement (mis en cache) pour un serializer de modèle."""
+    return _build_plan(serializer_class(), serializer_class.Meta.model)
+
+
+def prefetch_for_serializer(queryset, serializer_class):
+    """Applique au queryset les select_related / Prefetch nécessaires au serializer."""
+    return prefetch_plan(serializer_class).queryset(queryset)
+
+
+class PrefetchPlanMixin:
+    """
+    Mixin de ViewSet : get_queryset() charge d'avance tout le graphe lu par le serializer
+    de la vue, ce qui évite les N+1 sur les serializers imbriqués.
+    """
+
+    def get_queryset(self):
+        return prefetch_for_serializer(super().get_queryset(), self.get_serializer_class())
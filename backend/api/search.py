@@ -0,0 +1,56 @@
+from functools import reduce
+from operator import add, or_
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Greatest, Lower, Upper
+from django.db.models.lookups import Contains, StartsWith
+from rest_framework import filters
+
+from utils.models.functions import ImmutableUnaccent
+
+
+def _normalized(value):
+    # Même expression que les index trigram (apps.patients.models.trigram_index)
+    return ImmutableUnaccent(Lower(value))
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    Remplaçant de SearchFilter pour Postgres, servi par les index pg_trgm / text_pattern_ops.
+
+    `search_fields` garde la syntaxe DRF :
+    - 'champ'  : recherche floue sans accents ni casse (LIKE '%terme%' ou similarité de mot pg_trgm)
+    - '^champ' : recherche par préfixe insensible à la casse (numéros de permis, immatriculations)
+
+    Chaque terme doit correspondre à au moins un champ ; les résultats sont triés par pertinence
+    (annotation `search_rank`) puis selon l'ordre d'origine du queryset.
+    """
+    rank_annotation = 'search_rank'
+
+    def term_conditions(self, search_field, term):
+        """Retourne (condition, score) d'un terme sur un champ."""
+        if search_field.startswith('^'):
+            match = StartsWith(Upper(search_field[1:]), term.upper())
+            return match, Case(When(match, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+
+        field, value = _normalized(search_field), _normalized(Value(term))
+        match = Contains(field, value) | TrigramWordSimilar(field, value)
+        return match, TrigramWordSimilarity(value, field)
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        ranks = []
+        for term in search_terms:
+            conditions, scores = zip(*(self.term_conditions(field, term) for field in search_fields))
+            queryset = queryset.filter(reduce(or_, conditions))
+            ranks.append(Greatest(*scores) if len(scores) > 1 else scores[0])
+
+        return queryset.annotate(**{self.rank_annotation: reduce(add, ranks)}).order_by(
+            f'-{self.rank_annotation}', *queryset.query.order_by
+        )
@@ -0,0 +1,56 @@
+from functools import wraps
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def atomic_request(method):
+    """Méthode de vue GET qui écrit : garde la transaction de requête (ATOMIC_REQUESTS)."""
+    method.atomic_request = True
+    return method
+
+
+def _view_method(callback, request):
+    # Vues DRF : as_view() expose la classe et, pour les ViewSets, l'action de chaque méthode HTTP
+    view_class = getattr(callback, 'cls', None)
+    if view_class is None:
+        return None
+    name = request.method.lower()
+    name = (getattr(callback, 'actions', None) or {}).get(name, name)
+    return getattr(view_class, name, None)
+
+
+def is_read_only(callback, request):
+    if request.method not in SAFE_METHODS:
+        return False
+    return not getattr(_view_method(callback, request), 'atomic_request', False)
+
+
+def non_atomic_view(callback):
+    """Copie de `callback` exclue d'ATOMIC_REQUESTS sur toutes les bases, sans modifier la vue partagée."""
+    @wraps(callback)
+    def view(*args, **kwargs):
+        return callback(*args, **kwargs)
+    view._non_atomic_requests = set(connections)
+    return view
+
+
+class ReadOnlyRequestsMixin:
+    """
+    Handler : les requêtes GET/HEAD/OPTIONS ne sont pas enveloppées dans la transaction
+    d'ATOMIC_REQUESTS (pas de BEGIN/COMMIT, connexion rendue au pool plus tôt).
+    Les méthodes décorées par atomic_request la gardent.
+    """
+
+    def resolve_request(self, request):
+        resolver_match = super().resolve_request(request)
+        if is_read_only(resolver_match.func, request):
+            # ResolverMatch propre à la requête : la vue résolue peut être remplacée sans effet de bord
+            resolver_match.func = non_atomic_view(resolver_match.func)
+        return resolver_match
+
+
+class ReadOnlyRequestsWSGIHandler(ReadOnlyRequestsMixin, WSGIHandler):
+    pass
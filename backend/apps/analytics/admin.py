@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DashboardStat, ExamFact
+
+
+@admin.register(DashboardStat)
+class DashboardStatAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_stale', 'refreshed_at')
+    list_filter = ('is_stale',)
+    readonly_fields = ('data', 'refreshed_at', 'created', 'modified')
+
+
+@admin.register(ExamFact)
+class ExamFactAdmin(admin.ModelAdmin):
+    list_display = ('patient', 'visite', 'type_permis', 'tonus_od', 'tonus_og', 'vision', 'modified')
+    list_filter = ('visite', 'type_permis', 'transporteur_professionnel', 'vision')
+    raw_id_fields = ('examen', 'patient')
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'analytics'
+    name = 'apps.analytics'
+
+    def ready(self):
+        from apps.analytics import signals  # noqa
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from statistics import quantiles
+from threading import local
+from time import perf_counter
+
+import requests
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+DEFAULT_PATHS = ['/analytics/employee/', '/patients/?limit=20', '/health-records/?limit=20']
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests a running server and reports latency percentiles and Postgres connection churn. '
+        'Run it once per configuration (e.g. DATABASE_POOL=False DATABASE_CONN_MAX_AGE=0, then DATABASE_POOL=True) '
+        'to compare them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test')
+        parser.add_argument('-p', '--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('-t', '--token', help='JWT access token sent as Authorization: Bearer')
+        parser.add_argument('-n', '--requests', type=int, default=2000, help='Total number of requests')
+        parser.add_argument('-c', '--concurrency', type=int, default=20, help='Concurrent clients')
+
+    def _sessions(self):
+        # Nombre de sessions ouvertes sur la base depuis le démarrage de Postgres (PostgreSQL 14+)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT sessions FROM pg_stat_database WHERE datname = current_database()')
+            return cursor.fetchone()[0]
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        urls = [options['url'].rstrip('/') + path for path in options['paths'] or DEFAULT_PATHS]
+        clients = local()
+
+        def fetch(url):
+            # Une session HTTP par thread client : keep-alive, seul le coût serveur est mesuré
+            if not hasattr(clients, 'session'):
+                clients.session = requests.Session()
+            start = perf_counter()
+            response = clients.session.get(url, headers=headers, timeout=30)
+            return perf_counter() - start, response.status_code
+
+        sessions_before = self._sessions()
+        start = perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(fetch, islice(cycle(urls), options['requests'])))
+        elapsed = perf_counter() - start
+        new_sessions = self._sessions() - sessions_before
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(1 for _, status in results if status >= 400)
+        cuts = quantiles(latencies, n=100)
+        self.stdout.write(f'{len(results)} requests in {elapsed:.1f} s ({len(results) / elapsed:.0f} req/s), {errors} error(s)')
+        self.stdout.write(f'latency p50 {cuts[49]:.1f} ms  p95 {cuts[94]:.1f} ms  p99 {cuts[98]:.1f} ms  max {latencies[-1]:.1f} ms')
+        self.stdout.write(f'new Postgres sessions: {new_sessions} ({new_sessions * 1000 / len(results):.1f} per 1000 requests)')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from services.analytics import dashboard_stats_refresh
+
+
+class Command(BaseCommand):
+    help = 'Recalculates the dashboard statistics snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-s',
+            '--section',
+            action='append',
+            dest='sections',
+            help='Section to refresh (repeatable, all sections by default)',
+        )
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only refresh sections marked as stale or expired',
+        )
+
+    def handle(self, *args, **options):
+        stats = dashboard_stats_refresh(sections=options['sections'], force=not options['stale_only'])
+        self.stdout.write(self.style.SUCCESS(f'{len(stats)} section(s) up to date'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from services.analytics import EXAM_FACT_CHUNK_SIZE, exam_facts_refresh
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized exam fact table (one row per visit)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-p',
+            '--patient',
+            action='append',
+            type=int,
+            dest='patients',
+            help='Only refresh the visits of this patient id (repeatable)',
+        )
+        parser.add_argument(
+            '-c',
+            '--chunk-size',
+            type=int,
+            default=EXAM_FACT_CHUNK_SIZE,
+            help=f'Rows upserted per statement (default {EXAM_FACT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        lookups = {'patient_id__in': options['patients']} if options['patients'] else {}
+        count = exam_facts_refresh(chunk_size=options['chunk_size'], **lookups)
+        self.stdout.write(self.style.SUCCESS(f'{count} exam fact(s) refreshed'))
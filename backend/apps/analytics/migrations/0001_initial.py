@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 13:12
+
+import django.core.serializers.json
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('name', models.CharField(db_index=True, max_length=50, unique=True, verbose_name='Nom')),
+                ('data', models.JSONField(blank=True, default=None, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Valeur')),
+                ('is_stale', models.BooleanField(default=True, verbose_name='Périmée')),
+                ('refreshed_at', models.DateTimeField(blank=True, default=None, null=True, verbose_name='Dernier calcul')),
+            ],
+            options={
+                'verbose_name': 'Statistique du dashboard',
+                'verbose_name_plural': 'Statistiques du dashboard',
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2 on 2026-10-18 13:21
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Copie figée de selector.analytics.EXAM_FACT_SOURCES au moment de la migration : le schéma
+# historique ne doit pas suivre les changements ultérieurs du mapping
+EXAM_FACT_SOURCES = {
+    'patient_id': 'patient_id',
+    'visite': 'visite',
+    'is_completed': 'is_completed',
+    'sexe': 'patient__sexe',
+    'type_permis': 'patient__type_permis',
+    'transporteur_professionnel': 'patient__transporteur_professionnel',
+    'service': 'patient__service',
+    'avsc_od': 'technical_examen__visual_acuity__avsc_od',
+    'avsc_og': 'technical_examen__visual_acuity__avsc_og',
+    'avac_od': 'technical_examen__visual_acuity__avac_od',
+    'avac_og': 'technical_examen__visual_acuity__avac_og',
+    'correction_optique': 'technical_examen__refraction__correction_optique',
+    'tonus_od': 'technical_examen__ocular_tension__od',
+    'tonus_og': 'technical_examen__ocular_tension__og',
+    'ttt_hypotonisant': 'technical_examen__ocular_tension__ttt_hypotonisant',
+    'pachymetrie_od': 'technical_examen__pachymetry__od',
+    'pachymetrie_og': 'technical_examen__pachymetry__og',
+    'symptome_od': 'clinical_examen__od__plaintes__eye_symptom',
+    'symptome_og': 'clinical_examen__og__plaintes__eye_symptom',
+    'diplopie_od': 'clinical_examen__od__plaintes__diplopie',
+    'diplopie_og': 'clinical_examen__og__plaintes__diplopie',
+    'strabisme_od': 'clinical_examen__od__plaintes__strabisme',
+    'strabisme_og': 'clinical_examen__og__plaintes__strabisme',
+    'nystagmus_od': 'clinical_examen__od__plaintes__nystagmus',
+    'nystagmus_og': 'clinical_examen__og__plaintes__nystagmus',
+    'ptosis_od': 'clinical_examen__od__plaintes__ptosis',
+    'ptosis_og': 'clinical_examen__og__plaintes__ptosis',
+    'perimetrie_binoculaire': 'clinical_examen__perimetry__pbo',
+    'score_esterman': 'clinical_examen__perimetry__score_esternmen',
+    'vision': 'clinical_examen__conclusion__vision',
+    'rv': 'clinical_examen__conclusion__rv',
+}
+
+
+def populate_exam_facts(apps, schema_editor):
+    Examens = apps.get_model('examens', 'Examens')
+    ExamFact = apps.get_model('analytics', 'ExamFact')
+    fields = [name for name, path in EXAM_FACT_SOURCES.items() if name == path]
+    expressions = {name: F(path) for name, path in EXAM_FACT_SOURCES.items() if name != path}
+    rows = Examens.objects.order_by('pk').values('id', *fields, **expressions)
+    ExamFact.objects.bulk_create(
+        (ExamFact(examen_id=row.pop('id'), **row) for row in rows.iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('examens', '0014_alter_biomicroscopysegmentposterieur_macula_and_more'),
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('visite', models.IntegerField(db_index=True, verbose_name='Visite')),
+                ('is_completed', models.BooleanField(default=False, verbose_name='Examen complété')),
+                ('sexe', models.CharField(blank=True, max_length=10, null=True, verbose_name='Sexe')),
+                ('type_permis', models.CharField(blank=True, db_index=True, max_length=10, null=True, verbose_name='Type de permis')),
+                ('transporteur_professionnel', models.BooleanField(null=True, verbose_name='Transporteur professionnel')),
+                ('service', models.CharField(blank=True, max_length=12, null=True, verbose_name='Service')),
+                ('avsc_od', models.DecimalField(decimal_places=3, max_digits=5, null=True, verbose_name='AVSC OD')),
+                ('avsc_og', models.DecimalField(decimal_places=3, max_digits=5, null=True, verbose_name='AVSC OG')),
+                ('avac_od', models.DecimalField(decimal_places=3, max_digits=5, null=True, verbose_name='AVAC OD')),
+                ('avac_og', models.DecimalField(decimal_places=3, max_digits=5, null=True, verbose_name='AVAC OG')),
+                ('correction_optique', models.BooleanField(null=True, verbose_name='Correction optique')),
+                ('tonus_od', models.FloatField(null=True, verbose_name='Tonus OD')),
+                ('tonus_og', models.FloatField(null=True, verbose_name='Tonus OG')),
+                ('ttt_hypotonisant', models.BooleanField(null=True, verbose_name='TTT hypotonisant')),
+                ('pachymetrie_od', models.FloatField(null=True, verbose_name='Pachymétrie OD')),
+                ('pachymetrie_og', models.FloatField(null=True, verbose_name='Pachymétrie OG')),
+                ('symptome_od', models.CharField(blank=True, max_length=30, null=True, verbose_name='Symptôme OD')),
+                ('symptome_og', models.CharField(blank=True, max_length=30, null=True, verbose_name='Symptôme OG')),
+                ('diplopie_od', models.BooleanField(null=True, verbose_name='Diplopie OD')),
+                ('diplopie_og', models.BooleanField(null=True, verbose_name='Diplopie OG')),
+                ('strabisme_od', models.BooleanField(null=True, verbose_name='Strabisme OD')),
+                ('strabisme_og', models.BooleanField(null=True, verbose_name='Strabisme OG')),
+                ('nystagmus_od', models.BooleanField(null=True, verbose_name='Nystagmus OD')),
+                ('nystagmus_og', models.BooleanField(null=True, verbose_name='Nystagmus OG')),
+                ('ptosis_od', models.BooleanField(null=True, verbose_name='Ptosis OD')),
+                ('ptosis_og', models.BooleanField(null=True, verbose_name='Ptosis OG')),
+                ('perimetrie_binoculaire', models.CharField(blank=True, max_length=30, null=True, verbose_name='PBO')),
+                ('score_esterman', models.FloatField(null=True, verbose_name='Score d’Esterman')),
+                ('vision', models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name='Conclusion sur la conduite')),
+                ('rv', models.BooleanField(null=True, verbose_name='RV')),
+                ('examen', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fact', to='examens.examens')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_facts', to='patients.conducteur')),
+            ],
+            options={
+                'verbose_name': "Fait d'examen",
+                'verbose_name_plural': "Faits d'examens",
+                'constraints': [models.UniqueConstraint(fields=('patient', 'visite'), name='unique_exam_fact_patient_visite')],
+            },
+        ),
+        migrations.RunPython(populate_exam_facts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
+
+
+class DashboardStat(TimeStampedModel):
+    """
+    Section pré-calculée du dashboard (une ligne par indicateur).
+    Les écritures sur les modèles sources marquent la section comme périmée,
+    elle est recalculée à la prochaine lecture.
+    """
+    name = models.CharField(_('Nom'), max_length=50, unique=True, db_index=True)
+    data = models.JSONField(_('Valeur'), encoder=DjangoJSONEncoder, null=True, blank=True, default=None)
+    is_stale = models.BooleanField(_('Périmée'), default=True)
+    refreshed_at = models.DateTimeField(_('Dernier calcul'), null=True, blank=True, default=None)
+
+    class Meta:
+        verbose_name = _('Statistique du dashboard')
+        verbose_name_plural = _('Statistiques du dashboard')
+
+    def __str__(self):
+        return self.name
+
+
+class ExamFact(TimeStampedModel):
+    """
+    Table de faits dénormalisée : une ligne par visite (patient, visite) avec les mesures et
+    constats principaux des deux yeux, pour interroger les examens sans joindre les sous-modèles.
+    Maintenue par les services d'écriture des examens (services.analytics.exam_facts_refresh).
+    """
+    examen = models.OneToOneField('examens.Examens', on_delete=models.CASCADE, related_name='fact')
+    patient = models.ForeignKey('patients.Conducteur', on_delete=models.CASCADE, related_name='exam_facts')
+    visite = models.IntegerField(_('Visite'), db_index=True)
+    is_completed = models.BooleanField(_('Examen complété'), default=False)
+
+    # Conducteur
+    sexe = models.CharField(_('Sexe'), max_length=10, null=True, blank=True)
+    type_permis = models.CharField(_('Type de permis'), max_length=10, null=True, blank=True, db_index=True)
+    transporteur_professionnel = models.BooleanField(_('Transporteur professionnel'), null=True)
+    service = models.CharField(_('Service'), max_length=12, null=True, blank=True)
+
+    # Examen technique
+    avsc_od = models.DecimalField(_('AVSC OD'), max_digits=5, decimal_places=3, null=True)
+    avsc_og = models.DecimalField(_('AVSC OG'), max_digits=5, decimal_places=3, null=True)
+    avac_od = models.DecimalField(_('AVAC OD'), max_digits=5, decimal_places=3, null=True)
+    avac_og = models.DecimalField(_('AVAC OG'), max_digits=5, decimal_places=3, null=True)
+    correction_optique = models.BooleanField(_('Correction optique'), null=True)
+    tonus_od = models.FloatField(_('Tonus OD'), null=True)
+    tonus_og = models.FloatField(_('Tonus OG'), null=True)
+    ttt_hypotonisant = models.BooleanField(_('TTT hypotonisant'), null=True)
+    pachymetrie_od = models.FloatField(_('Pachymétrie OD'), null=True)
+    pachymetrie_og = models.FloatField(_('Pachymétrie OG'), null=True)
+
+    # Examen clinique (plaintes par œil)
+    symptome_od = models.CharField(_('Symptôme OD'), max_length=30, null=True, blank=True)
+    symptome_og = models.CharField(_('Symptôme OG'), max_length=30, null=True, blank=True)
+    diplopie_od = models.BooleanField(_('Diplopie OD'), null=True)
+    diplopie_og = models.BooleanField(_('Diplopie OG'), null=True)
+    strabisme_od = models.BooleanField(_('Strabisme OD'), null=True)
+    strabisme_og = models.BooleanField(_('Strabisme OG'), null=True)
+    nystagmus_od = models.BooleanField(_('Nystagmus OD'), null=True)
+    nystagmus_og = models.BooleanField(_('Nystagmus OG'), null=True)
+    ptosis_od = models.BooleanField(_('Ptosis OD'), null=True)
+    ptosis_og = models.BooleanField(_('Ptosis OG'), null=True)
+
+    # Périmétrie et conclusion
+    perimetrie_binoculaire = models.CharField(_('PBO'), max_length=30, null=True, blank=True)
+    score_esterman = models.FloatField(_('Score d’Esterman'), null=True)
+    vision = models.CharField(_('Conclusion sur la conduite'), max_length=50, null=True, blank=True, db_index=True)
+    rv = models.BooleanField(_('RV'), null=True)
+
+    class Meta:
+        verbose_name = _('Fait d\'examen')
+        verbose_name_plural = _('Faits d\'examens')
+        constraints = [
+            models.UniqueConstraint(fields=['patient', 'visite'], name='unique_exam_fact_patient_visite'),
+        ]
+
+    def __str__(self):
+        return f'Fait d\'examen {self.patient_id} - Visite {self.visite}'
@@ -0,0 +1,20 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from selector.analytics import DashboardStatsSelector
+from services.analytics import dashboard_stats_invalidate
+
+
+def _invalidate_dashboard_stats(sender, sections, **kwargs):
+    # Après le commit : pas de verrou sur les lignes du snapshot pendant la requête d'écriture
+    transaction.on_commit(partial(dashboard_stats_invalidate, sections))
+
+
+for model_label, sections in DashboardStatsSelector.EMPLOYEE_SECTION_DEPENDENCIES.items():
+    model = apps.get_model(model_label)
+    receiver = partial(_invalidate_dashboard_stats, sections=sections)
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'dashboard_stats_save_{model_label}')
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'dashboard_stats_delete_{model_label}')
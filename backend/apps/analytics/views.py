@@ -1,32 +1,29 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
 
-from selector.analytics import DashboardStatsSelector
-from selector.users import (
-    get_user_kpis,
-    get_user_roles_distribution,
-    get_users_created_per_month,
-)
+from selector.users import get_admin_dashboard_stats
 from serializers.analytics import DashboardStatsSerializer
+from services.analytics import dashboard_stats_get
 
 class DashboardStatsView(APIView):
 
     @extend_schema(
         summary="Statistiques générales du dashboard médical",
+        parameters=[
+            OpenApiParameter(name='refresh', type=bool, required=False,
+                             description="Force le recalcul complet du snapshot"),
+        ],
         responses={200: DashboardStatsSerializer}
     )
     def get(self, request):
-        data = DashboardStatsSelector.employee_stats()
+        refresh = request.query_params.get('refresh', '').lower() in ('1', 'true')
+        data = dashboard_stats_get(refresh=refresh)
         return Response(data)
 
 @api_view(["GET"])
 @permission_classes([permissions.IsAdminUser])
 def admin_dashboard_data(request):
-    return Response({
-        "kpis": get_user_kpis(),
-        "roles_distribution": get_user_roles_distribution(),
-        "users_created_per_month": get_users_created_per_month(),
-    })
\ No newline at end of file
+    return Response(get_admin_dashboard_stats())
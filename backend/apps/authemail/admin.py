@@ -4,7 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
 from .forms import EmailUserCreationForm, EmailUserChangeForm
-from .models import SignupCode, PasswordResetCode, EmailChangeCode
+from .models import SignupCode, PasswordResetCode, EmailChangeCode, OutgoingEmail
 from ..users.models import Profile
 
 
@@ -77,6 +77,17 @@ class EmailChangeCodeInline(admin.TabularInline):
         return False
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    ordering = ('-created',)
+    readonly_fields = ('subject', 'body', 'html', 'from_email', 'to', 'bcc', 'attempts', 'last_error', 'sent_at')
+    list_per_page = 15
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class ProfileInline(admin.StackedInline):
     model = Profile
 
@@ -118,3 +129,4 @@ admin.site.register(get_user_model(), EmailUserAdmin)
 admin.site.register(SignupCode, SignupCodeAdmin)
 admin.site.register(PasswordResetCode, PasswordResetCodeAdmin)
 admin.site.register(EmailChangeCode, EmailChangeCodeAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
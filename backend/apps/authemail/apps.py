@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuthemailConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authemail'
+
+    def ready(self):
+        from services.authemail import email_templates_load
+        email_templates_load()
@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from services.authemail import EMAIL_TEMPLATE_PREFIXES, _email_template_files, render_multi_format_emails
+
+
+class Command(BaseCommand):
+    help = 'Measures authemail render throughput: render_to_string per email vs precompiled batch rendering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-n', '--count', type=int, default=10_000, help='Emails rendered per mode')
+        parser.add_argument(
+            '-p', '--prefix', default='password_reset_email', choices=EMAIL_TEMPLATE_PREFIXES, help='Template prefix'
+        )
+
+    def _contexts(self, count):
+        return (
+            {'email': f'conducteur{i}@example.com', 'code': f'{i:06d}', 'first_name': 'Awa', 'last_name': 'Diop',
+             'password': 'x' * 10}
+            for i in range(count)
+        )
+
+    def _render_to_string(self, prefix, contexts):
+        subject_file, txt_file, html_file = _email_template_files(prefix)
+        for ctxt in contexts:
+            render_to_string(subject_file, ctxt)
+            render_to_string(txt_file, ctxt)
+            render_to_string(html_file, ctxt)
+
+    def _batch(self, prefix, contexts):
+        for _ in render_multi_format_emails(prefix, contexts):
+            pass
+
+    def handle(self, *args, **options):
+        count, prefix = options['count'], options['prefix']
+        for label, render in (('render_to_string', self._render_to_string), ('precompiled', self._batch)):
+            start = perf_counter()
+            render(prefix, self._contexts(count))
+            elapsed = perf_counter() - start
+            self.stdout.write(f'{label:<17} {count / elapsed:10.0f} emails/s ({elapsed * 1000:8.1f} ms)')
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.authemail import email_outbox_deliver
+
+
+class Command(BaseCommand):
+    help = 'Sends the queued authentication emails (one SMTP connection per batch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help=f'Emails sent per connection (default {settings.EMAIL_OUTBOX_BATCH_SIZE})',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting')
+        parser.add_argument('-i', '--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def _drain(self, batch_size):
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            result = email_outbox_deliver(batch_size=batch_size)
+            for name, count in result.items():
+                totals[name] += count
+            if sum(result.values()) < batch_size:
+                return totals
+
+    def handle(self, *args, **options):
+        while True:
+            totals = self._drain(options['batch_size'])
+            if any(totals.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    '{sent} sent, {retried} to retry, {failed} failed'.format(**totals)
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -1,5 +1,9 @@
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 
 from apps.authemail.base import AbstractBaseCode
 from services.authemail import send_multi_format_email
@@ -40,3 +44,47 @@ class SignupCode(AbstractBaseCode):
     def send_signup_email(self):
         prefix = 'signup_email'
         self.send_email(prefix)
+
+
+
+class OutgoingEmail(TimeStampedModel):
+    """
+    File d'envoi persistante des emails (voir services.authemail.email_outbox_deliver).
+    Les emails sont envoyés par lots par la commande `send_queued_emails`, hors des requêtes.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    status = models.CharField(_('status'), max_length=10, choices=Status.choices, default=Status.PENDING)
+    subject = models.CharField(_('subject'), max_length=255)
+    body = models.TextField(_('text body'))
+    html = models.TextField(_('html body'), blank=True)
+    from_email = models.CharField(_('from'), max_length=255, blank=True, null=True)
+    to = models.JSONField(_('to'), default=list)
+    bcc = models.JSONField(_('bcc'), default=list, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(_('attempts'), default=0)
+    next_attempt_at = models.DateTimeField(_('next attempt at'), default=timezone.now)
+    last_error = models.TextField(_('last error'), blank=True)
+    sent_at = models.DateTimeField(_('sent at'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Outgoing email')
+        verbose_name_plural = _('Outgoing emails')
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=Q(status='pending'), name='outgoing_email_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
+
+    def message(self, connection=None):
+        message = EmailMultiAlternatives(
+            self.subject, self.body, self.from_email, self.to, bcc=self.bcc, connection=connection
+        )
+        if self.html:
+            message.attach_alternative(self.html, 'text/html')
+        return message
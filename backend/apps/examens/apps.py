@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ClinicalExamenConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.examens'
+
+    def ready(self):
+        from apps.examens import signals  # noqa
@@ -1,33 +1,60 @@
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
 
 from apps.patients.models import Conducteur
 from utils.models.choices import VisiteChoices
+from utils.models.validation import ValidatedSaveMixin
 
 
-class Base(TimeStampedModel):
+# Nom de la contrainte d'unicité (patient, visite) de chaque sous-modèle
+UNIQUE_VISITE_CONSTRAINT = '%(app_label)s_%(class)s_unique_visite'
+
+
+class Base(ValidatedSaveMixin, TimeStampedModel):
     patient = models.ForeignKey(Conducteur, on_delete=models.CASCADE, db_index=True)
     visite = models.IntegerField(choices=VisiteChoices.choices, db_index=True)
 
     class Meta:
         abstract = True
+        # Une seule instance par (patient, visite) pour chaque sous-modèle, garantie par la base
+        constraints = [
+            models.UniqueConstraint(fields=['patient', 'visite'], name=UNIQUE_VISITE_CONSTRAINT),
+        ]
 
-    def clean(self):
-        """
-        Vérifie qu'une seule instance par (patient, visite) existe pour chaque sous-modèle.
-        """
-        model_class = self.__class__
-        if model_class.objects.filter(patient=self.patient, visite=self.visite).exclude(pk=self.pk).exists():
-            raise ValidationError(
-                f"Une instance de {model_class.__name__} pour le patient {self.patient} "
-                f"et la visite {self.get_visite_display()} existe déjà."
-            )
+    def unique_visite_error(self):
+        # Sans requête : après une violation, la transaction en cours n'accepte plus de requêtes
+        patient = self.patient if self._meta.get_field('patient').is_cached(self) else self.patient_id
+        return ValidationError(
+            f"Une instance de {self.__class__.__name__} pour le patient {patient} "
+            f"et la visite {self.get_visite_display()} existe déjà."
+        )
+
+    def _is_unique_visite_violation(self, error):
+        constraint = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+        return constraint == UNIQUE_VISITE_CONSTRAINT % {
+            'app_label': self._meta.app_label.lower(), 'class': self._meta.model_name,
+        }
+
+    def clean_for_save(self):
+        # L'unicité (patient, visite) n'est pas vérifiée par un SELECT préalable : voir save()
+        self.full_clean(validate_constraints=False)
+        self.validate_constraints(exclude={'visite'})
 
     def save(self, *args, **kwargs):
-        self.full_clean()  # Appelle clean() avant de sauvegarder
-        super().save(*args, **kwargs)
+        """
+        Valide (sauf instance déjà passée par validate_for_save) puis enregistre. La contrainte en base
+        garantit l'unicité (patient, visite), y compris entre requêtes concurrentes, et sa violation est
+        traduite en ValidationError. Comme toute IntegrityError, elle annule la transaction en cours :
+        l'appelant qui veut poursuivre enregistre dans un transaction.atomic() (point de sauvegarde).
+        """
+        try:
+            super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if self._is_unique_visite_violation(e):
+                raise self.unique_visite_error() from e
+            raise
 
 
 class OcularMeasurementBase(TimeStampedModel):
@@ -0,0 +1,68 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.examens.models import ClinicalExamen, Examens, TechnicalExamen
+from apps.health_record.models import DriverExperience
+from factories.examens import VisiteExamensFactory
+from factories.health_record import DriverExperienceFactory
+from services.examens import ExamenService
+
+
+class _Rollback(Exception):
+    pass
+
+
+def delete_par_objet(examens):
+    """Ancien chemin de delete_examen_complet : un get() et un delete() par objet."""
+    for examen in examens:
+        for model in (TechnicalExamen, ClinicalExamen):
+            try:
+                model.objects.get(visite=examen.visite, patient=examen.patient).delete()
+            except model.DoesNotExist:
+                pass
+        examen.delete()
+        try:
+            DriverExperience.objects.get(patient=examen.patient, visite=examen.visite).delete()
+        except DriverExperience.DoesNotExist:
+            pass
+
+
+class Command(BaseCommand):
+    help = 'Compares per-object and set-based visit deletion (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=100, help='Number of visits to delete per run')
+
+    def _create_visits(self, count):
+        examens = []
+        for _ in range(count):
+            examen = VisiteExamensFactory()
+            DriverExperienceFactory(patient=examen.patient, visite=examen.visite)
+            examens.append(examen)
+        return examens
+
+    def _run(self, label, count, delete):
+        try:
+            with transaction.atomic():
+                examens = self._create_visits(count)
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    delete(examens)
+                    elapsed = perf_counter() - start
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(
+            f'{label:<12} {count} visit(s): {elapsed:.3f}s, {len(queries)} queries, '
+            f'{count / elapsed:.1f} visits/s'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        self._run('per-object', count, delete_par_objet)
+        self._run('set-based', count, lambda examens: ExamenService.delete_visites(
+            Examens.objects.filter(pk__in=[examen.pk for examen in examens])
+        ))
@@ -0,0 +1,64 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.examens.models import ClinicalExamen, Examens, TechnicalExamen
+from apps.health_record.models import DriverExperience
+from factories.patients import ConducteurFactory
+from utils.models.choices import VisiteChoices
+
+
+class _Rollback(Exception):
+    pass
+
+
+def save_avec_select(instance):
+    """Ancien chemin de Base.save : SELECT d'unicité (patient, visite) en plus de full_clean()."""
+    instance.full_clean()
+    type(instance).objects.filter(
+        patient=instance.patient, visite=instance.visite
+    ).exclude(pk=instance.pk).exists()
+    instance.save()
+
+
+def save_avec_contrainte(instance):
+    instance.save()
+
+
+class Command(BaseCommand):
+    help = 'Compares visit write throughput with and without the per-save uniqueness query (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=200, help='Number of visits to write per run')
+
+    def _write_visits(self, patients, save):
+        for patient in patients:
+            technical = TechnicalExamen(patient=patient, visite=VisiteChoices.FIRST)
+            clinical = ClinicalExamen(patient=patient, visite=VisiteChoices.FIRST)
+            save(technical)
+            save(clinical)
+            save(Examens(patient=patient, visite=VisiteChoices.FIRST, technical_examen=technical, clinical_examen=clinical))
+            save(DriverExperience(patient=patient, visite=VisiteChoices.FIRST))
+
+    def _run(self, label, count, save):
+        try:
+            with transaction.atomic():
+                patients = ConducteurFactory.create_batch(count)
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    self._write_visits(patients, save)
+                    elapsed = perf_counter() - start
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(
+            f'{label:<12} {count} visit(s): {elapsed:.3f}s, {len(queries)} queries, '
+            f'{count / elapsed:.1f} visits/s'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        self._run('select', count, save_avec_select)
+        self._run('constraint', count, save_avec_contrainte)
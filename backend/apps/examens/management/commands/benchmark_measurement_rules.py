@@ -0,0 +1,42 @@
+import random
+from time import perf_counter
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from apps.examens.models import VisualAcuity
+from apps.examens.rules import VISUAL_ACUITY_RULES, np, validate_rows
+
+
+def valider_par_objet(rows):
+    """Chemin ligne à ligne : une instance et un clean() par ligne."""
+    invalid = 0
+    for row in rows:
+        try:
+            VisualAcuity(**row).clean()
+        except ValidationError:
+            invalid += 1
+    return invalid
+
+
+class Command(BaseCommand):
+    help = 'Compares per-object and batch validation of visual acuity rows (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=10_000, help='Number of rows to validate')
+
+    def handle(self, *args, **options):
+        fields = [rule.field for rule in VISUAL_ACUITY_RULES]
+        rows = [{field: f'{random.uniform(-1, 11):.3f}' for field in fields} for _ in range(options['count'])]
+
+        start = perf_counter()
+        per_object = valider_par_objet(rows)
+        per_object_s = perf_counter() - start
+
+        start = perf_counter()
+        batch = len(validate_rows(VISUAL_ACUITY_RULES, rows).invalid_rows())
+        batch_s = perf_counter() - start
+
+        engine = 'numpy' if np is not None else 'python (numpy absent)'
+        self.stdout.write(f'per-object {per_object_s * 1000:8.1f} ms ({per_object} invalid row(s))')
+        self.stdout.write(f'batch      {batch_s * 1000:8.1f} ms ({batch} invalid row(s), {engine})')
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.uploads import chunked_uploads_cleanup
+
+
+class Command(BaseCommand):
+    help = 'Deletes finished and abandoned chunked uploads with their partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+            help=f'Minimum idle time before deletion (default {settings.CHUNKED_UPLOAD_EXPIRY_HOURS})',
+        )
+
+    def handle(self, *args, **options):
+        count = chunked_uploads_cleanup(older_than=timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'{count} upload(s) deleted'))
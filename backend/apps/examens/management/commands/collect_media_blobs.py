@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.media import media_blobs_collect
+
+
+class Command(BaseCommand):
+    help = 'Deletes content-addressed exam media blobs that no Perimetry or BpSuP row references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=settings.MEDIA_BLOB_GRACE_HOURS,
+            help=f'Keep blobs written or reused more recently (default {settings.MEDIA_BLOB_GRACE_HOURS})',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping every --interval seconds')
+        parser.add_argument('-i', '--interval', type=float, default=60 * 60, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            result = media_blobs_collect(grace=timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+            self.stdout.write(self.style.SUCCESS(
+                '{blobs} blob(s) for {references} reference(s): {deleted} orphan(s) deleted, '
+                '{freed} bytes freed'.format(**result) + (' (dry run)' if options['dry_run'] else '')
+            ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.examens.models import Examens
+from services.examens import ExamenService
+
+
+class Command(BaseCommand):
+    help = 'Deletes a batch of visits (exam, sub-models, driving experience) with set-based deletes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-i', '--id', action='append', type=int, dest='ids', help='Exam id (repeatable)')
+        parser.add_argument('-v', '--visite', type=int, help='Only this visit number')
+        parser.add_argument('--created-from', help='Exams created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--created-to', help='Exams created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--dry-run', action='store_true', help='Only print how many visits match')
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['ids']:
+            filters['pk__in'] = options['ids']
+        if options['visite']:
+            filters['visite'] = options['visite']
+        for option, lookup in (('created_from', 'created__date__gte'), ('created_to', 'created__date__lte')):
+            if options[option]:
+                day = parse_date(options[option])
+                if day is None:
+                    raise CommandError(f'Invalid date: {options[option]}')
+                filters[lookup] = day
+        if not filters:
+            raise CommandError('Refusing to delete every visit, give at least one filter')
+
+        examens = Examens.objects.filter(**filters)
+        if options['dry_run']:
+            self.stdout.write(f'{examens.count()} visit(s) would be deleted')
+            return
+
+        deleted = ExamenService.delete_visites(examens)
+        for label, count in sorted(deleted.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f"{deleted.get('examens.Examens', 0)} visit(s) deleted"))
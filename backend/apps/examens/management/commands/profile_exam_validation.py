@@ -0,0 +1,74 @@
+from time import perf_counter, process_time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.examens.models import TechnicalExamen
+from apps.health_record.models import DriverExperience
+from factories.examens import (
+    BiomicroscopySegmentAnterieurFactory, OcularTensionFactory, PlaintesFactory, RefractionFactory,
+    VisualAcuityFactory
+)
+from factories.patients import ConducteurFactory
+from utils.models.choices import VisiteChoices
+from utils.models.validation import validate_for_save
+
+
+class _Rollback(Exception):
+    pass
+
+
+def save_revalide(instance):
+    """Ancien chemin des services : full_clean() puis save(), qui revalide."""
+    instance.full_clean()
+    instance.save()
+
+
+def save_valide(instance):
+    validate_for_save(instance)
+    instance.save()
+
+
+class Command(BaseCommand):
+    help = 'Profiles CPU time and queries per exam with and without re-validation in save() (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=200, help='Number of exams to write per run')
+
+    def _write_exams(self, patients, save):
+        for patient in patients:
+            technical = TechnicalExamen(
+                patient=patient,
+                visite=VisiteChoices.FIRST,
+                visual_acuity=VisualAcuityFactory.build(),
+                refraction=RefractionFactory.build(),
+                ocular_tension=OcularTensionFactory.build(),
+            )
+            for part in (technical.visual_acuity, technical.refraction, technical.ocular_tension):
+                save(part)
+            save(technical)
+            save(PlaintesFactory.build())
+            save(BiomicroscopySegmentAnterieurFactory.build())
+            save(DriverExperience(patient=patient, visite=VisiteChoices.FIRST))
+
+    def _run(self, label, count, save):
+        try:
+            with transaction.atomic():
+                patients = ConducteurFactory.create_batch(count)
+                with CaptureQueriesContext(connection) as queries:
+                    cpu, start = process_time(), perf_counter()
+                    self._write_exams(patients, save)
+                    cpu, elapsed = process_time() - cpu, perf_counter() - start
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(
+            f'{label:<12} {count} exam(s): {elapsed:.3f}s, '
+            f'{cpu / count * 1000:.2f} ms CPU/exam, {len(queries) / count:.1f} queries/exam'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        self._run('revalidate', count, save_revalide)
+        self._run('validated', count, save_valide)
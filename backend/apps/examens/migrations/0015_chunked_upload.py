@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 13:42
+
+import django.db.models.deletion
+import django_extensions.db.fields
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('examens', '0014_alter_biomicroscopysegmentposterieur_macula_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Taille totale (octets)')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Octets reçus')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='Empreinte SHA-256')),
+                ('status', models.CharField(choices=[('uploading', 'En cours'), ('complete', 'Terminé')], default='uploading', max_length=10)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Envoi par morceaux',
+                'verbose_name_plural': 'Envois par morceaux',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('examens', '0016_exam_media_storage'),
+        ('patients', '0004_licence_reminders'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='examens',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='clinicalexamen',
+            constraint=models.UniqueConstraint(fields=('patient', 'visite'), name='examens_clinicalexamen_unique_visite'),
+        ),
+        migrations.AddConstraint(
+            model_name='examens',
+            constraint=models.UniqueConstraint(fields=('patient', 'visite'), name='examens_examens_unique_visite'),
+        ),
+        migrations.AddConstraint(
+            model_name='technicalexamen',
+            constraint=models.UniqueConstraint(fields=('patient', 'visite'), name='examens_technicalexamen_unique_visite'),
+        ),
+    ]
@@ -1,3 +1,7 @@
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
@@ -5,6 +9,9 @@ from django.core.exceptions import ValidationError
 from django_extensions.db.models import TimeStampedModel
 
 from apps.examens.base import OcularMeasurementBase, Base
+from apps.examens.rules import PERIMETRY_RULES, REFRACTION_RULES, VISUAL_ACUITY_RULES, MeasurementRulesMixin
+from utils.models.validation import ValidatedSaveMixin
+from utils.storage import exam_media_storage
 
 from utils.models.choices import Cornee, ChambreAnterieureProfondeur, ChambreAnterieureTransparence, QuantiteAnomalie, SegmentChoices, \
     TypeAnomalie, Pupille, AxeVisuel, RPM, Iris, Cristallin, Vitre, Macula, ChampRetinienPeripherique, Vaisseaux, \
@@ -13,7 +20,9 @@ from utils.models.choices import Cornee, ChambreAnterieureProfondeur, ChambreAnt
 MEDIA = 'media/images/'
 
 # Visual Acuity model
-class VisualAcuity(TimeStampedModel):
+class VisualAcuity(MeasurementRulesMixin, ValidatedSaveMixin, TimeStampedModel):
+    measurement_rules = VISUAL_ACUITY_RULES
+
     avsc_od = models.DecimalField(_('AVSC OD'), max_digits=5, decimal_places=3)
     avsc_og = models.DecimalField(_('AVSC OG'), max_digits=5, decimal_places=3)
     avsc_odg = models.DecimalField(_('AVSC ODG'), max_digits=5, decimal_places=3)
@@ -27,22 +36,7 @@ class VisualAcuity(TimeStampedModel):
 
     def clean(self):
         super().clean()
-        fields = [
-            ('avsc_od', self.avsc_od),
-            ('avsc_og', self.avsc_og),
-            ('avsc_odg', self.avsc_odg),
-            ('avac_od', self.avac_od),
-            ('avac_og', self.avac_og),
-            ('avac_odg', self.avac_odg),
-        ]
-        for field_name, value in fields:
-            if value is not None:
-                if not (0 <= value <= 10):
-                    raise ValidationError({field_name: _('La valeur doit être comprise entre 0 et 10.')})
-
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
+        self.validate_measurements()
 
     def __str__(self):
         try:
@@ -51,7 +45,9 @@ class VisualAcuity(TimeStampedModel):
             return 'Acuité visuelle (non liée)'
 
 # Refraction model
-class Refraction(TimeStampedModel):
+class Refraction(MeasurementRulesMixin, ValidatedSaveMixin, TimeStampedModel):
+    measurement_rules = REFRACTION_RULES
+
     correction_optique = models.BooleanField(_('Correction optique'), default=False)
     od_s = models.DecimalField(_('S OD'),  max_digits=5, decimal_places=3, null=True, blank=True, default=None)
     og_s = models.DecimalField(_('S OG'),  max_digits=5, decimal_places=3, null=True, blank=True, default=None)
@@ -64,20 +60,7 @@ class Refraction(TimeStampedModel):
 
     def clean(self):
         super().clean()
-        if self.correction_optique:
-            refraction_fields = {
-                'S OD': self.od_s, 'C OD': self.od_c, 'A OD': self.od_a,
-                'S OG': self.og_s, 'C OG': self.og_c, 'A OG': self.og_a,
-            }
-            for field_name, value in refraction_fields.items():
-                if value is None:
-                    raise ValidationError(_(f'Le champ {field_name} doit être rempli.'))
-                if not (-10.0 <= float(value) <= 10.0):
-                    raise ValidationError(_(f'La valeur de {field_name} doit être entre -10.0 et 10.0'))
-
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
+        self.validate_measurements()
 
     class Meta:
         verbose_name = _('Réfraction automatisée')
@@ -90,7 +73,7 @@ class Refraction(TimeStampedModel):
             return 'Réfraction (non liée)'
 
 # Ocular Tension model
-class OcularTension(OcularMeasurementBase):
+class OcularTension(ValidatedSaveMixin, OcularMeasurementBase):
     ttt_hypotonisant = models.BooleanField(_('TTT hypotonisant appliqué'), default=False)
     ttt_hypotonisant_value = models.CharField(
         _('TTT hypotonisant value'), max_length=30,
@@ -108,10 +91,6 @@ class OcularTension(OcularMeasurementBase):
             if self.ttt_hypotonisant_value is None or self.ttt_hypotonisant_value == '':
                 raise ValidationError(_('ttt_hypotonisant_value ne doit pas avoir la valeur null.'))
 
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
-
     def __str__(self):
         try:
             return f'Tonus oculaire de {self.technicalexamen.patient.get_full_name()} - Visite {self.technicalexamen.visite}'
@@ -134,7 +113,7 @@ class Pachymetry(OcularMeasurementBase):
             return 'Pachymétrie (non liée)'
 
 # Clinical Findings model
-class Plaintes(TimeStampedModel):
+class Plaintes(ValidatedSaveMixin, TimeStampedModel):
     YES_NO_CHOICES = [(True, 'Oui'), (False, 'Non')]
     DIPLOPIE_TYPE_CHOICES = [('monoculaire', 'Monoculaire'), ('binoculaire', 'Binoculaire')]
     EYE_CHOICES = [('od', 'OD'), ('og', 'OG'), ('odg', 'ODG')]
@@ -167,10 +146,6 @@ class Plaintes(TimeStampedModel):
         if self.ptosis and not self.ptosis_eye:
             raise ValidationError(_('Veuillez préciser l\'œil affecté par le ptosis.'))
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
-
     def __str__(self):
         try:
             return f'Plaintes de {self.eyeside.clinicalexamen.patient.get_full_name()} - Visite {self.eyeside.clinicalexamen.visite}'
@@ -182,7 +157,7 @@ class Plaintes(TimeStampedModel):
         verbose_name_plural = _('Examens cliniques - Diplopie, Strabisme, Nystagmus, Ptosis')
 
 # Segment Anterieur
-class BiomicroscopySegmentAnterieur(TimeStampedModel):
+class BiomicroscopySegmentAnterieur(ValidatedSaveMixin, TimeStampedModel):
     segment = models.CharField(_('Segment'), max_length=20, choices=SegmentChoices.choices)
     cornee = models.CharField(_('Corne'), max_length=30, choices=Cornee.choices, null=True, blank=True, default=None)
     profondeur = models.CharField(_('Profondeur'), max_length=30, choices=ChambreAnterieureProfondeur.choices, null=True, blank=True, default=None)
@@ -227,10 +202,6 @@ class BiomicroscopySegmentAnterieur(TimeStampedModel):
             if not self.position_cristallin:
                 raise ValidationError(_('Le champs position_cristallin ne doit pas etre nul.'))
 
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
-
     def __str__(self):
         try:
             return f'Segment antérieur de {self.eyeside.clinicalexamen.patient.get_full_name()} - Visite {self.eyeside.clinicalexamen.visite}'
@@ -331,9 +302,9 @@ class BiomicroscopySegmentPosterieur(TimeStampedModel):
 
 # BP supplementary items
 class BpSuP(TimeStampedModel):
-    retinographie = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/retinographie/', null=True, blank=True)
-    oct = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/oct/', null=True, blank=True)
-    autres = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/autres/', null=True, blank=True)
+    retinographie = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/retinographie/', null=True, blank=True, storage=exam_media_storage)
+    oct = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/oct/', null=True, blank=True, storage=exam_media_storage)
+    autres = models.ImageField(upload_to=f'{MEDIA}biomicroscopie/autres/', null=True, blank=True, storage=exam_media_storage)
 
     def __str__(self):
         try:
@@ -354,7 +325,9 @@ class EyeSide(TimeStampedModel):
             return 'EyeSide (non lié)'
 
 # Perimetry model
-class Perimetry(TimeStampedModel):
+class Perimetry(MeasurementRulesMixin, ValidatedSaveMixin, TimeStampedModel):
+    measurement_rules = PERIMETRY_RULES
+
     pbo = models.CharField(_('PBO'), max_length=30,
                            choices=PerimetrieBinoculaire,
                            null=True)
@@ -365,8 +338,8 @@ class Perimetry(TimeStampedModel):
     limite_horizontal = models.FloatField(_('Limite Horizontal'))
     score_esternmen = models.FloatField(_('Score d’Estermen (pourcentage)'))
 
-    image = models.ImageField(_('Image'), upload_to=f'{MEDIA}perimetries_binoculaire/', null=True, blank=True)
-    images = models.FileField(_('Images'), upload_to=f'{MEDIA}perimetries_binoculaire/', null=True, blank=True)
+    image = models.ImageField(_('Image'), upload_to=f'{MEDIA}perimetries_binoculaire/', null=True, blank=True, storage=exam_media_storage)
+    images = models.FileField(_('Images'), upload_to=f'{MEDIA}perimetries_binoculaire/', null=True, blank=True, storage=exam_media_storage)
 
     class Meta:
         verbose_name = _('Périmétrie binoculaire')
@@ -374,22 +347,7 @@ class Perimetry(TimeStampedModel):
 
     def clean(self):
         super().clean()
-        if not 0 < self.limite_inferieure <= 90:
-            raise ValidationError('limite_inferieure doit se situer entre 0 et 90')
-        if not 0 < self.limite_superieure <= 90:
-            raise ValidationError('limite_superieure doit se situer entre 0 et 90')
-        if not 0 < self.limite_horizontal <= 180:
-            raise ValidationError('limite_horizontal doit se situer entre 0 et 180')
-        if not 0 < self.limite_temporale_gauche <= 120:
-            raise ValidationError('limite_temporale_gauche doit se situer entre 0 et 120')
-        if not 0 < self.limite_temporale_droit <= 120:
-            raise ValidationError('limite_temporale_droit doit se situer entre 0 et 120')
-        if not 0 < self.score_esternmen <= 100:
-            raise ValidationError('score_esternmen doit se situer entre 0 et 100')
-
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
+        self.validate_measurements()
 
     def __str__(self):
         try:
@@ -470,7 +428,6 @@ class TechnicalExamen(Base):
         #     raise ValidationError('tous les champs sont obligatoires.')
 
     def save(self, *args, **kwargs):
-        self.full_clean()
         self.is_completed = self.completed()
         super().save(*args, **kwargs)
 
@@ -492,7 +449,7 @@ class ClinicalExamen(Base):
     bp_sup = models.OneToOneField(BpSuP, on_delete=models.CASCADE, null=True, default=None, blank=True, related_name='clinicalexamen')
     is_completed = models.BooleanField(_('Examen clinique complété'), default=False)
 
-    class Meta:
+    class Meta(Base.Meta):
         verbose_name = _('Examen clinique')
         verbose_name_plural = _('Examens cliniques')
 
@@ -523,8 +480,7 @@ class Examens(Base):
     )
     is_completed = models.BooleanField(_('Examen global complété'), default=False)
 
-    class Meta:
-        unique_together = ('patient', 'visite')
+    class Meta(Base.Meta):
         verbose_name = _('Examen global')
         verbose_name_plural = _('Examens globaux')
         ordering = ['visite', '-created']
@@ -541,4 +497,32 @@ class Examens(Base):
             self.clinical_examen and self.clinical_examen.is_completed
         )
         self.is_completed = bool(is_completed)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class ChunkedUpload(TimeStampedModel):
+    """
+    Envoi d'un gros fichier (OCT, rétinographie) par morceaux : les octets reçus sont ajoutés
+    à un fichier partiel sur disque, `offset` permet de reprendre après une coupure.
+    """
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', _('En cours')
+        COMPLETE = 'complete', _('Terminé')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(_('Nom du fichier'), max_length=255)
+    size = models.PositiveBigIntegerField(_('Taille totale (octets)'))
+    offset = models.PositiveBigIntegerField(_('Octets reçus'), default=0)
+    sha256 = models.CharField(_('Empreinte SHA-256'), max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.UPLOADING)
+
+    class Meta:
+        verbose_name = _('Envoi par morceaux')
+        verbose_name_plural = _('Envois par morceaux')
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{self.pk}.part')
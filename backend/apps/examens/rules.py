@@ -0,0 +1,174 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle, validate_rows applique alors les règles ligne à ligne
+    np = None
+
+REQUIRED_MESSAGE = 'Ce champ doit être rempli.'
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # Absente ou illisible : le type est contrôlé par clean_fields()
+        return float('nan')
+
+
+def _to_bool(value):
+    """
+    Condition `when` lue comme BooleanField.to_python (True, 't', 'True', '1', 1 / False, 'f', 'False',
+    '0', 0), ainsi que 'true' / 'false' ; absente ou illisible, elle est fausse.
+    """
+    if value in (True, False):  # 1 et 0 compris
+        return bool(value)
+    return value in ('t', 'True', 'true', '1')
+
+
+@dataclass(frozen=True)
+class RangeRule:
+    """
+    Plage autorisée d'une mesure : low <= valeur <= high (low < valeur si low_inclusive=False).
+    Une valeur absente est acceptée, sauf si `required`. Avec `when`, la règle ne s'applique
+    que si ce champ booléen de la même mesure est vrai.
+    """
+    field: str
+    low: float
+    high: float
+    low_inclusive: bool = True
+    required: bool = False
+    when: str = None
+
+    @property
+    def message(self):
+        low = f'{self.low:g}' if self.low_inclusive else f'{self.low:g} (exclu)'
+        return f'La valeur doit être comprise entre {low} et {self.high:g}.'
+
+    def violation(self, value, condition=True):
+        """Message d'erreur pour `value`, ou None si la règle est respectée."""
+        if self.when and not _to_bool(condition):
+            return None
+        if value is None:
+            return REQUIRED_MESSAGE if self.required else None
+        value = _to_float(value)
+        if value != value:  # NaN
+            return None
+        in_range = (self.low <= value if self.low_inclusive else self.low < value) and value <= self.high
+        return None if in_range else self.message
+
+
+# Règles des mesures d'examen, partagées par les clean() des modèles, les validate() des serializers
+# et la validation par lot des imports (validate_rows)
+VISUAL_ACUITY_RULES = tuple(
+    RangeRule(field, 0, 10) for field in ('avsc_od', 'avsc_og', 'avsc_odg', 'avac_od', 'avac_og', 'avac_odg')
+)
+REFRACTION_RULES = tuple(
+    RangeRule(field, -10, 10, required=True, when='correction_optique')
+    for field in ('od_s', 'od_c', 'od_a', 'og_s', 'og_c', 'og_a')
+)
+PERIMETRY_RULES = (
+    RangeRule('limite_superieure', 0, 90, low_inclusive=False),
+    RangeRule('limite_inferieure', 0, 90, low_inclusive=False),
+    RangeRule('limite_horizontal', 0, 180, low_inclusive=False),
+    RangeRule('limite_temporale_gauche', 0, 120, low_inclusive=False),
+    RangeRule('limite_temporale_droit', 0, 120, low_inclusive=False),
+    RangeRule('score_esternmen', 0, 100, low_inclusive=False),
+)
+
+
+def validate_rules(rules, values):
+    """
+    Applique `rules` et lève ValidationError({champ: message}) avec toutes les règles violées.
+    `values` : données validées d'un serializer (dict, champs absents ignorés) ou instance de modèle.
+    """
+    if isinstance(values, Mapping):
+        get = values.get
+    else:
+        def get(name):
+            return getattr(values, name, None)
+    errors = {}
+    for rule in rules:
+        message = rule.violation(get(rule.field), get(rule.when) if rule.when else True)
+        if message:
+            errors[rule.field] = message
+    if errors:
+        raise ValidationError(errors)
+
+
+class MeasurementRulesMixin:
+    """Modèle de mesure dont clean() applique `measurement_rules` (voir validate_measurements)."""
+    measurement_rules = ()
+
+    # Mis à True par les imports en masse qui ont déjà appliqué les règles par lot (validate_rows)
+    _measurements_checked = False
+
+    def validate_measurements(self):
+        if not self._measurements_checked:
+            validate_rules(self.measurement_rules, self)
+
+
+@dataclass
+class RowErrors:
+    """
+    Résultat de validate_rows : `masks[champ]` a une case par ligne, vraie si la règle du champ
+    est violée (tableau NumPy, ou liste sans NumPy).
+    """
+    rules: tuple
+    missing: dict
+    masks: dict
+
+    @property
+    def invalid(self):
+        """Lignes ayant au moins une règle violée."""
+        if np is not None:
+            return np.any(np.vstack(list(self.masks.values())), axis=0)
+        return [any(row) for row in zip(*self.masks.values())]
+
+    def invalid_rows(self):
+        """Indices des lignes invalides."""
+        if np is not None:
+            return np.flatnonzero(self.invalid).tolist()
+        return [index for index, invalid in enumerate(self.invalid) if invalid]
+
+    def row_errors(self, index):
+        """Erreurs {champ: message} de la ligne `index`, au format de validate_rows."""
+        return {
+            rule.field: REQUIRED_MESSAGE if self.missing[rule.field][index] else rule.message
+            for rule in self.rules if self.masks[rule.field][index]
+        }
+
+
+def _mask(rule, values, missing, conditions):
+    if np is None:
+        return [
+            condition and (is_missing and rule.required or rule.violation(value) is not None)
+            for value, is_missing, condition in zip(values, missing, conditions)
+        ]
+    values, missing = np.asarray(values, dtype=float), np.asarray(missing, dtype=bool)
+    above_low = values >= rule.low if rule.low_inclusive else values > rule.low
+    # Valeur illisible (NaN) : aucune comparaison n'échoue, son type est signalé par clean_fields()
+    out_of_range = ~np.isnan(values) & ~(above_low & (values <= rule.high))
+    return np.asarray(conditions, dtype=bool) & ((missing & rule.required) | out_of_range)
+
+
+def validate_rows(rules, rows):
+    """
+    Applique `rules` en une passe à des milliers de lignes d'import (dicts des valeurs brutes,
+    chaînes comprises ; None si la mesure est absente de la ligne). Chaque règle est évaluée
+    par comparaisons de tableaux NumPy sur la colonne entière, sans instancier de modèle.
+    """
+    rows = [row or {} for row in rows]
+    present = [bool(row) for row in rows]
+    missing, masks = {}, {}
+    for rule in rules:
+        raw = [row.get(rule.field) for row in rows]
+        missing[rule.field] = [value is None for value in raw]
+        conditions = present
+        if rule.when:
+            conditions = [is_present and _to_bool(row.get(rule.when)) for row, is_present in zip(rows, present)]
+        masks[rule.field] = _mask(rule, [_to_float(value) for value in raw], missing[rule.field], conditions)
+    return RowErrors(rules, missing, masks)
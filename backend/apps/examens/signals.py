@@ -0,0 +1,25 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from services.examens import EXAMEN_FILE_FIELDS
+from utils.background import run_in_background
+from utils.images import generate_renditions
+
+
+def _generate_renditions(sender, instance, update_fields=None, fields=(), **kwargs):
+    names = [
+        getattr(instance, field).name for field in fields
+        if (update_fields is None or field in update_fields) and getattr(instance, field)
+    ]
+    if names:
+        # Après le commit et hors du thread de la requête : seul le stockage est lu et écrit
+        transaction.on_commit(partial(run_in_background, generate_renditions, names))
+
+
+for model, fields in EXAMEN_FILE_FIELDS.values():
+    post_save.connect(
+        partial(_generate_renditions, fields=fields), sender=model, weak=False,
+        dispatch_uid=f'image_renditions_{model._meta.label}',
+    )
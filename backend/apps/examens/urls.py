@@ -1,27 +1,33 @@
 from django.urls import path
 from .views import (
     ExamensViewSet, TechnicalExamenViewSet,
-    ClinicalExamenViewSet, BpSuPViewSet
+    ClinicalExamenViewSet, BpSuPViewSet, ChunkedUploadViewSet
 )
 
 # Séparation explicite des vues comme demandé
 examen_list = ExamensViewSet.as_view({'post': 'create'})
-examen_detail = ExamensViewSet.as_view({'delete': 'destroy'})
+examen_detail = ExamensViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'})
+examen_bulk_delete = ExamensViewSet.as_view({'post': 'bulk_delete'})
 # examen_complete = ExamensViewSet.as_view({'post': 'complete'})
 
 technical_examen_create = TechnicalExamenViewSet.as_view({'post': 'create_for_tech_examen'})
-tech_examen_detail = TechnicalExamenViewSet.as_view({'patch': 'partial_update'})
+tech_examen_detail = TechnicalExamenViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update'})
 
-clinical_examen_detail = ClinicalExamenViewSet.as_view({'patch': 'partial_update'})
+clinical_examen_detail = ClinicalExamenViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update'})
 create_clinical_examen = ClinicalExamenViewSet.as_view({'post': 'create_for_examen'})
 
 bp_sup_create = BpSuPViewSet.as_view({'post': 'create'})
 bp_sup_detail = BpSuPViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'})
 
+upload_create = ChunkedUploadViewSet.as_view({'post': 'create'})
+upload_detail = ChunkedUploadViewSet.as_view({'get': 'retrieve', 'patch': 'append'})
+upload_finalize = ChunkedUploadViewSet.as_view({'post': 'finalize'})
+
 urlpatterns = [
     # Examens
     path('', examen_list, name='examen-list'),
     path('<int:pk>/', examen_detail, name='examen-detail'),
+    path('bulk-delete/', examen_bulk_delete, name='examen-bulk-delete'),
     # path('<int:pk>/complete/', examen_complete, name='examen-complete'),
     
     # Technical Examens
@@ -35,5 +41,10 @@ urlpatterns = [
     # BP Supplementary
     path('bp-supplementary/', bp_sup_create, name='bp-sup-create'),
     path('bp-supplementary/<int:pk>/', bp_sup_detail, name='bp-sup-detail'),
+
+    # Envois par morceaux
+    path('uploads/', upload_create, name='upload-create'),
+    path('uploads/<uuid:pk>/', upload_detail, name='upload-detail'),
+    path('uploads/<uuid:pk>/finalize/', upload_finalize, name='upload-finalize'),
     
 ]
\ No newline at end of file
@@ -1,22 +1,33 @@
 from rest_framework import viewsets, permissions, parsers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.conditional import ConditionalRetrieveMixin
+from api.media import media_name, serve_file
+from api.prefetch import PrefetchPlanMixin
 
 from .models import (
-    Examens, TechnicalExamen, ClinicalExamen,BpSuP
+    Examens, TechnicalExamen, ClinicalExamen,BpSuP, ChunkedUpload, MEDIA
 )
 
 from serializers.examens import (
     ExamensSerializer, TechnicalExamenSerializer, ClinicalExamenSerializer,
-    BpSuPSerializer
+    BpSuPSerializer, ChunkedUploadSerializer, ChunkedUploadFinalizeSerializer, PerimetrySerializer
 )
 
+from selector.versions import get_clinical_examen_version, get_examen_version, get_technical_examen_version
 from services.examens import ExamenService
+from utils.storage import exam_media_storage, is_blob
+from services.uploads import (
+    UploadOffsetConflict, chunked_upload_append, chunked_upload_create, chunked_upload_finalize
+)
 
-class ExamensViewSet(viewsets.ModelViewSet):
+class ExamensViewSet(ConditionalRetrieveMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = Examens.objects.all()
     serializer_class = ExamensSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_selector = get_examen_version
 
     def destroy(self, request, *args, **kwargs):
         examen_id = self.get_object().id
@@ -28,6 +39,13 @@ class ExamensViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"detail": f"Erreur lors de la suppression : {str(e)}"}, status=500)
 
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            return Response({"detail": "ids doit être une liste d'identifiants d'examens"}, status=status.HTTP_400_BAD_REQUEST)
+        deleted = ExamenService.delete_visites(Examens.objects.filter(pk__in=ids))
+        return Response({"deleted": deleted}, status=status.HTTP_200_OK)
 
     # @action(detail=True, methods=['post'])
     # def complete(self, request, pk=None):
@@ -35,10 +53,11 @@ class ExamensViewSet(viewsets.ModelViewSet):
     #     ExamenService.complete_examen(examen.id)
     #     return Response({'status': 'examen completed'})
 
-class TechnicalExamenViewSet(viewsets.ModelViewSet):
+class TechnicalExamenViewSet(ConditionalRetrieveMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = TechnicalExamen.objects.all()
     serializer_class = TechnicalExamenSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_selector = get_technical_examen_version
 
     @action(detail=False, methods=['post'], url_path='create-for-examen')
     def create_for_tech_examen(self, request, examen_id=None):
@@ -60,10 +79,11 @@ class TechnicalExamenViewSet(viewsets.ModelViewSet):
 
     # permission_classes = [permissions.IsAuthenticated]
 
-class ClinicalExamenViewSet(viewsets.ModelViewSet):
+class ClinicalExamenViewSet(ConditionalRetrieveMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = ClinicalExamen.objects.all()
     serializer_class = ClinicalExamenSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_selector = get_clinical_examen_version
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
 
     def update(self, request, *args, **kwargs):
@@ -86,8 +106,73 @@ class ClinicalExamenViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class BpSuPViewSet(viewsets.ModelViewSet):
+class BpSuPViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = BpSuP.objects.all()
     serializer_class = BpSuPSerializer
     permission_classes = [permissions.IsAuthenticated]
-    parser_classes = [parsers.MultiPartParser, parsers.FormParser]
\ No newline at end of file
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+
+class ChunkedUploadViewSet(viewsets.GenericViewSet):
+    """
+    Envoi reprenable des gros fichiers d'examen, sans passer par MultiPartParser :
+    POST crée l'envoi, PATCH ajoute un morceau (corps brut, en-tête Upload-Offset),
+    GET donne la position atteinte, POST finalize attache le fichier à une Perimetry ou un BpSuP.
+    """
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    result_serializers = {'perimetry': PerimetrySerializer, 'bp_sup': BpSuPSerializer}
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(user=self.request.user)
+
+    def _response(self, upload, **kwargs):
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(upload.offset)}, **kwargs)
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = chunked_upload_create(user=request.user, **serializer.validated_data)
+        return self._response(upload, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        return self._response(self.get_object())
+
+    def append(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return Response({'detail': 'En-têtes Upload-Offset et Content-Length requis'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Le corps est lu directement par blocs : request.data n'est jamais chargé en mémoire
+            upload = chunked_upload_append(
+                upload_id=upload.pk, user=request.user, offset=offset, stream=request.stream, length=length
+            )
+        except UploadOffsetConflict as conflict:
+            return Response(
+                {'detail': str(conflict), 'offset': conflict.offset},
+                status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(conflict.offset)},
+            )
+        return self._response(upload)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        upload = self.get_object()
+        serializer = ChunkedUploadFinalizeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        instance = chunked_upload_finalize(upload_id=upload.pk, user=request.user, **serializer.validated_data)
+        result_serializer = self.result_serializers[serializer.validated_data['target']]
+        return Response(result_serializer(instance, context=self.get_serializer_context()).data)
+
+
+class ExamMediaView(APIView):
+    """
+    Fichiers d'examen (images, OCT, déclinaisons) réservés aux utilisateurs authentifiés,
+    servis par api.media.serve_file : requêtes Range, GET conditionnel, X-Accel-Redirect / X-Sendfile.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, path):
+        name = media_name(MEDIA, path)
+        return serve_file(request, exam_media_storage(), name, immutable=is_blob(name))
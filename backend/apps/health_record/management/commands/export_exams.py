@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from selector.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_visits
+from utils.exports import parquet_available
+
+
+class Command(BaseCommand):
+    help = 'Streams the full exam dataset (one row per visit) to a CSV or Parquet file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file ('-' for stdout, CSV only)")
+        parser.add_argument(
+            '-f',
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            help='Output format (inferred from the extension by default)',
+        )
+        parser.add_argument(
+            '-c',
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched per cursor round-trip / Parquet row group (default {EXPORT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or Path(path).suffix.lstrip('.').lower() or 'csv'
+        if file_format not in EXPORT_FORMATS:
+            raise CommandError('Unknown format, use --format csv|parquet')
+        if file_format == 'parquet':
+            if not parquet_available():
+                raise CommandError('Parquet export requires pyarrow')
+            if path == '-':
+                raise CommandError('Parquet cannot be written to stdout')
+
+        chunks = export_visits(file_format, chunk_size=options['chunk_size'])
+        if path == '-':
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        mode, encoding = ('wb', None) if file_format == 'parquet' else ('w', 'utf-8')
+        with open(path, mode, encoding=encoding, newline=None if encoding is None else '') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Export written to {path}'))
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.bulk_import import DEFAULT_BATCH_SIZE, ExamImportService
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports visits (patient, driving experience, exams) from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (dotted column names) or JSONL file to import')
+        parser.add_argument(
+            '-f',
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (inferred from the extension by default)',
+        )
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows validated and written per transaction (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--errors-file',
+            help='Write rejected rows and their errors to this JSON file',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Unknown format, use --format csv|jsonl")
+        if not path.is_file():
+            raise CommandError(f'{path} does not exist')
+
+        with path.open('rb') as file:
+            report = ExamImportService.import_file(file, file_format, batch_size=options['batch_size'])
+
+        if options['errors_file']:
+            Path(options['errors_file']).write_text(json.dumps(report.errors, ensure_ascii=False, indent=2))
+        for error in report.errors[:20]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+
+        style = self.style.SUCCESS if not report.errors else self.style.WARNING
+        self.stdout.write(style(f'{report.imported}/{report.total} row(s) imported, {len(report.errors)} rejected'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('examens', '0014_alter_biomicroscopysegmentposterieur_macula_and_more'),
+        ('health_record', '0004_remove_driverexperience_degat'),
+        ('patients', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(fields=['created', 'id'], name='health_record_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_record', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        # Source des versions de dossier : nextval() n'est pas annulé par un ROLLBACK,
+        # une version n'est donc jamais réutilisée (services.dossiers)
+        migrations.RunSQL(
+            sql='CREATE SEQUENCE IF NOT EXISTS health_record_version_seq',
+            reverse_sql='DROP SEQUENCE IF EXISTS health_record_version_seq',
+        ),
+        migrations.AddField(
+            model_name='healthrecord',
+            name='version',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_record', '0006_dossier_version'),
+        ('patients', '0004_licence_reminders'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='driverexperience',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='driverexperience',
+            constraint=models.UniqueConstraint(fields=('patient', 'visite'), name='health_record_driverexperience_unique_visite'),
+        ),
+    ]
@@ -6,11 +6,12 @@ from django_extensions.db.models import TimeStampedModel
 from apps.examens.base import Base
 from apps.examens.models import Examens
 from apps.patients.models import Conducteur
+from utils.models.validation import ValidatedSaveMixin
 from utils.models.choices import AddictionTypeChoices, ArretCauseChoices, DECESCauseChoices, EtatConducteurChoices, FamilialChoices, DommageChoices
 from django.contrib.postgres.fields import ArrayField
 
 # Antécédents médicaux (modifiés)
-class Antecedent(TimeStampedModel):
+class Antecedent(ValidatedSaveMixin, TimeStampedModel):
     patient = models.OneToOneField(Conducteur, on_delete=models.CASCADE, related_name='antecedents')
     antecedents_medico_chirurgicaux = models.TextField(_('Antécédents médico-chirurgicaux'), blank=True)
     pathologie_ophtalmologique = models.TextField(_('Pathologies ophtalmologiques'), blank=True)
@@ -54,10 +55,6 @@ class Antecedent(TimeStampedModel):
         if 'OTHER' in self.familial and not self.autre_familial_detail:
             raise ValidationError(_('Veuillez préciser les autres antécédents familiaux.'))
 
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
-
     def __str__(self):
         return f"Antécédents - {self.patient.get_full_name()}"
 
@@ -118,10 +115,9 @@ class DriverExperience(Base):
         null=True, default=None, blank=True
     )
 
-    class Meta:
+    class Meta(Base.Meta):
         verbose_name = _('Expérience de conduite')
         verbose_name_plural = _('Expériences de conduite')
-        unique_together = ('patient', 'visite')
 
     def clean(self):
         super().clean()
@@ -145,12 +141,9 @@ class DriverExperience(Base):
             raise ValidationError(_('Veuillez spécifier le type de dommage matériel.'))
         if self.materiel_dommage_type and self.materiel_dommage_type not in [choice[0] for choice in DommageChoices.choices]:
             raise ValidationError(_('Le type de dommage matériel doit être l\'un des choix valides.'))
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
     
     
-class HealthRecord(TimeStampedModel):
+class HealthRecord(ValidatedSaveMixin, TimeStampedModel):
     """
     Dossier médical complet du conducteur.
     """
@@ -171,10 +164,15 @@ class HealthRecord(TimeStampedModel):
     )
     examens = models.ManyToManyField(Examens, blank=True)
     driver_experience = models.ManyToManyField(DriverExperience, blank=True)
+    # Version du dossier sérialisé, changée à chaque écriture (services.dossiers.dossier_version_bump)
+    version = models.BigIntegerField(_('version'), default=0, editable=False)
 
     class Meta:
         verbose_name = _('Dossier médical')
         verbose_name_plural = _('Dossiers médicaux')
+        indexes = [
+            models.Index(fields=['created', 'id'], name='health_record_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Dossier médical - {self.patient.get_full_name()}"
@@ -183,8 +181,4 @@ class HealthRecord(TimeStampedModel):
         super().clean()
         # Vérification que le patient correspond dans toutes les relations
         if (self.antecedant and self.antecedant.patient != self.patient):
-            raise ValidationError(_('Incohérence dans les données patient'))
-        
-    def save(self, **kwargs):
-        self.full_clean()
-        return super().save(**kwargs)
\ No newline at end of file
+            raise ValidationError(_('Incohérence dans les données patient'))
\ No newline at end of file
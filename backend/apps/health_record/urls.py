@@ -3,7 +3,9 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     HealthRecordViewSet,
     AntecedentViewSet,
-    DriverExperienceViewSet
+    DriverExperienceViewSet,
+    ExamExportView,
+    ExamImportView,
     )
 
 # Séparation explicite des vues
@@ -11,6 +13,7 @@ health_record_list = HealthRecordViewSet.as_view({'get': 'list'})
 # health_record_history = HealthRecordViewSet.as_view({'get': 'full_history'})
 health_record_patient = HealthRecordViewSet.as_view({'get': 'patient'})
 sync_health_record = HealthRecordViewSet.as_view({'get': 'sync_health_record'})
+health_record_cache_stats = HealthRecordViewSet.as_view({'get': 'cache_stats'})
 create_driver_experience = DriverExperienceViewSet.as_view({'post': 'create_or_update_for_patient'})
 set_risky_patient_state = HealthRecordViewSet.as_view({'post': 'set_risky_patient'})
 # antecedent_list = AntecedentViewSet.as_view({'post': 'create'})
@@ -26,6 +29,7 @@ urlpatterns = [
     path('set-risky-patient/', set_risky_patient_state, name='set-risky-patient'),
     # path('<int:pk>/history/', health_record_history, name='health-record-history'),
     path('patient/<int:patient_id>/', health_record_patient, name='health-record-patient'),
+    path('cache-stats/', health_record_cache_stats, name='health-record-cache-stats'),
     path(
             'visite/<int:visite>/patient/<int:patient_id>/',
             sync_health_record,
@@ -42,6 +46,10 @@ urlpatterns = [
     path('driver-experiences/create/', create_driver_experience, name='create-driver-experience'),
     path('driver-experiences/<int:pk>/', driver_exp_detail, name='driver-exp-detail'),
     
+    # Import / export
+    path('import/', ExamImportView.as_view(), name='exam-import'),
+    path('export/<str:file_format>/', ExamExportView.as_view(), name='exam-export'),
+
     # Stats
     # path('stats/', StatsAPIView.as_view(), name='medical-stats'),
 ]
@@ -1,13 +1,27 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, parsers, status
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.utils import timezone
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from django_filters.rest_framework import DjangoFilterBackend
 
+from api.conditional import conditional_response
+from api.pagination import KeysetPagination
+from api.prefetch import PrefetchPlanMixin
+from api.transactions import atomic_request
 from apps.patients.models import Conducteur
+from selector.exports import EXPORT_FORMATS, export_visits
+from selector.versions import get_health_record_version
+from services.bulk_import import DEFAULT_BATCH_SIZE, ExamImportService
+from services.dossiers import dossier_cache_get_or_render, dossier_cache_metrics
 from services.health_records import AntecedentService, DriverExperienceService, HealthRecordService
 from .models import HealthRecord, Antecedent, DriverExperience
+from utils.exports import parquet_available
+from utils.replicas import ReplicaListMixin
 
 from serializers.health_records import (
     HealthRecordSerializer, 
@@ -20,12 +34,13 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 
 
-class HealthRecordViewSet(viewsets.ModelViewSet):
-    queryset = HealthRecord.objects.all()
+class HealthRecordViewSet(ReplicaListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
+    queryset = HealthRecord.objects.all().order_by('-created', '-id')
     serializer_class = HealthRecordSerializer
     filterset_fields = ['risky_patient']
     filter_backends = [DjangoFilterBackend]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     @action(detail=True, methods=['get'])
     def full_history(self, request, pk=None):
@@ -35,12 +50,26 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
 
     @action(methods=['get'], detail=True)
     def patient(self, request, patient_id=None):
-        record = self.queryset.filter(patient=patient_id).first()
-        if not record:
-            return Response('', status=status.HTTP_404_NOT_FOUND)
-        serializer = self.serializer_class(record)
-        return Response(serializer.data)
+        def serialize():
+            record = self.get_queryset().filter(patient=patient_id).first()
+            return self.serializer_class(record).data if record else None
+
+        version = get_health_record_version(patient_id)
+
+        def render():
+            data = dossier_cache_get_or_render(patient_id, serialize, etag=version.etag if version else None)
+            if data is None:
+                return Response('', status=status.HTTP_404_NOT_FOUND)
+            return Response(data)
+
+        # Dossier inchangé depuis la dernière ouverture : 304 sans charger le graphe imbriqué
+        return conditional_response(request, version, render)
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        return Response(dossier_cache_metrics())
 
+    @atomic_request
     @action(detail=False, methods=['get'])
     def sync_health_record(self, request, patient_id, visite):
         try:
@@ -49,7 +78,7 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
                 visite=visite
             )
             DriverExperienceService.delete_driver_experience(patient_id, visite)
-            record = self.queryset.filter(patient=patient_id).first()
+            record = self.get_queryset().filter(patient=patient_id).first()
             if not record:
                 return Response({"detail": "Dossier introuvable"}, status=404)
 
@@ -74,18 +103,24 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
         if risky is None:
             return Response({'detail': 'risky_patient est requis (true ou false)'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            record = HealthRecord.objects.get(patient_id=patient_id)
-            record.risky_patient = bool(risky) if isinstance(risky, bool) else str(risky).lower() == "true"
-            record.save()
+            record = HealthRecordService.set_risky_patient(
+                patient_id,
+                bool(risky) if isinstance(risky, bool) else str(risky).lower() == "true"
+            )
             return Response({'status': f"Patient {'marqué' if record.risky_patient else 'démarqué'} comme à risque"}, status=status.HTTP_200_OK)
         except HealthRecord.DoesNotExist:
             return Response({'detail': 'Dossier médical introuvable'}, status=status.HTTP_404_NOT_FOUND)
         
         
-class AntecedentViewSet(viewsets.ModelViewSet):
+class AntecedentViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = Antecedent.objects.all()
     serializer_class = AntecedentSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    def perform_update(self, serializer):
+        # Passe par le service pour invalider le dossier en cache (dossier_version_bump)
+        serializer.instance = AntecedentService.update_antecedent(serializer.instance, serializer.validated_data)
+
     @action(detail=False, methods=['post'], url_path='create-for-patient')
     def create_or_update_for_patient(self, request):
         patient_id = request.data.get('patient')
@@ -107,10 +142,17 @@ class AntecedentViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"detail": str(e)}, status=500)
 
-class DriverExperienceViewSet(viewsets.ModelViewSet):
+class DriverExperienceViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     queryset = DriverExperience.objects.all()
     serializer_class = DriverExperienceSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    def perform_update(self, serializer):
+        # Passe par le service pour invalider le dossier en cache (dossier_version_bump)
+        serializer.instance = DriverExperienceService.update_driver_experience(
+            serializer.instance, serializer.validated_data
+        )
+
     @action(detail=False, methods=['post'], url_path='create-for-patient')
     def create_or_update_for_patient(self, request):
         patient_id = request.data.get('patient')
@@ -133,3 +175,65 @@ class DriverExperienceViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=200)
         except Exception as e:
             return Response({"detail": str(e)}, status=500)
+
+
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class ExamImportView(APIView):
+    """
+    Import en masse de visites depuis un fichier CSV ou JSONL (voir ExamImportService).
+    Les lignes valides sont importées, les autres sont renvoyées avec leurs erreurs.
+    Hors ATOMIC_REQUESTS : chaque lot est validé par sa propre transaction, pas par un savepoint.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [parsers.MultiPartParser]
+
+    @extend_schema(
+        summary="Import en masse d'examens",
+        request={
+            'multipart/form-data': {
+                'type': 'object',
+                'properties': {
+                    'file': {'type': 'string', 'format': 'binary'},
+                    'format': {'type': 'string', 'enum': ['csv', 'jsonl']},
+                },
+                'required': ['file'],
+            }
+        },
+    )
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Le fichier est requis"}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'jsonl'):
+            return Response({"detail": "Le format doit être 'csv' ou 'jsonl'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = ExamImportService.import_file(upload.file, file_format, batch_size=DEFAULT_BATCH_SIZE)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+class ExamExportView(APIView):
+    """
+    Export complet des visites (une ligne par visite, toutes tables jointes) en CSV ou Parquet.
+    La réponse est générée au fil de l'eau depuis un curseur serveur.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        summary="Export complet des examens",
+        parameters=[
+            OpenApiParameter(name='file_format', location=OpenApiParameter.PATH, type=str, enum=list(EXPORT_FORMATS)),
+        ],
+        responses={(200, 'text/csv'): bytes, (200, 'application/vnd.apache.parquet'): bytes},
+    )
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            return Response({"detail": "Le format doit être 'csv' ou 'parquet'"}, status=status.HTTP_400_BAD_REQUEST)
+        if file_format == 'parquet' and not parquet_available():
+            return Response({"detail": "L'export Parquet n'est pas disponible (pyarrow absent)"},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        response = StreamingHttpResponse(export_visits(file_format), content_type=EXPORT_FORMATS[file_format])
+        filename = f"examens-{timezone.now():%Y%m%d-%H%M}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
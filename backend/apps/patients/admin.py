@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conducteur, Vehicule
+from .models import Conducteur, LicenceExpiryReminder, Vehicule
 
 
 class VehiculeInline(admin.TabularInline):  # ou StackedInline
@@ -36,3 +36,11 @@ class VehiculeAdmin(admin.ModelAdmin):
 
     def conducteur_full_name(self, obj):
         return f"{obj.conducteur.first_name} {obj.conducteur.last_name}"
+
+
+@admin.register(LicenceExpiryReminder)
+class LicenceExpiryReminderAdmin(admin.ModelAdmin):
+    list_display = ('conducteur', 'date_peremption_permis', 'days_before', 'created')
+    list_filter = ('days_before',)
+    raw_id_fields = ('conducteur',)
+    readonly_fields = ('created', 'modified')
@@ -0,0 +1,60 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import KeysetPagination
+from apps.patients.models import Conducteur
+from apps.patients.views import ConducteurViewSet
+from utils.generate_fake_data import bulk_create_conducteurs
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares limit/offset and keyset latency for a deep page of drivers (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=100_000, help='Number of drivers to generate')
+        parser.add_argument('-p', '--page', type=int, default=1000, help='Page number to fetch')
+        parser.add_argument('-l', '--limit', type=int, default=20, help='Page size')
+        parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per mode')
+
+    def _time(self, paginator, params, repeat):
+        queryset = ConducteurViewSet.queryset
+        timings = []
+        for _ in range(repeat):
+            request = Request(APIRequestFactory().get('/patients/', params))
+            start = perf_counter()
+            paginator.get_paginated_response(paginator.paginate_queryset(queryset, request))
+            timings.append(perf_counter() - start)
+        return median(timings) * 1000
+
+    def handle(self, *args, **options):
+        limit, page = options['limit'], options['page']
+        offset = (page - 1) * limit
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Generating {options['count']} drivers...")
+                bulk_create_conducteurs(options['count'])
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {Conducteur._meta.db_table}')
+
+                # Curseur de la page demandée : clé de la dernière ligne de la page précédente
+                previous = ConducteurViewSet.queryset[offset - 1] if offset else None
+                cursor = KeysetPagination().cursor_for(previous) if previous else ''
+
+                offset_ms = self._time(LimitOffsetPagination(), {'limit': limit, 'offset': offset}, options['repeat'])
+                keyset_ms = self._time(KeysetPagination(), {'limit': limit, 'cursor': cursor}, options['repeat'])
+                self.stdout.write(f'page {page} ({limit} rows, offset {offset})')
+                self.stdout.write(f'limit/offset {offset_ms:8.1f} ms (COUNT(*) included)')
+                self.stdout.write(f'keyset       {keyset_ms:8.1f} ms (estimated count)')
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,67 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.search import TrigramSearchFilter
+from apps.patients.models import Conducteur
+from apps.patients.views import ConducteurViewSet
+from utils.generate_fake_data import bulk_create_conducteurs
+
+LEGACY_SEARCH_FIELDS = ['first_name', 'last_name', 'email', 'phone_number', 'numero_permis']
+DEFAULT_QUERIES = ['ndiaye', 'helene', 'SN-1234', 'fatou diop', '+22177']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _LegacyView:
+    search_fields = LEGACY_SEARCH_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Compares icontains and trigram patient search latency on generated drivers (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--count', type=int, default=1_000_000, help='Number of drivers to generate')
+        parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per query')
+        parser.add_argument('-b', '--batch-size', type=int, default=10_000)
+        parser.add_argument('-q', '--query', action='append', dest='queries', help='Search terms (repeatable)')
+
+    def _generate(self, count, batch_size):
+        bulk_create_conducteurs(count, batch_size)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Conducteur._meta.db_table}')
+
+    def _time(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = perf_counter()
+            list(queryset[:20])
+            timings.append(perf_counter() - start)
+        return median(timings) * 1000
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        view = ConducteurViewSet()
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Generating {options['count']} drivers...")
+                self._generate(options['count'], options['batch_size'])
+                for term in queries:
+                    request = Request(APIRequestFactory().get('/', {'search': term}))
+                    legacy = filters.SearchFilter().filter_queryset(request, Conducteur.objects.order_by('-created'), _LegacyView())
+                    trigram = TrigramSearchFilter().filter_queryset(request, view.queryset, view)
+                    self.stdout.write(
+                        f'{term!r:<14} icontains {self._time(legacy, options["repeat"]):8.1f} ms   '
+                        f'trigram {self._time(trigram, options["repeat"]):8.1f} ms   '
+                        f'({trigram.count()} match(es))'
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,42 @@
+import time
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.reminders import licence_expiry_reminders_send
+
+
+class Command(BaseCommand):
+    help = 'Queues licence-expiry reminder emails for drivers entering a reminder window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-d',
+            '--days',
+            action='append',
+            type=int,
+            dest='windows',
+            help=f'Reminder window in days before expiry (repeatable, default {settings.LICENCE_EXPIRY_REMINDER_DAYS})',
+        )
+        parser.add_argument(
+            '-c',
+            '--chunk-size',
+            type=int,
+            default=settings.LICENCE_EXPIRY_REMINDER_CHUNK_SIZE,
+            help=f'Drivers locked and notified per transaction (default {settings.LICENCE_EXPIRY_REMINDER_CHUNK_SIZE})',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass every --interval seconds')
+        parser.add_argument('-i', '--interval', type=float, default=60 * 60, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            start = perf_counter()
+            sent = licence_expiry_reminders_send(windows=options['windows'], chunk_size=options['chunk_size'])
+            windows = ', '.join(f'J-{days}: {count}' for days, count in sorted(sent.items())) or 'none'
+            self.stdout.write(self.style.SUCCESS(
+                f'{sum(sent.values())} reminder(s) queued ({windows}) in {perf_counter() - start:.2f} s'
+            ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-18 13:29
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+import django.db.models.functions.text
+import utils.models.functions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        # unaccent() est STABLE : enveloppe IMMUTABLE pour pouvoir l'indexer (utils.models.functions.ImmutableUnaccent)
+        migrations.RunSQL(
+            sql=(
+                "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+                "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+                "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+            ),
+            reverse_sql='DROP FUNCTION IF EXISTS f_unaccent(text)',
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.models.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('first_name')), name='gin_trgm_ops'), name='conducteur_first_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.models.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('last_name')), name='gin_trgm_ops'), name='conducteur_last_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.models.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('email')), name='gin_trgm_ops'), name='conducteur_email_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.models.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('phone_number')), name='gin_trgm_ops'), name='conducteur_phone_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('numero_permis'), name='text_pattern_ops'), name='conducteur_permis_prefix'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicule',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(utils.models.functions.ImmutableUnaccent(django.db.models.functions.text.Lower('modele')), name='gin_trgm_ops'), name='vehicule_modele_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicule',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('immatriculation'), name='text_pattern_ops'), name='vehicule_immat_prefix'),
+        ),
+    ]
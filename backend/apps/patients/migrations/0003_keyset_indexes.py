@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=models.Index(fields=['created', 'id'], name='conducteur_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicule',
+            index=models.Index(fields=['created', 'id'], name='vehicule_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 13:39
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenceExpiryReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('date_peremption_permis', models.DateField(verbose_name='License expiration date')),
+                ('days_before', models.PositiveSmallIntegerField(verbose_name='Days before expiration')),
+            ],
+            options={
+                'verbose_name': 'License expiry reminder',
+                'verbose_name_plural': 'License expiry reminders',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='conducteur',
+            index=models.Index(fields=['date_peremption_permis', 'id'], name='conducteur_peremption_idx'),
+        ),
+        migrations.AddField(
+            model_name='licenceexpiryreminder',
+            name='conducteur',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='licence_reminders', to='patients.conducteur', verbose_name='Driver'),
+        ),
+        migrations.AddConstraint(
+            model_name='licenceexpiryreminder',
+            constraint=models.UniqueConstraint(fields=('conducteur', 'date_peremption_permis', 'days_before'), name='licence_reminder_unique'),
+        ),
+    ]
@@ -1,9 +1,23 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower, Upper
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
 from phonenumber_field.modelfields import PhoneNumberField
 
+from utils.models.functions import ImmutableUnaccent
+
+
+def trigram_index(field, name):
+    """Index GIN pg_trgm sur le champ sans accents ni casse, sert le LIKE et l'opérateur %>."""
+    return GinIndex(OpClass(ImmutableUnaccent(Lower(field)), name='gin_trgm_ops'), name=name)
+
+
+def prefix_index(field, name):
+    """Index B-tree sur le champ en majuscules, sert le LIKE 'ABC%' des recherches par préfixe."""
+    return models.Index(OpClass(Upper(field), name='text_pattern_ops'), name=name)
+
 
 class Conducteur(TimeStampedModel):
     TYPE_PERMIS_CHOICES = [
@@ -72,6 +86,15 @@ class Conducteur(TimeStampedModel):
     class Meta:
         verbose_name = _('Driver')
         verbose_name_plural = _('Drivers')
+        indexes = [
+            trigram_index('first_name', 'conducteur_first_name_trgm'),
+            trigram_index('last_name', 'conducteur_last_name_trgm'),
+            trigram_index('email', 'conducteur_email_trgm'),
+            trigram_index('phone_number', 'conducteur_phone_trgm'),
+            prefix_index('numero_permis', 'conducteur_permis_prefix'),
+            models.Index(fields=['created', 'id'], name='conducteur_created_id_idx'),
+            models.Index(fields=['date_peremption_permis', 'id'], name='conducteur_peremption_idx'),
+        ]
 
     def clean(self):
         super().clean()
@@ -106,6 +129,32 @@ class Vehicule(TimeStampedModel):
     class Meta:
         verbose_name = _('Vehicle')
         verbose_name_plural = _('Vehicles')
+        indexes = [
+            trigram_index('modele', 'vehicule_modele_trgm'),
+            prefix_index('immatriculation', 'vehicule_immat_prefix'),
+            models.Index(fields=['created', 'id'], name='vehicule_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.modele} | {self.immatriculation}"
+
+
+class LicenceExpiryReminder(TimeStampedModel):
+    """Rappel d'expiration déjà envoyé : un par conducteur, date de péremption et fenêtre (jours avant)."""
+    conducteur = models.ForeignKey(
+        Conducteur, on_delete=models.CASCADE, related_name='licence_reminders', verbose_name=_('Driver')
+    )
+    date_peremption_permis = models.DateField(_('License expiration date'))
+    days_before = models.PositiveSmallIntegerField(_('Days before expiration'))
+
+    class Meta:
+        verbose_name = _('License expiry reminder')
+        verbose_name_plural = _('License expiry reminders')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['conducteur', 'date_peremption_permis', 'days_before'], name='licence_reminder_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.conducteur_id} | {self.date_peremption_permis} (J-{self.days_before})"
@@ -1,36 +1,46 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+
+from api.pagination import KeysetPagination
+from api.prefetch import PrefetchPlanMixin
+from api.search import TrigramSearchFilter
 from .models import Vehicule, Conducteur
 from serializers.patients import VehiculeSerializer, ConducteurSerializer
+from services.patients import vehicule_delete
+from utils.replicas import ReplicaListMixin
 
 
-class VehiculeViewSet(viewsets.ModelViewSet):
-    queryset = Vehicule.objects.select_related('conducteur').all().order_by('-created')
+class VehiculeViewSet(ReplicaListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
+    queryset = Vehicule.objects.all().order_by('-created', '-id')
     serializer_class = VehiculeSerializer
     permission_classes = [IsAuthenticated]
-    filterset_fields = ['conducteur']
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    filterset_fields = ['conducteur', 'type_vehicule_conduit']
+    filter_backends = [TrigramSearchFilter, DjangoFilterBackend]
     search_fields = [
-        'immatriculation',
+        '^immatriculation',
         'modele',
-        'type_vehicule_conduit',
         'conducteur__first_name',
         'conducteur__last_name'
     ]
 
-class ConducteurViewSet(viewsets.ModelViewSet):
-    queryset = Conducteur.objects.all().order_by('-created')
+    def perform_destroy(self, instance):
+        vehicule_delete(instance)
+
+class ConducteurViewSet(ReplicaListMixin, PrefetchPlanMixin, viewsets.ModelViewSet):
+    queryset = Conducteur.objects.all().order_by('-created', '-id')
     serializer_class = ConducteurSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     # Ajout des filtres
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = [TrigramSearchFilter, DjangoFilterBackend]
     filterset_fields = ['numero_permis', 'type_permis']
     search_fields = [
         'first_name',
         'last_name',
         'email',
         'phone_number',
-        'numero_permis'
+        '^numero_permis'
     ]
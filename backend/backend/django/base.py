@@ -37,6 +37,7 @@ LOCAL_APPS = [
     'apps.patients.apps.PatientsConfig',
     'apps.examens.apps.ClinicalExamenConfig',
     'apps.health_record.apps.HealthRecordConfig',
+    'apps.analytics.apps.AnalyticsConfig',
 ]
 
 THIRD_PARTY_APPS = [
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'django.contrib.postgres',
     # http://whitenoise.evans.io/en/stable/django.html#using-whitenoise-in-development
     'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
@@ -71,6 +73,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "utils.replicas.ReplicaPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -114,6 +117,46 @@ DATABASES = {
     }
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Vérifie une connexion réutilisée avant la requête, la remplace si le serveur l'a fermée
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Pool psycopg 3 (psycopg-pool) : les connexions sont partagées par les threads du processus
+# au lieu d'être ouvertes à chaque requête. Sans pool, connexions persistantes (CONN_MAX_AGE).
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False)
+if DATABASE_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            # Attente max (s) d'une connexion libre avant PoolTimeout
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+            "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=300),
+            "max_lifetime": env.float("DATABASE_POOL_MAX_LIFETIME", default=3600),
+            # Contrôle de santé à chaque emprunt : une connexion coupée n'est jamais rendue à une requête
+            "check": ConnectionPool.check_connection,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DATABASE_CONN_MAX_AGE", default=60)
+
+# Réplica en lecture (utils.replicas) : dashboards, exports, listes et recherche déclarés replica_safe.
+# Sans DATABASE_REPLICA_HOST, tout est lu sur `default`.
+REPLICA_DATABASE_ALIAS = "replica"
+if env("DATABASE_REPLICA_HOST", default=None):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES["default"],
+        "HOST": env("DATABASE_REPLICA_HOST"),
+        "PORT": env("DATABASE_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "NAME": env("DATABASE_REPLICA_NAME", default=DATABASES["default"]["NAME"]),
+        "ATOMIC_REQUESTS": False,
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["utils.replicas.ReplicaRouter"]
+# Durée (s) pendant laquelle un utilisateur qui vient d'écrire lit sur `default` (> retard de réplication).
+# L'épinglage est conservé dans le cache partagé REPLICA_PIN_CACHE (backend/settings/caches.py).
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
 
 
 # Password validation
@@ -189,6 +232,10 @@ REST_FRAMEWORK = {
 
 
 from backend.settings.authemail import *
+from backend.settings.caches import *
+from backend.settings.reminders import *
+from backend.settings.uploads import *
+from backend.settings.media import *
 from backend.settings.drf_spectacular import *
 from backend.settings.ipware import *
 from backend.settings.simple_jwt import *
@@ -1,5 +1,10 @@
+import os
+
 from backend.env import env
 
+# Pool de connexions activé par défaut en production (voir DATABASE_POOL dans base)
+os.environ.setdefault("DATABASE_POOL", "True")
+
 from .base import *  # noqa
 
 DEBUG = env.bool("DJANGO_DEBUG", default=False)
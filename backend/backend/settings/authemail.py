@@ -19,6 +19,15 @@ EMAIL_HOST_USER = os.environ.get('AUTHEMAIL_EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('AUTHEMAIL_EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
+# Un serveur SMTP lent ne bloque pas le worker d'envoi indéfiniment
+EMAIL_TIMEOUT = 30
+
+# File d'envoi (apps.authemail.models.OutgoingEmail), vidée par `manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Délai avant la n-ième nouvelle tentative : BACKOFF * 2^(n-1) secondes, plafonné à MAX_BACKOFF
+EMAIL_OUTBOX_BACKOFF = 60
+EMAIL_OUTBOX_MAX_BACKOFF = 60 * 60
 
 # Additionnal verfication when an user sign up
 AUTH_EMAIL_VERIFICATION = False
\ No newline at end of file
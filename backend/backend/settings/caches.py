@@ -0,0 +1,45 @@
+import os
+from backend.env import BASE_DIR, env
+
+# Cache des dossiers médicaux sérialisés (services.dossiers), choisi par DOSSIER_CACHE_BACKEND :
+# - locmem : LRU en mémoire, borné à DOSSIER_CACHE_MAX_ENTRIES dossiers, propre à chaque processus
+# - file : répertoire partagé entre les processus d'une machine
+# - db : table partagée par tous les nœuds (créer la table avec `manage.py createcachetable`)
+DOSSIER_CACHE_ALIAS = 'dossiers'
+DOSSIER_CACHE_BACKEND = env('DOSSIER_CACHE_BACKEND', default='locmem')
+DOSSIER_CACHE_OPTIONS = {'MAX_ENTRIES': env.int('DOSSIER_CACHE_MAX_ENTRIES', default=1000)}
+
+DOSSIER_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dossiers',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('DOSSIER_CACHE_LOCATION', default=os.path.join(BASE_DIR, '.cache', 'dossiers')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'dossier_cache',
+    },
+}
+
+# Épinglage sur `default` des utilisateurs qui viennent d'écrire (utils.replicas) : il doit être vu
+# de tous les workers, d'où une table partagée (`manage.py createcachetable`). Un cache propre
+# au processus est refusé dès qu'un réplica est configuré.
+REPLICA_PIN_CACHE = 'replica_pins'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    DOSSIER_CACHE_ALIAS: {
+        **DOSSIER_CACHE_BACKENDS[DOSSIER_CACHE_BACKEND],
+        'TIMEOUT': env.int('DOSSIER_CACHE_TIMEOUT', default=60 * 60),
+        'OPTIONS': DOSSIER_CACHE_OPTIONS,
+    },
+    REPLICA_PIN_CACHE: {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'replica_pin_cache',
+    },
+}
@@ -0,0 +1,10 @@
+from backend.env import env
+
+# Service des fichiers d'examen (api.media) : délégué au serveur web quand il est devant Django.
+# - None : FileResponse (Range géré par Django, fichier lu par blocs)
+# - 'x-accel-redirect' : nginx, location interne MEDIA_SENDFILE_PREFIX pointant sur MEDIA_ROOT
+# - 'x-sendfile' : Apache mod_xsendfile / lighttpd, chemin absolu du fichier
+MEDIA_SENDFILE = env('MEDIA_SENDFILE', default=None)
+MEDIA_SENDFILE_PREFIX = env('MEDIA_SENDFILE_PREFIX', default='/protected/')
+# Noms adressés par le contenu : le fichier derrière une URL ne change jamais
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
@@ -0,0 +1,5 @@
+from backend.env import env
+
+# Rappels d'expiration du permis (services.reminders) : un email par fenêtre, N jours avant la date
+LICENCE_EXPIRY_REMINDER_DAYS = env.list('LICENCE_EXPIRY_REMINDER_DAYS', cast=int, default=[30, 7])
+LICENCE_EXPIRY_REMINDER_CHUNK_SIZE = 1000
@@ -0,0 +1,18 @@
+import os
+from backend.env import BASE_DIR, env
+
+# Envois par morceaux (services.uploads) : fichiers partiels hors du stockage des médias,
+# de préférence sur le même système de fichiers pour que la finalisation soit un simple déplacement
+CHUNKED_UPLOAD_DIR = env('CHUNKED_UPLOAD_DIR', default=os.path.join(BASE_DIR, '.uploads'))
+CHUNKED_UPLOAD_MAX_SIZE = env.int('CHUNKED_UPLOAD_MAX_SIZE', default=2 * 1024 ** 3)
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = env.int('CHUNKED_UPLOAD_MAX_CHUNK_SIZE', default=16 * 1024 ** 2)
+# Taille des blocs lus dans le corps de la requête : borne la mémoire utilisée par un envoi
+CHUNKED_UPLOAD_BLOCK_SIZE = 1024 ** 2
+# Envois abandonnés supprimés par `manage.py clean_chunked_uploads` après ce délai (heures)
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Fichiers d'examen (périmétrie, rétinographie, OCT) : dédupliqués par empreinte du contenu.
+# django.core.files.storage.FileSystemStorage pour revenir à un fichier par envoi.
+EXAM_MEDIA_STORAGE = env('EXAM_MEDIA_STORAGE', default='utils.storage.ContentAddressedStorage')
+# Délai avant qu'un blob non référencé soit supprimé : couvre les envois pas encore validés (heures)
+MEDIA_BLOB_GRACE_HOURS = 1
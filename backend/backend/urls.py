@@ -5,6 +5,8 @@ from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from rest_framework.routers import DefaultRouter
 
+from apps.examens.views import ExamMediaView
+
 
 router = DefaultRouter()
 
@@ -44,6 +46,9 @@ urlpatterns = [
     # routes pour les statistiques
     , path('analytics/', include('apps.analytics.urls'), name='analytics'),
 
+    # fichiers d'examen : authentifiés, avant le service des médias en développement
+    path('media/images/<path:path>', ExamMediaView.as_view(), name='exam-media'),
+
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
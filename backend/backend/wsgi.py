@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.django.base')
+django.setup(set_prefix=False)
 
-application = get_wsgi_application()
+from api.transactions import ReadOnlyRequestsWSGIHandler  # noqa: E402
+
+# Comme get_wsgi_application(), sans transaction de requête pour les GET (api.transactions)
+application = ReadOnlyRequestsWSGIHandler()
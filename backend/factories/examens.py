@@ -228,4 +228,17 @@ class ExamensFactory(BaseFactory):
     
     technical_examen = factory.SubFactory(TechnicalExamenFactory)
     clinical_examen = factory.SubFactory(ClinicalExamenFactory)
-    is_completed = True
\ No newline at end of file
+    is_completed = True
+
+class VisiteExamensFactory(ExamensFactory):
+    """Examen dont les examens technique et clinique partagent le patient et la visite."""
+    technical_examen = factory.SubFactory(
+        TechnicalExamenFactory,
+        patient=factory.SelfAttribute('..patient'),
+        visite=factory.SelfAttribute('..visite'),
+    )
+    clinical_examen = factory.SubFactory(
+        ClinicalExamenFactory,
+        patient=factory.SelfAttribute('..patient'),
+        visite=factory.SelfAttribute('..visite'),
+    )
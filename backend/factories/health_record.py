@@ -30,12 +30,16 @@ class DriverExperienceFactory(DjangoModelFactory):
     nombre_accidents = factory.fuzzy.FuzzyInteger(0, 5)
     tranche_horaire = factory.fuzzy.FuzzyChoice(["Journée", "Nuit", "Mixte"])
     corporel_dommage = factory.fuzzy.FuzzyChoice([True, False])
-    materiel_dommage_type = factory.LazyAttribute(
-        lambda o: factory.fuzzy.FuzzyChoice([DommageChoices.MODERE, DommageChoices.LEGER, DommageChoices.IMPORTANT]) if o.materiel_dommage else None
+    corporel_dommage_type = factory.Maybe(
+        'corporel_dommage',
+        yes_declaration=factory.fuzzy.FuzzyChoice(DommageChoices.values),
+        no_declaration=None,
     )
     materiel_dommage = factory.fuzzy.FuzzyChoice([True, False])
-    materiel_dommage_type = factory.LazyAttribute(
-        lambda o: factory.fuzzy.FuzzyChoice([DommageChoices.MODERE, DommageChoices.LEGER, DommageChoices.IMPORTANT]) if o.materiel_dommage else None
+    materiel_dommage_type = factory.Maybe(
+        'materiel_dommage',
+        yes_declaration=factory.fuzzy.FuzzyChoice(DommageChoices.values),
+        no_declaration=None,
     )
     date_visite = factory.Faker(
         "date_between",
@@ -1,26 +1,85 @@
+from django.db.models import F
 
-from .examens import get_nombre_incompatibles, get_nombre_tonus_superieur_a_21, get_tonus_moyen
-from .health_record import get_evolution_visites, get_nombre_patients_a_risque
-from .patients import get_age_moyen, get_duree_moyenne_conduite, get_nombre_par_categorie_permis, get_nombre_patients, get_nombre_professionnels
+from apps.examens.models import Examens
+from utils.replicas import replica_safe
+from .examens import get_conclusion_kpis, get_tonus_kpis
+from .health_record import get_evolution_visites_groupes, get_nombre_patients_a_risque
+from .patients import get_conducteur_kpis
+
+# Colonne de ExamFact -> lookup depuis Examens
+EXAM_FACT_SOURCES = {
+    'patient_id': 'patient_id',
+    'visite': 'visite',
+    'is_completed': 'is_completed',
+    'sexe': 'patient__sexe',
+    'type_permis': 'patient__type_permis',
+    'transporteur_professionnel': 'patient__transporteur_professionnel',
+    'service': 'patient__service',
+    'avsc_od': 'technical_examen__visual_acuity__avsc_od',
+    'avsc_og': 'technical_examen__visual_acuity__avsc_og',
+    'avac_od': 'technical_examen__visual_acuity__avac_od',
+    'avac_og': 'technical_examen__visual_acuity__avac_og',
+    'correction_optique': 'technical_examen__refraction__correction_optique',
+    'tonus_od': 'technical_examen__ocular_tension__od',
+    'tonus_og': 'technical_examen__ocular_tension__og',
+    'ttt_hypotonisant': 'technical_examen__ocular_tension__ttt_hypotonisant',
+    'pachymetrie_od': 'technical_examen__pachymetry__od',
+    'pachymetrie_og': 'technical_examen__pachymetry__og',
+    'symptome_od': 'clinical_examen__od__plaintes__eye_symptom',
+    'symptome_og': 'clinical_examen__og__plaintes__eye_symptom',
+    'diplopie_od': 'clinical_examen__od__plaintes__diplopie',
+    'diplopie_og': 'clinical_examen__og__plaintes__diplopie',
+    'strabisme_od': 'clinical_examen__od__plaintes__strabisme',
+    'strabisme_og': 'clinical_examen__og__plaintes__strabisme',
+    'nystagmus_od': 'clinical_examen__od__plaintes__nystagmus',
+    'nystagmus_og': 'clinical_examen__og__plaintes__nystagmus',
+    'ptosis_od': 'clinical_examen__od__plaintes__ptosis',
+    'ptosis_og': 'clinical_examen__og__plaintes__ptosis',
+    'perimetrie_binoculaire': 'clinical_examen__perimetry__pbo',
+    'score_esterman': 'clinical_examen__perimetry__score_esternmen',
+    'vision': 'clinical_examen__conclusion__vision',
+    'rv': 'clinical_examen__conclusion__rv',
+}
 
 
 class DashboardStatsSelector:
+    # Une section par table source, chacune calculée en une seule requête
+    # et renvoyant une partie des clés du dashboard employé
+    EMPLOYEE_SECTIONS = {
+        'conducteurs': get_conducteur_kpis,
+        'tonus': get_tonus_kpis,
+        'conclusions': lambda: {'nombre_incompatibles': get_conclusion_kpis()['nombre_incompatibles']},
+        'dossiers': lambda: {'patients_risque_dossier': get_nombre_patients_a_risque()},
+        'evolution_visites': lambda: {'evolution_visites': get_evolution_visites_groupes()},
+    }
+
+    # Sections à recalculer quand un modèle source change (clé: "app_label.ModelName").
+    # 'tonus' et 'conclusions' lisent ExamFact, invalidées par services.analytics.exam_facts_refresh
+    EMPLOYEE_SECTION_DEPENDENCIES = {
+        'patients.Conducteur': ['conducteurs'],
+        'health_record.HealthRecord': ['dossiers'],
+        'health_record.DriverExperience': ['evolution_visites'],
+    }
+
+    @classmethod
+    def compute_section(cls, name):
+        return cls.EMPLOYEE_SECTIONS[name]()
 
     @classmethod
+    @replica_safe
     def employee_stats(cls):
-        return {
-            'nombre_total_patients': get_nombre_patients(),
-            'age_moyen': get_age_moyen(),
-            'nombre_professionnels': get_nombre_professionnels(),
-            'duree_moyenne_conduite': get_duree_moyenne_conduite(),
-            'distribution_permis': get_nombre_par_categorie_permis(),
-            'tonus_moyen': get_tonus_moyen(),
-            'tonus_superieur_a_21': get_nombre_tonus_superieur_a_21(),
-            'nombre_incompatibles': get_nombre_incompatibles(),
-            'patients_risque_dossier': get_nombre_patients_a_risque(),
-            'evolution_visites': {
-                'par_mois': get_evolution_visites(group_by='mois'),
-                'par_semaine': get_evolution_visites(group_by='semaine'),
-                'par_annee': get_evolution_visites(group_by='annee'),
-            },
-        }
+        stats = {}
+        for compute in cls.EMPLOYEE_SECTIONS.values():
+            stats.update(compute())
+        return stats
+
+
+def get_exam_fact_rows(examens=None):
+    """
+    Valeurs de la table de faits calculées depuis les examens (une requête, LEFT JOIN sur les sous-modèles).
+    `examens` : queryset d'Examens à restreindre (tous par défaut).
+    """
+    examens = Examens.objects.all() if examens is None else examens
+    fields = [name for name, path in EXAM_FACT_SOURCES.items() if name == path]
+    expressions = {name: F(path) for name, path in EXAM_FACT_SOURCES.items() if name != path}
+    return examens.order_by('pk').values('id', *fields, **expressions)
@@ -1,25 +1,68 @@
-from django.db.models import Avg, Q
-from apps.examens.models import OcularTension, Conclusion
+from django.db.models import Avg, Count, Q
+from apps.analytics.models import ExamFact
+
+# Les indicateurs d'examens lisent la table de faits ExamFact (une ligne par visite) :
+# un seul scan de table, sans jointure vers les sous-modèles.
+
+TONUS_ELEVE = Q(tonus_od__gt=21) | Q(tonus_og__gt=21)
 
 
 # ➤ Tonus moyen (OD et OG)
 def get_tonus_moyen():
-    return OcularTension.objects.aggregate(
-        tonus_moyen_od=Avg('od'),
-        tonus_moyen_og=Avg('og')
+    return ExamFact.objects.aggregate(
+        tonus_moyen_od=Avg('tonus_od'),
+        tonus_moyen_og=Avg('tonus_og')
     )
 
 
-# ➤ Nombre de patients avec tonus supérieur à 21
+# ➤ Nombre de visites avec tonus supérieur à 21
 def get_nombre_tonus_superieur_a_21():
-    return OcularTension.objects.filter(Q(od__gt=21) | Q(og__gt=21)).count()
+    return ExamFact.objects.filter(TONUS_ELEVE).count()
 
 
 # ➤ Nombre de conclusions "incompatible"
 def get_nombre_incompatibles():
-    return Conclusion.objects.filter(vision='incompatible').count()
+    return ExamFact.objects.filter(vision='incompatible').count()
 
 
 # ➤ Nombre de conclusions "à risque"
 def get_nombre_a_risque():
-    return Conclusion.objects.filter(vision='a_risque').count()
+    return ExamFact.objects.filter(vision='a_risque').count()
+
+
+# ➤ Indicateurs de tonus en une seule requête
+def get_tonus_kpis():
+    kpis = ExamFact.objects.aggregate(
+        tonus_moyen_od=Avg('tonus_od'),
+        tonus_moyen_og=Avg('tonus_og'),
+        tonus_superieur_a_21=Count('id', filter=TONUS_ELEVE),
+    )
+    return {
+        'tonus_moyen': {
+            'tonus_moyen_od': kpis['tonus_moyen_od'],
+            'tonus_moyen_og': kpis['tonus_moyen_og'],
+        },
+        'tonus_superieur_a_21': kpis['tonus_superieur_a_21'],
+    }
+
+
+# ➤ Répartition des conclusions en une seule requête
+def get_conclusion_kpis():
+    return ExamFact.objects.aggregate(
+        nombre_incompatibles=Count('id', filter=Q(vision='incompatible')),
+        nombre_a_risque=Count('id', filter=Q(vision='a_risque')),
+    )
+
+
+# ➤ Tonus élevé par type de permis, ex: transporteurs professionnels avec diplopie
+def get_tonus_eleve_par_permis(**filters):
+    """
+    :param filters: filtres sur ExamFact (ex: transporteur_professionnel=True, diplopie_od=True)
+    :return: List[{"type_permis": "lourd", "visites": 12, "tonus_superieur_a_21": 3}, ...]
+    """
+    return list(
+        ExamFact.objects.filter(**filters)
+        .values('type_permis')
+        .annotate(visites=Count('id'), tonus_superieur_a_21=Count('id', filter=TONUS_ELEVE))
+        .order_by('type_permis')
+    )
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import F, FilteredRelation, OuterRef, Q, Subquery
+
+from apps.examens.models import (
+    BiomicroscopySegmentAnterieur, BiomicroscopySegmentPosterieur, Conclusion, Examens, OcularTension, Pachymetry,
+    Perimetry, Plaintes, Refraction, VisualAcuity
+)
+from apps.health_record.models import Antecedent, DriverExperience, HealthRecord
+from apps.patients.models import Conducteur, Vehicule
+from utils.exports import stream_csv, stream_parquet
+from utils.replicas import replica_safe
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+EXCLUDED_FIELDS = {'id', 'created', 'modified', 'image', 'images'}
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str  # en-tête du fichier, ex: "technical_examen.visual_acuity.avsc_od"
+    path: str  # lookup ORM depuis Examens
+    field: object  # champ de modèle, sert au typage Parquet
+
+
+def _model_columns(prefix, model):
+    return [
+        ExportColumn(f"{prefix.replace('__', '.')}.{f.name}", f'{prefix}__{f.name}', f)
+        for f in model._meta.concrete_fields
+        if not f.is_relation and f.name not in EXCLUDED_FIELDS
+    ]
+
+
+def _eye_columns(side):
+    return [
+        *_model_columns(f'clinical_examen__{side}__plaintes', Plaintes),
+        *_model_columns(f'clinical_examen__{side}__bp_sg_anterieur', BiomicroscopySegmentAnterieur),
+        *_model_columns(f'clinical_examen__{side}__bp_sg_posterieur', BiomicroscopySegmentPosterieur),
+    ]
+
+
+# Une ligne par visite (Examens), toutes les tables jointes à plat
+EXPORT_COLUMNS = [
+    ExportColumn('examen.id', 'id', Examens._meta.pk),
+    ExportColumn('examen.visite', 'visite', Examens._meta.get_field('visite')),
+    ExportColumn('examen.is_completed', 'is_completed', Examens._meta.get_field('is_completed')),
+    ExportColumn('examen.created', 'created', Examens._meta.get_field('created')),
+    ExportColumn('patient.id', 'patient_id', Conducteur._meta.pk),
+    *_model_columns('patient', Conducteur),
+    ExportColumn('vehicules.immatriculation', 'vehicules', Vehicule._meta.get_field('immatriculation')),
+    ExportColumn('health_record.risky_patient', 'patient__health_record__risky_patient',
+                 HealthRecord._meta.get_field('risky_patient')),
+    *_model_columns('patient__antecedents', Antecedent),
+    *_model_columns('driver_experience', DriverExperience),
+    *_model_columns('technical_examen__visual_acuity', VisualAcuity),
+    *_model_columns('technical_examen__refraction', Refraction),
+    *_model_columns('technical_examen__ocular_tension', OcularTension),
+    *_model_columns('technical_examen__pachymetry', Pachymetry),
+    *_eye_columns('og'),
+    *_eye_columns('od'),
+    *_model_columns('clinical_examen__perimetry', Perimetry),
+    *_model_columns('clinical_examen__conclusion', Conclusion),
+]
+
+
+def get_visit_export_queryset():
+    """
+    Une seule requête pour tout le jeu de données : les relations mono-valuées sont des LEFT JOIN,
+    l'expérience de conduite est jointe sur (patient, visite) et les véhicules agrégés en sous-requête.
+    """
+    vehicules = (
+        Vehicule.objects.filter(conducteur=OuterRef('patient'))
+        .values('conducteur')
+        .annotate(immatriculations=StringAgg('immatriculation', delimiter='|', ordering='immatriculation'))
+        .values('immatriculations')
+    )
+    return (
+        Examens.objects
+        .annotate(
+            driver_experience=FilteredRelation(
+                'patient__driverexperience',
+                condition=Q(patient__driverexperience__visite=F('visite')),
+            ),
+            vehicules=Subquery(vehicules),
+        )
+        .order_by('patient_id', 'visite')
+        .values_list(*(column.path for column in EXPORT_COLUMNS))
+    )
+
+
+def iter_visit_export_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """Parcourt les visites via un curseur serveur, sans charger le jeu de données en mémoire."""
+    return get_visit_export_queryset().iterator(chunk_size=chunk_size)
+
+
+@replica_safe
+def export_visits(file_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Flux d'octets/chaînes de l'export complet au format `csv` ou `parquet`."""
+    rows = iter_visit_export_rows(chunk_size=chunk_size)
+    if file_format == 'parquet':
+        return stream_parquet([(column.name, column.field) for column in EXPORT_COLUMNS], rows, chunk_size)
+    return stream_csv([column.name for column in EXPORT_COLUMNS], rows)
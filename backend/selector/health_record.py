@@ -1,12 +1,20 @@
+from collections import Counter
+from datetime import timedelta
+
 from django.db.models import Count
 from apps.health_record.models import DriverExperience, HealthRecord
 from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
 
 
+PERIODE_FORMATS = {
+    "mois": "%Y-%m",
+    "semaine": "Semaine %W %Y",
+    "annee": "%Y",
+}
+
 
 # ➤ Nombre de patients marqués "à risque" dans leur dossier médical
 def get_nombre_patients_a_risque():
-    count = HealthRecord.objects.filter(risky_patient=True).count()
     return HealthRecord.objects.filter(risky_patient=True).count()
 
 
@@ -41,11 +49,36 @@ def get_evolution_visites(group_by="mois"):
     )
 
     return [
-        {"periode": v["periode"].strftime({
-            "mois": "%Y-%m",
-            "semaine": "Semaine %W %Y",
-            "annee": "%Y"
-        }[group_by]), "nombre": v["nombre"]}
+        {"periode": v["periode"].strftime(PERIODE_FORMATS[group_by]), "nombre": v["nombre"]}
         for v in visites
     ]
 
+
+def get_evolution_visites_groupes():
+    """
+    Même résultat que get_evolution_visites pour les trois regroupements,
+    mais en une seule requête : on compte les visites par jour puis on cumule
+    par semaine, mois et année côté Python (quelques centaines de jours au plus).
+    """
+    par_jour = (
+        DriverExperience.objects
+        .filter(date_visite__isnull=False)
+        .values('date_visite')
+        .annotate(nombre=Count('id'))
+        .order_by('date_visite')
+    )
+
+    periodes = {group_by: Counter() for group_by in PERIODE_FORMATS}
+    for row in par_jour:
+        jour, nombre = row['date_visite'], row['nombre']
+        periodes['semaine'][jour - timedelta(days=jour.weekday())] += nombre
+        periodes['mois'][jour.replace(day=1)] += nombre
+        periodes['annee'][jour.replace(month=1, day=1)] += nombre
+
+    return {
+        f'par_{group_by}': [
+            {"periode": periode.strftime(PERIODE_FORMATS[group_by]), "nombre": nombre}
+            for periode, nombre in sorted(periodes[group_by].items())
+        ]
+        for group_by in ('mois', 'semaine', 'annee')
+    }
@@ -1,7 +1,7 @@
 from typing import Optional, List
 
 from django.db import models
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Q
 
 from apps.patients.models import Conducteur, Vehicule
 
@@ -44,6 +44,29 @@ def get_nombre_professionnels():
     return Conducteur.objects.filter(transporteur_professionnel=True).count()
 
 
+def get_conducteur_kpis():
+    """
+    Tous les indicateurs conducteurs du dashboard en une seule agrégation conditionnelle.
+    """
+    today = date.today()
+    permis = [value for value, _ in Conducteur.TYPE_PERMIS_CHOICES]
+    kpis = Conducteur.objects.annotate(
+        age=today.year - models.functions.ExtractYear('date_naissance')
+    ).aggregate(
+        nombre_total_patients=Count('id'),
+        age_moyen=Avg('age'),
+        nombre_professionnels=Count('id', filter=Q(transporteur_professionnel=True)),
+        duree_moyenne_conduite=Avg('annees_experience'),
+        **{f'permis_{value}': Count('id', filter=Q(type_permis=value)) for value in permis},
+    )
+    kpis['distribution_permis'] = [
+        {'type_permis': value, 'nombre': nombre}
+        for value in permis
+        if (nombre := kpis.pop(f'permis_{value}'))
+    ]
+    return kpis
+
+
 def get_distribution_par_zone():
     # Nécessite un champ `zone` ou `adresse` ou `localisation` dans le modèle, sinon à adapter
     return Conducteur.objects.values('adresse__ville').annotate(nombre=Count('id'))
@@ -1,8 +1,12 @@
+from collections import defaultdict
 from typing import Optional, List, Dict, Any
 
 from apps.users.models import User, Profile
 
-from django.db.models import Count
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from utils.replicas import replica_safe
 
 
 
@@ -44,15 +48,15 @@ def profile_list(*, filters: Optional[Dict[str, Any]] = None) -> List[Profile]:
     return qs
 
 def get_user_kpis():
-    return {
-        "total_users": User.objects.count(),
-        "admins": User.objects.filter(role="admin").count(),
-        "doctors": User.objects.filter(role="doctor").count(),
-        "technicians": User.objects.filter(role="technician").count(),
-        "employees": User.objects.filter(role="employee").count(),
-        "active_users": User.objects.filter(is_active=True).count(),
-        "inactive_users": User.objects.filter(is_active=False).count(),
-    }
+    return User.objects.aggregate(
+        total_users=Count("id"),
+        admins=Count("id", filter=Q(role=User.Role.ADMIN)),
+        doctors=Count("id", filter=Q(role=User.Role.DOCTOR)),
+        technicians=Count("id", filter=Q(role=User.Role.TECHNICIAN)),
+        employees=Count("id", filter=Q(role=User.Role.EMPLOYEE)),
+        active_users=Count("id", filter=Q(is_active=True)),
+        inactive_users=Count("id", filter=Q(is_active=False)),
+    )
 
 def get_user_roles_distribution():
     return list(
@@ -60,10 +64,56 @@ def get_user_roles_distribution():
     )
 
 def get_users_created_per_month():
-    from django.db.models.functions import TruncMonth
     return list(
         User.objects.annotate(month=TruncMonth("created"))
         .values("month")
         .annotate(count=Count("id"))
         .order_by("month")
-    )
\ No newline at end of file
+    )
+
+# Clés des KPIs par rôle dans get_user_kpis
+KPI_ROLES = {
+    User.Role.ADMIN: "admins",
+    User.Role.DOCTOR: "doctors",
+    User.Role.TECHNICIAN: "technicians",
+    User.Role.EMPLOYEE: "employees",
+}
+
+@replica_safe
+def get_admin_dashboard_stats():
+    """
+    Construit tout le dashboard admin en une seule requête :
+    un GROUP BY (mois, rôle, actif) dont on déduit les KPIs,
+    la distribution des rôles et les créations par mois.
+    """
+    rows = (
+        User.objects.annotate(month=TruncMonth("created"))
+        .values("month", "role", "is_active")
+        .annotate(count=Count("id"))
+        .order_by("month")
+    )
+
+    kpis = dict.fromkeys(
+        ["total_users", *KPI_ROLES.values(), "active_users", "inactive_users"], 0
+    )
+    roles = defaultdict(int)
+    months = defaultdict(int)
+    for row in rows:
+        count = row["count"]
+        kpis["total_users"] += count
+        kpis["active_users" if row["is_active"] else "inactive_users"] += count
+        if row["role"] in KPI_ROLES:
+            kpis[KPI_ROLES[row["role"]]] += count
+        roles[row["role"]] += count
+        months[row["month"]] += count
+
+    return {
+        "kpis": kpis,
+        "roles_distribution": [
+            {"role": role, "count": count}
+            for role, count in sorted(roles.items(), key=lambda item: -item[1])
+        ],
+        "users_created_per_month": [
+            {"month": month, "count": count} for month, count in months.items()
+        ],
+    }
@@ -0,0 +1,93 @@
+from collections import namedtuple
+from hashlib import md5
+
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+from apps.examens.models import ClinicalExamen, Examens, TechnicalExamen
+from apps.health_record.models import DriverExperience, HealthRecord
+from apps.patients.models import Vehicule
+
+# Version d'une ressource pour les GET conditionnels (ETag / Last-Modified), voir api.conditional
+Version = namedtuple('Version', ['last_modified', 'etag'])
+
+TECHNICAL_PARTS = ['visual_acuity', 'refraction', 'ocular_tension', 'pachymetry']
+EYE_PARTS = ['plaintes', 'bp_sg_anterieur', 'bp_sg_posterieur']
+CLINICAL_PARTS = [
+    'og', 'od',
+    *(f'{eye}__{part}' for eye in ('og', 'od') for part in EYE_PARTS),
+    'perimetry', 'bp_sup', 'conclusion',
+]
+EXAMEN_PARTS = [
+    'technical_examen', *(f'technical_examen__{part}' for part in TECHNICAL_PARTS),
+    'clinical_examen', *(f'clinical_examen__{part}' for part in CLINICAL_PARTS),
+]
+
+
+def latest_modified(*parts):
+    """Plus grand `modified` de la ligne et des relations mono-valuées `parts` (Greatest ignore les NULL)."""
+    return Greatest(F('modified'), *(F(f'{part}__modified') for part in parts))
+
+
+def _version(resource, last_modified, *state):
+    if last_modified is None:
+        return None
+    etag = md5(repr((resource, last_modified.isoformat(), *state)).encode()).hexdigest()
+    return Version(last_modified, etag)
+
+
+def _aggregate(queryset, group_by, latest):
+    """Sous-requêtes (dernier modified, nombre de lignes) d'une relation multi-valuée."""
+    grouped = queryset.order_by().values(group_by)
+    return (
+        Subquery(grouped.annotate(latest=Max(latest)).values('latest')),
+        Subquery(grouped.annotate(total=Count('pk')).values('total')),
+    )
+
+
+def get_examen_version(examen_id):
+    """Version d'un Examens et de tous ses sous-examens, en une requête."""
+    row = Examens.objects.filter(pk=examen_id).values_list(
+        latest_modified(*EXAMEN_PARTS), 'technical_examen_id', 'clinical_examen_id'
+    ).first()
+    return _version('examen', *row) if row else None
+
+
+def get_technical_examen_version(technical_examen_id):
+    row = TechnicalExamen.objects.filter(pk=technical_examen_id).values_list(
+        latest_modified(*TECHNICAL_PARTS), *(f'{part}_id' for part in TECHNICAL_PARTS)
+    ).first()
+    return _version('technical_examen', *row) if row else None
+
+
+def get_clinical_examen_version(clinical_examen_id):
+    row = ClinicalExamen.objects.filter(pk=clinical_examen_id).values_list(
+        latest_modified(*CLINICAL_PARTS), 'og_id', 'od_id', 'perimetry_id', 'bp_sup_id', 'conclusion_id'
+    ).first()
+    return _version('clinical_examen', *row) if row else None
+
+
+def get_health_record_version(patient_id):
+    """
+    Version du dossier médical d'un patient tel que le sert HealthRecordSerializer, en une requête :
+    le plus grand `modified` du dossier, du patient, de ses véhicules, des antécédents, des expériences
+    de conduite et des examens (sous-examens compris). Les nombres de lignes des relations multi-valuées
+    entrent dans l'ETag pour qu'une suppression change aussi la version.
+    """
+    examens_latest, examens_count = _aggregate(
+        Examens.objects.filter(healthrecord=OuterRef('pk')), 'healthrecord', latest_modified(*EXAMEN_PARTS)
+    )
+    experiences_latest, experiences_count = _aggregate(
+        DriverExperience.objects.filter(healthrecord=OuterRef('pk')), 'healthrecord', 'modified'
+    )
+    vehicules_latest, vehicules_count = _aggregate(
+        Vehicule.objects.filter(conducteur=OuterRef('patient')), 'conducteur', 'modified'
+    )
+    row = HealthRecord.objects.filter(patient=patient_id).values_list(
+        Greatest(
+            'modified', 'patient__modified', 'antecedant__modified',
+            examens_latest, experiences_latest, vehicules_latest,
+        ),
+        'antecedant_id', examens_count, experiences_count, vehicules_count,
+    ).first()
+    return _version('health_record', *row) if row else None
@@ -39,3 +39,4 @@ class DashboardStatsSerializer(serializers.Serializer):
     nombre_incompatibles = serializers.IntegerField()
     patients_risque_dossier = serializers.IntegerField()
     evolution_visites = EvolutionGroupSerializer()
+    refreshed_at = serializers.DateTimeField()
@@ -8,14 +8,16 @@ from apps.examens.models import (
     Examens, TechnicalExamen, ClinicalExamen,
     VisualAcuity, Refraction, OcularTension, Pachymetry,
     Plaintes, BiomicroscopySegmentAnterieur, BiomicroscopySegmentPosterieur,
-    Perimetry, Conclusion, BpSuP, EyeSide
+    Perimetry, Conclusion, BpSuP, EyeSide, ChunkedUpload
 )
 
+from apps.examens.rules import validate_rules
+from utils.images import rendition_urls
 from services.examens import (
+    EXAMEN_FILE_FIELDS,
     ExamenService,
     TechnicalExamenService,
     ClinicalExamenService,
-    ConclusionService
 )
 
 
@@ -25,10 +27,7 @@ class VisualAcuitySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def validate(self, data):
-        for field in ['avsc_od', 'avsc_og', 'avsc_odg', 'avac_od', 'avac_og', 'avac_odg']:
-            value = data.get(field)
-            if value is not None and not (0 <= value <= 10):
-                raise ValidationError({field: "La valeur doit être comprise entre 0 et 10"})
+        validate_rules(VisualAcuity.measurement_rules, data)
         return data
 
 
@@ -38,14 +37,7 @@ class RefractionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def validate(self, data):
-        if data.get('correction_optique'):
-            champs = ['od_s', 'od_c', 'od_a', 'og_s', 'og_c', 'og_a']
-            for champ in champs:
-                value = data.get(champ)
-                if value is None:
-                    raise ValidationError({champ: "Ce champ doit être rempli si correction_optique est True"})
-                if not (-10.0 <= float(value) <= 10.0):
-                    raise ValidationError({champ: "La valeur doit être entre -10.0 et 10.0"})
+        validate_rules(Refraction.measurement_rules, data)
         return data
 
 
@@ -132,29 +124,35 @@ class BiomicroscopySegmentPosterieurSerializer(serializers.ModelSerializer):
         return data
 
 
+class ImageRenditionsField(serializers.Field):
+    """Lecture seule : URL des déclinaisons (thumbnail, web) d'une image et `ready`, voir utils.images.rendition_urls."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        urls = rendition_urls(value)
+        request = self.context.get('request')
+        if urls and request is not None:
+            return {
+                key: value if key == 'ready' else request.build_absolute_uri(value)
+                for key, value in urls.items()
+            }
+        return urls
+
+
 class PerimetrySerializer(serializers.ModelSerializer):
     image = serializers.ImageField(required=False, allow_null=True)
     images = serializers.FileField(required=False, allow_null=True)
+    image_renditions = ImageRenditionsField(source='image')
+    images_renditions = ImageRenditionsField(source='images')
     class Meta:
         model = Perimetry
         fields = '__all__'
 
     def validate(self, data):
-        errors = {}
-        if 'limite_inferieure' in data and not (0 < data['limite_inferieure'] <= 90):
-            errors['limite_inferieure'] = "Doit être entre 0 et 90"
-        if 'limite_superieure' in data and not (0 < data['limite_superieure'] <= 90):
-            errors['limite_superieure'] = "Doit être entre 0 et 90"
-        if 'limite_horizontal' in data and not (0 < data['limite_horizontal'] <= 180):
-            errors['limite_horizontal'] = "Doit être entre 0 et 180"
-        if 'limite_temporale_gauche' in data and not (0 < data['limite_temporale_gauche'] <= 120):
-            errors['limite_temporale_gauche'] = "Doit être entre 0 et 120"
-        if 'limite_temporale_droit' in data and not (0 < data['limite_temporale_droit'] <= 120):
-            errors['limite_temporale_droit'] = "Doit être entre 0 et 120"
-        if 'score_esternmen' in data and not (0 < data['score_esternmen'] <= 100):
-            errors['score_esternmen'] = "Doit être entre 0 et 100"
-        if errors:
-            raise ValidationError(errors)
+        validate_rules(Perimetry.measurement_rules, data)
         return data
 
 
@@ -174,6 +172,9 @@ class BpSuPSerializer(serializers.ModelSerializer):
     retinographie = serializers.ImageField(required=False, allow_null=True)
     oct = serializers.ImageField(required=False, allow_null=True)
     autres = serializers.ImageField(required=False, allow_null=True)
+    retinographie_renditions = ImageRenditionsField(source='retinographie')
+    oct_renditions = ImageRenditionsField(source='oct')
+    autres_renditions = ImageRenditionsField(source='autres')
     class Meta:
         model = BpSuP
         fields = '__all__'
@@ -219,40 +220,11 @@ class TechnicalExamenSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def create(self, validated_data):
-        examen_id = self.context.get('examen_id')
-        technical_examen = TechnicalExamenService.init_technical_examen(examen_id)
-        nested_fields = {
-            'visual_acuity': TechnicalExamenService.update_visual_acuity,
-            'refraction': TechnicalExamenService.update_refraction,
-            'ocular_tension': TechnicalExamenService.update_ocular_tension,
-            'pachymetry': TechnicalExamenService.update_pachymetry,
-        }
-
-        for field, service in nested_fields.items():
-            if field in validated_data:
-                service(technical_examen.id, validated_data.pop(field))
-
-        technical_examen.refresh_from_db()
-        return technical_examen
+        examen_id = self.context.get('examen_id') or validated_data.pop('examen_id', None)
+        return TechnicalExamenService.save_technical_examen(validated_data, examen_id=examen_id)
 
     def update(self, instance, validated_data):
-        nested_fields = {
-            'visual_acuity': TechnicalExamenService.update_visual_acuity,
-            'refraction': TechnicalExamenService.update_refraction,
-            'ocular_tension': TechnicalExamenService.update_ocular_tension,
-            'pachymetry': TechnicalExamenService.update_pachymetry,
-        }
-
-        for field, service in nested_fields.items():
-            if field in validated_data:
-                service(instance.id, validated_data.pop(field))
-
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-
-        instance.save()
-        instance.refresh_from_db()
-        return instance
+        return TechnicalExamenService.save_technical_examen(validated_data, technical_examen=instance)
 
 class ClinicalExamenSerializer(serializers.ModelSerializer):
     conclusion = ConclusionSerializer(required=False)
@@ -314,39 +286,13 @@ class ClinicalExamenSerializer(serializers.ModelSerializer):
         return super().to_internal_value(nested_data)
 
     def create(self, validated_data):
-        examen_id = self.context.get('examen_id') or validated_data.get('examen_id')
+        examen_id = self.context.get('examen_id') or validated_data.pop('examen_id', None)
         if not examen_id:
             raise serializers.ValidationError("examen_id est requis dans le contexte")
+        return ClinicalExamenService.save_clinical_examen(validated_data, examen_id=examen_id)
 
-        bp_sup_data = validated_data.pop('bp_sup', None)
-        perimetry_data = validated_data.pop('perimetry', None)
-        conclusion_data = validated_data.pop('conclusion', None)
-        og_data = validated_data.pop('og', None)
-        od_data = validated_data.pop('od', None)
-
-        clinical_examen = ClinicalExamenService.init_clinical_examen(examen_id)
-
-        if og_data:
-            ClinicalExamenService.create_or_update_eye_side(clinical_examen.id, 'og', og_data)
-        if od_data:
-            ClinicalExamenService.create_or_update_eye_side(clinical_examen.id, 'od', od_data)
-        if conclusion_data:
-            ConclusionService.update_conclusion(clinical_examen.id, conclusion_data)
-        if perimetry_data:
-            ClinicalExamenService.update_perimetry(clinical_examen.id, perimetry_data)
-        if bp_sup_data:
-            ClinicalExamenService.update_bp_sup(clinical_examen.id, bp_sup_data)
-
-        clinical_examen.refresh_from_db()
-        return clinical_examen
-    
-    def update(self, instance, validated_data):        
-        examen_id = Examens.objects.filter(clinical_examen=instance.id).values_list('id', flat=True).first()
-        if not examen_id:
-            raise serializers.ValidationError("examen_id est requis pour mettre à jour l'examen")
-        clinical_examen = validated_data.copy()
-        clinical_examen['examen_id'] = examen_id
-        return self.create(clinical_examen)
+    def update(self, instance, validated_data):
+        return ClinicalExamenService.save_clinical_examen(validated_data, clinical_examen=instance)
 
 class ExamensSerializer(serializers.ModelSerializer):
     technical_examen = TechnicalExamenSerializer(required=False)
@@ -383,4 +329,22 @@ class ExamensSerializer(serializers.ModelSerializer):
             })
         
         examen.save()
-        return examen
\ No newline at end of file
+        return examen
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ['id', 'filename', 'size', 'sha256', 'offset', 'status', 'created']
+        read_only_fields = ['offset', 'status', 'created']
+
+
+class ChunkedUploadFinalizeSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=list(EXAMEN_FILE_FIELDS))
+    object_id = serializers.IntegerField()
+    field = serializers.CharField()
+
+    def validate(self, data):
+        fields = EXAMEN_FILE_FIELDS[data['target']][1]
+        if data['field'] not in fields:
+            raise serializers.ValidationError({'field': f'Champ attendu parmi : {", ".join(fields)}'})
+        return data
@@ -13,6 +13,8 @@ class VehiculeSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'conducteur': {'required': False, 'allow_null': True}
         }
+        # Lu par get_conducteur_full_name, voir api.prefetch
+        select_related = ('conducteur',)
 
     def get_conducteur_full_name(self, obj):
         return f"{obj.conducteur.first_name} {obj.conducteur.last_name}"
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics.models import DashboardStat, ExamFact
+from apps.examens.models import Examens
+from selector.analytics import EXAM_FACT_SOURCES, DashboardStatsSelector, get_exam_fact_rows
+
+# Au-delà de cette durée (en secondes) une section est recalculée même sans écriture détectée
+# (écritures en masse via update()/bulk_create qui ne déclenchent pas les signaux, âge moyen, ...)
+SNAPSHOT_MAX_AGE = getattr(settings, 'ANALYTICS_SNAPSHOT_MAX_AGE', 60 * 60)
+
+EXAM_FACT_CHUNK_SIZE = 1000
+EXAM_FACT_SECTIONS = ['tonus', 'conclusions']
+
+
+def dashboard_stats_invalidate(sections):
+    """Marque les sections comme périmées, sans toucher celles qui le sont déjà."""
+    return DashboardStat.objects.filter(name__in=sections, is_stale=False).update(is_stale=True)
+
+
+def _needs_refresh(stat: DashboardStat, expired_before) -> bool:
+    return stat.is_stale or stat.refreshed_at is None or stat.refreshed_at < expired_before
+
+
+@transaction.atomic
+def dashboard_stats_refresh(*, sections=None, force=True) -> dict:
+    """
+    Recalcule les sections demandées (toutes par défaut).
+    Les lignes sont verrouillées pendant le calcul : une invalidation concurrente attend la fin du
+    recalcul et re-marque la section, et deux lecteurs simultanés ne recalculent pas deux fois.
+    """
+    names = list(sections or DashboardStatsSelector.EMPLOYEE_SECTIONS)
+    existing = set(DashboardStat.objects.filter(name__in=names).values_list('name', flat=True))
+    missing = [DashboardStat(name=name) for name in names if name not in existing]
+    if missing:
+        DashboardStat.objects.bulk_create(missing, ignore_conflicts=True)
+
+    now = timezone.now()
+    expired_before = now - timedelta(seconds=SNAPSHOT_MAX_AGE)
+    stats = {stat.name: stat for stat in DashboardStat.objects.select_for_update().filter(name__in=names)}
+    for name, stat in stats.items():
+        if not force and not _needs_refresh(stat, expired_before):
+            continue
+        stat.data = DashboardStatsSelector.compute_section(name)
+        stat.is_stale = False
+        stat.refreshed_at = now
+        stat.save(update_fields=['data', 'is_stale', 'refreshed_at', 'modified'])
+    return stats
+
+
+def dashboard_stats_get(*, refresh: bool = False) -> dict:
+    """
+    Retourne les statistiques du dashboard employé depuis le snapshot.
+    Seules les sections périmées (ou toutes si refresh=True) sont recalculées.
+    """
+    names = list(DashboardStatsSelector.EMPLOYEE_SECTIONS)
+    stats = {stat.name: stat for stat in DashboardStat.objects.filter(name__in=names)}
+    expired_before = timezone.now() - timedelta(seconds=SNAPSHOT_MAX_AGE)
+
+    if refresh:
+        to_refresh = names
+    else:
+        to_refresh = [name for name in names if name not in stats or _needs_refresh(stats[name], expired_before)]
+    if to_refresh:
+        stats.update(dashboard_stats_refresh(sections=to_refresh, force=refresh))
+
+    data = {}
+    for name in names:
+        data.update(stats[name].data)
+    data['refreshed_at'] = min(stats[name].refreshed_at for name in names)
+    return data
+
+
+def exam_facts_refresh(*filters, chunk_size=EXAM_FACT_CHUNK_SIZE, **lookups) -> int:
+    """
+    Recalcule les lignes ExamFact des examens filtrés (tous sans argument), par upsert en masse :
+    une requête de lecture jointe puis un INSERT ... ON CONFLICT par paquet de `chunk_size`.
+    Ex: exam_facts_refresh(technical_examen_id=42), exam_facts_refresh(patient_id=7).
+    """
+    examens = Examens.objects.filter(*filters, **lookups)
+    rows = get_exam_fact_rows(examens).iterator(chunk_size=chunk_size)
+    update_fields = [name for name in EXAM_FACT_SOURCES if name != 'patient_id'] + ['patient', 'modified']
+
+    count = 0
+    while chunk := list(islice(rows, chunk_size)):
+        facts = [ExamFact(examen_id=row.pop('id'), **row) for row in chunk]
+        ExamFact.objects.bulk_create(
+            facts,
+            update_conflicts=True,
+            unique_fields=['examen'],
+            update_fields=update_fields,
+        )
+        count += len(facts)
+
+    if count:
+        # L'upsert ne déclenche pas les signaux du snapshot
+        transaction.on_commit(partial(dashboard_stats_invalidate, EXAM_FACT_SECTIONS))
+    return count
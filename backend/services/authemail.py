@@ -1,4 +1,5 @@
 from datetime import date, timedelta
+from functools import partial
 from random import randint
 import secrets
 
@@ -7,8 +8,8 @@ import secrets
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model, authenticate, password_validation
-from django.core.mail.message import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import get_connection
+from django.template.loader import get_template
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 from django.utils import timezone
@@ -25,21 +26,178 @@ EXPIRY_PERIOD = getattr(settings, 'AUTH_EMAIL_EXPIRY_PERIOD')
 def _make_random_password(length=10, allowed_chars='abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789'):
         return ''.join(secrets.choice(allowed_chars) for i in range(length))
 
+# Préfixes des triplets sujet / texte / html de templates/email/authemail
+EMAIL_TEMPLATE_PREFIXES = (
+    'signup_email',
+    'welcome_email',
+    'password_reset_email',
+    'email_change_notify_previous_email',
+    'email_change_confirm_new_email',
+    'licence_expiry_email',
+)
+EMAIL_ENQUEUE_BATCH_SIZE = 1000
+
+_email_templates = {}
+
+
+def _email_template_files(template_prefix):
+    return (
+        'email/authemail/%s_subject.txt' % template_prefix,
+        'email/authemail/%s.txt' % template_prefix,
+        'email/authemail/%s.html' % template_prefix,
+    )
+
+
+def email_templates_load(prefixes=EMAIL_TEMPLATE_PREFIXES):
+    """
+    Compile les triplets de templates des `prefixes` une fois pour toutes (appelé au démarrage par
+    AuthemailConfig.ready) : un rendu ne fait plus ni recherche de fichier ni analyse du template.
+    """
+    for prefix in prefixes:
+        _email_templates[prefix] = tuple(get_template(name) for name in _email_template_files(prefix))
+    return _email_templates
+
+
+def _get_email_templates(template_prefix):
+    if template_prefix not in _email_templates:
+        email_templates_load([template_prefix])
+    return _email_templates[template_prefix]
+
+
+def render_multi_format_emails(template_prefix, contexts):
+    """Rendu (sujet, texte, html) de chaque contexte de `contexts`, templates compilés une seule fois."""
+    subject_template, txt_template, html_template = _get_email_templates(template_prefix)
+    for ctxt in contexts:
+        yield (
+            subject_template.render(ctxt).strip(),
+            txt_template.render(ctxt),
+            html_template.render(ctxt),
+        )
+
+
+def _render_multi_format_email(template_prefix, template_ctxt):
+    return next(render_multi_format_emails(template_prefix, [template_ctxt]))
+
+
+def email_enqueue(*, subject, body, to, html='', bcc=None):
+    """
+    Met un email dans la file d'envoi au commit de la transaction courante : rien n'est envoyé
+    si elle est annulée, et aucune connexion SMTP n'est ouverte pendant la requête.
+    """
+    from apps.authemail.models import OutgoingEmail
+
+    email = OutgoingEmail(
+        subject=subject, body=body, html=html, to=list(to),
+        from_email=settings.EMAIL_FROM, bcc=[address for address in bcc or [] if address],
+    )
+    transaction.on_commit(email.save)
+    return email
+
+
 def send_multi_format_email(template_prefix, template_ctxt, target_email):
-    subject_file = 'email/authemail/%s_subject.txt' % template_prefix
-    txt_file = 'email/authemail/%s.txt' % template_prefix
-    html_file = 'email/authemail/%s.html' % template_prefix
-
-    subject = render_to_string(subject_file).strip()
-    from_email = settings.EMAIL_FROM
-    to = target_email
-    bcc_email = settings.EMAIL_BCC
-    text_content = render_to_string(txt_file, template_ctxt)
-    html_content = render_to_string(html_file, template_ctxt)
-    msg = EmailMultiAlternatives(subject, text_content, from_email, [to],
-                                 bcc=[bcc_email])
-    msg.attach_alternative(html_content, 'text/html')
-    msg.send()
+    subject, text_content, html_content = _render_multi_format_email(template_prefix, template_ctxt)
+    return email_enqueue(subject=subject, body=text_content, html=html_content, to=[target_email],
+                         bcc=[settings.EMAIL_BCC])
+
+
+def _build_multi_format_emails(template_prefix, recipients):
+    from apps.authemail.models import OutgoingEmail
+
+    bcc = [settings.EMAIL_BCC] if settings.EMAIL_BCC else []
+    recipients = list(recipients)
+    rendered = render_multi_format_emails(template_prefix, (ctxt for _, ctxt in recipients))
+    return [
+        OutgoingEmail(subject=subject, body=text_content, html=html_content, to=[target_email],
+                      from_email=settings.EMAIL_FROM, bcc=bcc)
+        for (target_email, _), (subject, text_content, html_content) in zip(recipients, rendered)
+    ]
+
+
+def send_multi_format_emails(template_prefix, recipients, batch_size=EMAIL_ENQUEUE_BATCH_SIZE) -> int:
+    """
+    Envoi groupé (rappels, notifications) : `recipients` est un itérable de (email, contexte).
+    Les emails sont rendus avec les templates compilés et insérés par lots au commit.
+    """
+    from apps.authemail.models import OutgoingEmail
+
+    emails = _build_multi_format_emails(template_prefix, recipients)
+    if emails:
+        transaction.on_commit(partial(OutgoingEmail.objects.bulk_create, emails, batch_size=batch_size))
+    return len(emails)
+
+
+def insert_multi_format_emails(template_prefix, recipients, batch_size=EMAIL_ENQUEUE_BATCH_SIZE) -> int:
+    """
+    Variante non différée de send_multi_format_emails pour les workers : les emails sont insérés
+    tout de suite, dans la transaction courante, et validés ou annulés avec les lignes qui les
+    accompagnent (ex. traces des rappels d'expiration).
+    """
+    from apps.authemail.models import OutgoingEmail
+
+    emails = _build_multi_format_emails(template_prefix, recipients)
+    OutgoingEmail.objects.bulk_create(emails, batch_size=batch_size)
+    return len(emails)
+
+
+def _retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_BACKOFF))
+
+
+def _email_outbox_failed(email, error, result):
+    """Échec d'envoi : nouvel essai après _retry_delay, ou abandon après EMAIL_OUTBOX_MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = email.Status.FAILED
+        result['failed'] += 1
+    else:
+        email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
+        result['retried'] += 1
+
+
+def email_outbox_deliver(*, batch_size=None, connection=None) -> dict:
+    """
+    Envoie un lot d'emails en attente sur une seule connexion SMTP.
+    Les lignes sont verrouillées (SKIP LOCKED) : plusieurs workers peuvent tourner en parallèle.
+    Un échec reprogramme l'email avec un délai exponentiel, jusqu'à EMAIL_OUTBOX_MAX_ATTEMPTS.
+    """
+    from apps.authemail.models import OutgoingEmail
+
+    result = {'sent': 0, 'retried': 0, 'failed': 0}
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE]
+        )
+        if not emails:
+            return result
+
+        connection = connection or get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # Serveur injoignable : tout le lot est reprogrammé, le worker (send_queued_emails --loop) continue
+            for email in emails:
+                _email_outbox_failed(email, e, result)
+        else:
+            with connection:
+                for email in emails:
+                    try:
+                        connection.send_messages([email.message(connection)])
+                    except Exception as e:
+                        _email_outbox_failed(email, e, result)
+                    else:
+                        email.attempts += 1
+                        email.status = OutgoingEmail.Status.SENT
+                        email.sent_at = timezone.now()
+                        result['sent'] += 1
+
+        OutgoingEmail.objects.bulk_update(
+            emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'modified']
+        )
+    return result
 
 @transaction.atomic    
 def user_login(email:str, password:str):
@@ -0,0 +1,458 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.examens.models import (
+    BiomicroscopySegmentAnterieur, BiomicroscopySegmentPosterieur, ClinicalExamen, Conclusion, Examens, EyeSide,
+    OcularTension, Pachymetry, Perimetry, Plaintes, Refraction, TechnicalExamen, VisualAcuity
+)
+from apps.examens.rules import MeasurementRulesMixin, validate_rows
+from apps.health_record.models import DriverExperience, HealthRecord
+from apps.patients.models import Conducteur
+from selector.analytics import DashboardStatsSelector
+from services.analytics import dashboard_stats_invalidate, exam_facts_refresh
+from services.dossiers import dossier_version_bump
+from utils.format_data import parse_nested_formdata
+from utils.models.choices import VisiteChoices
+
+DEFAULT_BATCH_SIZE = 500
+
+TECHNICAL_PARTS = {
+    'visual_acuity': VisualAcuity,
+    'refraction': Refraction,
+    'ocular_tension': OcularTension,
+    'pachymetry': Pachymetry,
+}
+CLINICAL_PARTS = {
+    'conclusion': Conclusion,
+    'perimetry': Perimetry,
+}
+EYE_PARTS = {
+    'plaintes': Plaintes,
+    'bp_sg_anterieur': BiomicroscopySegmentAnterieur,
+    'bp_sg_posterieur': BiomicroscopySegmentPosterieur,
+}
+
+# Mesures dont les règles de plage sont appliquées au lot entier avant la construction des lignes
+MEASUREMENT_PARTS = {
+    ('technical_examen', 'visual_acuity'): VisualAcuity,
+    ('technical_examen', 'refraction'): Refraction,
+    ('clinical_examen', 'perimetry'): Perimetry,
+}
+
+# Ordre d'écriture : une table n'est écrite qu'après celles qu'elle référence
+FLUSH_ORDER = [
+    Conducteur,
+    *TECHNICAL_PARTS.values(), *CLINICAL_PARTS.values(), *EYE_PARTS.values(),
+    EyeSide,
+    TechnicalExamen, ClinicalExamen, DriverExperience,
+    Examens,
+]
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    errors: list = field(default_factory=list)  # [{'row': n, 'errors': {...}}, ...]
+
+    def add_error(self, row_number, error):
+        if isinstance(error, ValidationError):
+            error = error.message_dict if hasattr(error, 'error_dict') else {'non_field_errors': error.messages}
+        elif not isinstance(error, dict):
+            error = {'non_field_errors': [str(error)]}
+        self.errors.append({'row': row_number, 'errors': error})
+
+    def as_dict(self):
+        return {'total': self.total, 'imported': self.imported, 'failed': len(self.errors), 'errors': self.errors}
+
+
+def _normalize(data):
+    """Nettoie une ligne CSV : chaînes vides supprimées, 'true'/'false' convertis en booléens."""
+    cleaned = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = _normalize(value)
+        elif isinstance(value, str):
+            value = value.strip()
+            if value == '':
+                continue
+            if value.lower() in ('true', 'false'):
+                value = value.lower() == 'true'
+        cleaned[key] = value
+    return cleaned
+
+
+def iter_import_rows(stream, file_format):
+    """
+    Lit un flux texte JSONL (un objet par ligne) ou CSV (colonnes en notation pointée,
+    ex: technical_examen.visual_acuity.avsc_od) et produit (numéro de ligne, dict imbriqué | erreur).
+    """
+    if file_format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, ValidationError(f'JSON invalide : {e}')
+    elif file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=2):
+            yield number, _normalize(parse_nested_formdata(row))
+    else:
+        raise ValueError("Le format doit être 'csv' ou 'jsonl'")
+
+
+def _fill(instance, data):
+    """Affecte les valeurs d'un payload aux champs simples du modèle et retourne les champs modifiés."""
+    allowed = {
+        f.name for f in instance._meta.concrete_fields
+        if not f.is_relation and not f.primary_key and f.name not in ('created', 'modified')
+    }
+    unknown = set(data) - allowed
+    if unknown:
+        raise ValidationError({name: 'Champ inconnu.' for name in sorted(unknown)})
+    for name, value in data.items():
+        setattr(instance, name, value)
+    return set(data)
+
+
+def _payload(data, *path):
+    """Sous-dictionnaire data[path[0]][path[1]]..., None s'il est absent ou mal formé."""
+    for key in path:
+        data = data.get(key) if isinstance(data, dict) else None
+    return data if isinstance(data, dict) else None
+
+
+def _validate(instance):
+    """
+    Validation des champs et clean() du modèle, sans les requêtes de full_clean()
+    (existence des FK, validate_unique) : l'unicité est contrôlée par lot.
+    """
+    instance.clean_fields(exclude=[f.name for f in instance._meta.concrete_fields if f.is_relation])
+    instance.clean()
+
+
+class _Batch:
+    """Écritures accumulées pour un lot, regroupées par modèle."""
+
+    def __init__(self):
+        self.creates = defaultdict(list)
+        self.updates = defaultdict(dict)  # model -> {id(instance): (instance, fields)}
+        self.links = []  # (patient, examen, driver_experience)
+
+    def add(self, ops, link):
+        for instance, fields in ops:
+            model = type(instance)
+            if instance.pk is None:
+                if instance not in self.creates[model]:
+                    self.creates[model].append(instance)
+            else:
+                _, known = self.updates[model].setdefault(id(instance), (instance, set()))
+                known.update(fields)
+        self.links.append(link)
+
+    def flush(self, batch_size):
+        now = timezone.now()
+        for model in FLUSH_ORDER:
+            if self.creates[model]:
+                model.objects.bulk_create(self.creates[model], batch_size=batch_size)
+            if self.updates[model]:
+                instances, fields = [], {'modified'}
+                for instance, instance_fields in self.updates[model].values():
+                    instance.modified = now
+                    instances.append(instance)
+                    fields.update(instance_fields)
+                model.objects.bulk_update(instances, sorted(fields), batch_size=batch_size)
+        self._link_health_records(batch_size)
+
+    def _link_health_records(self, batch_size):
+        patient_ids = {patient.pk for patient, _, _ in self.links}
+        records = dict(HealthRecord.objects.filter(patient_id__in=patient_ids).values_list('patient_id', 'id'))
+        missing = [HealthRecord(patient_id=patient_id) for patient_id in patient_ids if patient_id not in records]
+        if missing:
+            HealthRecord.objects.bulk_create(missing, batch_size=batch_size)
+            records.update((record.patient_id, record.pk) for record in missing)
+
+        examens_through = HealthRecord.examens.through
+        experiences_through = HealthRecord.driver_experience.through
+        examens_links, experience_links = [], []
+        for patient, examen, experience in self.links:
+            record_id = records[patient.pk]
+            examens_links.append(examens_through(healthrecord_id=record_id, examens_id=examen.pk))
+            if experience is not None:
+                experience_links.append(experiences_through(healthrecord_id=record_id, driverexperience_id=experience.pk))
+        examens_through.objects.bulk_create(examens_links, batch_size=batch_size, ignore_conflicts=True)
+        experiences_through.objects.bulk_create(experience_links, batch_size=batch_size, ignore_conflicts=True)
+
+
+class ExamImportService:
+    """
+    Import en masse de visites (patient, expérience de conduite, examens technique et clinique).
+
+    Chaque ligne décrit une visite :
+        {"patient": {"numero_permis": ..., <champs Conducteur si nouveau>}, "visite": 1,
+         "driver_experience": {...},
+         "technical_examen": {"visual_acuity": {...}, "refraction": {...}, "ocular_tension": {...}, "pachymetry": {...}},
+         "clinical_examen": {"conclusion": {...}, "perimetry": {...},
+                             "og": {"plaintes": {...}, "bp_sg_anterieur": {...}, "bp_sg_posterieur": {...}}, "od": {...}}}
+
+    Les lignes sont validées et écrites par lots (bulk_create / bulk_update), chaque lot dans sa
+    propre transaction. Une ligne invalide est rejetée sans bloquer le reste du lot.
+    Un patient déjà connu (numero_permis) est réutilisé tel quel ; une visite existante est mise à jour.
+    """
+
+    @classmethod
+    def import_file(cls, file, file_format, batch_size=DEFAULT_BATCH_SIZE) -> ImportReport:
+        """Importe un fichier binaire (upload ou fichier ouvert en 'rb') encodé en UTF-8."""
+        stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            return cls.import_stream(stream, file_format, batch_size=batch_size)
+        finally:
+            stream.detach()
+
+    @classmethod
+    def import_stream(cls, stream, file_format, batch_size=DEFAULT_BATCH_SIZE) -> ImportReport:
+        report = ImportReport()
+        rows = iter_import_rows(stream, file_format)
+        while chunk := list(islice(rows, batch_size)):
+            report.total += len(chunk)
+            cls.import_rows(chunk, report, batch_size=batch_size)
+        return report
+
+    @classmethod
+    def import_rows(cls, rows, report: ImportReport, batch_size=DEFAULT_BATCH_SIZE):
+        valid = []
+        for number, data in rows:
+            if isinstance(data, Exception):
+                report.add_error(number, data)
+            elif not isinstance(data, dict):
+                report.add_error(number, ValidationError('Chaque ligne doit être un objet.'))
+            else:
+                valid.append((number, data))
+        if not valid:
+            return
+
+        try:
+            with transaction.atomic():
+                batch = cls._build_batch(valid, report)
+                batch.flush(batch_size)
+                exam_facts_refresh(pk__in=[examen.pk for _, examen, _ in batch.links])
+                dossier_version_bump({examen.patient_id for _, examen, _ in batch.links})
+        except DatabaseError as e:
+            # Le lot est annulé en entier : les lignes valides sont signalées en échec
+            rejected = {error['row'] for error in report.errors}
+            for number, _ in valid:
+                if number not in rejected:
+                    report.add_error(number, e)
+            return
+
+        report.imported += len(batch.links)
+        # Les écritures en masse ne déclenchent pas les signaux du snapshot du dashboard
+        transaction.on_commit(partial(dashboard_stats_invalidate, list(DashboardStatsSelector.EMPLOYEE_SECTIONS)))
+
+    @classmethod
+    def _build_batch(cls, rows, report) -> _Batch:
+        rows = cls._check_measurements(rows, report)
+        patients = cls._resolve_patients(rows, report)
+        existing = cls._load_existing(patient.pk for patient in patients.values() if patient.pk)
+
+        batch = _Batch()
+        seen = set()
+        for number, data in rows:
+            patient = patients.get(number)
+            if patient is None:
+                continue
+            try:
+                visite = cls._visite(data)
+                key = (id(patient), visite)
+                if key in seen:
+                    raise ValidationError({'visite': 'Visite en double dans le lot.'})
+                ops, link = cls._build_row(patient, visite, data, existing)
+            except ValidationError as e:
+                report.add_error(number, e)
+                continue
+            seen.add(key)
+            batch.add(ops, link)
+        return batch
+
+    @staticmethod
+    def _visite(data):
+        try:
+            visite = int(data.get('visite'))
+        except (TypeError, ValueError):
+            visite = None
+        if visite not in VisiteChoices.values:
+            raise ValidationError({'visite': f'Visite invalide, choix possibles : {VisiteChoices.values}.'})
+        return visite
+
+    @staticmethod
+    def _check_measurements(rows, report):
+        """
+        Applique les règles de plage des mesures (apps.examens.rules) au lot entier, une colonne
+        à la fois, et retourne les lignes qui les respectent.
+        """
+        errors = defaultdict(dict)
+        for (section, name), model in MEASUREMENT_PARTS.items():
+            result = validate_rows(model.measurement_rules, [_payload(data, section, name) for _, data in rows])
+            for index in result.invalid_rows():
+                # Même clé que les erreurs de _build_parts (nom de la mesure)
+                errors[index][name] = [f'{field} : {message}' for field, message in result.row_errors(index).items()]
+        for index, error in errors.items():
+            report.add_error(rows[index][0], error)
+        return [row for index, row in enumerate(rows) if index not in errors]
+
+    @classmethod
+    def _resolve_patients(cls, rows, report):
+        """Associe chaque ligne à un Conducteur existant ou nouveau (validé), en 2 requêtes par lot."""
+        numeros = {str(data.get('patient', {}).get('numero_permis', '')) for _, data in rows}
+        known = {patient.numero_permis: patient for patient in Conducteur.objects.filter(numero_permis__in=numeros)}
+
+        resolved, new_patients, errors = {}, {}, {}
+        for number, data in rows:
+            payload = data.get('patient') or {}
+            numero = str(payload.get('numero_permis', ''))
+            if not numero:
+                report.add_error(number, ValidationError({'patient.numero_permis': 'Ce champ est requis.'}))
+                continue
+            if numero in known:
+                resolved[number] = known[numero]
+                continue
+            if numero in errors:
+                report.add_error(number, errors[numero])
+                continue
+            if numero not in new_patients:
+                patient = Conducteur()
+                try:
+                    _fill(patient, payload)
+                    _validate(patient)
+                except ValidationError as e:
+                    errors[numero] = e
+                    report.add_error(number, e)
+                    continue
+                new_patients[numero] = patient
+            resolved[number] = new_patients[numero]
+
+        if new_patients:
+            candidates = list(new_patients.values())
+            emails = {patient.email for patient in candidates}
+            phones = {str(patient.phone_number) for patient in candidates}
+            taken = Conducteur.objects.filter(Q(email__in=emails) | Q(phone_number__in=phones)).values_list('email', 'phone_number')
+            taken_emails = {email for email, _ in taken}
+            taken_phones = {str(phone) for _, phone in taken}
+            seen_emails, seen_phones = set(), set()
+            for patient in candidates:
+                phone = str(patient.phone_number)
+                if patient.email in taken_emails or patient.email in seen_emails:
+                    errors[patient.numero_permis] = ValidationError({'patient.email': 'Email déjà utilisé.'})
+                elif phone in taken_phones or phone in seen_phones:
+                    errors[patient.numero_permis] = ValidationError({'patient.phone_number': 'Numéro déjà utilisé.'})
+                seen_emails.add(patient.email)
+                seen_phones.add(phone)
+            for number, patient in list(resolved.items()):
+                if patient.pk is None and patient.numero_permis in errors:
+                    report.add_error(number, errors[patient.numero_permis])
+                    del resolved[number]
+        return resolved
+
+    @staticmethod
+    def _load_existing(patient_ids):
+        """Charge en une requête par table les agrégats déjà présents pour les patients du lot."""
+        patient_ids = list(patient_ids)
+
+        def index(queryset):
+            return {(obj.patient_id, obj.visite): obj for obj in queryset.filter(patient_id__in=patient_ids)}
+
+        eyes = [f'{side}__{part}' for side in ('og', 'od') for part in EYE_PARTS]
+        return {
+            'examens': index(Examens.objects.all()),
+            'technical': index(TechnicalExamen.objects.select_related(*TECHNICAL_PARTS)),
+            'clinical': index(ClinicalExamen.objects.select_related(*CLINICAL_PARTS, *eyes)),
+            'experience': index(DriverExperience.objects.all()),
+        }
+
+    @classmethod
+    def _build_row(cls, patient, visite, data, existing):
+        ops = []
+        key = (patient.pk, visite)
+        if patient.pk is None:
+            ops.append((patient, ()))
+
+        experience = None
+        if data.get('driver_experience'):
+            experience = existing['experience'].get(key) or DriverExperience(patient=patient, visite=visite)
+            fields = _fill(experience, data['driver_experience'])
+            _validate(experience)
+            ops.append((experience, fields))
+
+        examen = existing['examens'].get(key) or Examens(patient=patient, visite=visite)
+        examen_fields = set()
+
+        if data.get('technical_examen'):
+            technical = existing['technical'].get(key) or TechnicalExamen(patient=patient, visite=visite)
+            technical_fields = cls._build_parts(technical, TECHNICAL_PARTS, data['technical_examen'], ops)
+            technical.is_completed = technical.completed()
+            _validate(technical)
+            ops.append((technical, technical_fields | {'is_completed'}))
+            examen.technical_examen = technical
+            examen_fields.add('technical_examen')
+
+        if data.get('clinical_examen'):
+            clinical_data = dict(data['clinical_examen'])
+            clinical = existing['clinical'].get(key) or ClinicalExamen(patient=patient, visite=visite)
+            clinical_fields = set()
+            for side in ('og', 'od'):
+                side_data = clinical_data.pop(side, None)
+                if side_data:
+                    eye = getattr(clinical, side) or EyeSide()
+                    eye_fields = cls._build_parts(eye, EYE_PARTS, side_data, ops, required=eye.pk is None)
+                    ops.append((eye, eye_fields))
+                    setattr(clinical, side, eye)
+                    clinical_fields.add(side)
+            clinical_fields |= cls._build_parts(clinical, CLINICAL_PARTS, clinical_data, ops)
+            _validate(clinical)
+            ops.append((clinical, clinical_fields))
+            examen.clinical_examen = clinical
+            examen_fields.add('clinical_examen')
+
+        technical, clinical = examen.technical_examen, examen.clinical_examen
+        examen.is_completed = bool(technical and technical.is_completed and clinical and clinical.is_completed)
+        ops.append((examen, examen_fields | {'is_completed'}))
+        return ops, (patient, examen, experience)
+
+    @staticmethod
+    def _build_parts(parent, parts, data, ops, required=False):
+        """Crée ou met à jour les sous-modèles (FK/O2O) d'un parent et retourne les FK à écrire."""
+        unknown = set(data) - set(parts)
+        if unknown:
+            raise ValidationError({name: 'Section inconnue.' for name in sorted(unknown)})
+        if required and set(data) != set(parts):
+            raise ValidationError({name: 'Ce champ est requis.' for name in sorted(set(parts) - set(data))})
+
+        fields = set()
+        for name, model in parts.items():
+            if name not in data:
+                continue
+            current = getattr(parent, name) if getattr(parent, f'{name}_id') else None
+            part = current or model()
+            part_fields = _fill(part, data[name])
+            if current is None and isinstance(part, MeasurementRulesMixin):
+                # Nouvelle mesure : ses règles ont été appliquées au lot (_check_measurements)
+                part._measurements_checked = True
+            try:
+                _validate(part)
+            except ValidationError as e:
+                raise ValidationError({name: e.messages})
+            ops.append((part, part_fields))
+            setattr(parent, name, part)
+            fields.add(name)
+        return fields
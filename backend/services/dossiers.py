@@ -0,0 +1,101 @@
+import time
+from collections import Counter
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Func, Value
+
+from apps.health_record.models import HealthRecord
+
+DOSSIER_CACHE_ALIAS = getattr(settings, 'DOSSIER_CACHE_ALIAS', 'dossiers')
+# Durée max (s) du verrou d'un calcul, et attente max (s) d'un lecteur concurrent avant de calculer lui-même
+DOSSIER_CACHE_LOCK_TIMEOUT = 10
+DOSSIER_CACHE_WAIT = 2.0
+DOSSIER_CACHE_POLL_INTERVAL = 0.05
+
+_metrics = Counter()
+_metrics_lock = Lock()
+
+
+class _NextVersion(Func):
+    # Séquence créée par la migration health_record 0006
+    function = 'nextval'
+
+    def __init__(self):
+        super().__init__(Value('health_record_version_seq'), output_field=HealthRecord._meta.get_field('version'))
+
+
+def _count(name):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def dossier_cache_metrics() -> dict:
+    """Compteurs du processus courant : hits, misses, waits (lecteur servi après attente), timeouts."""
+    with _metrics_lock:
+        metrics = {name: _metrics[name] for name in ('hits', 'misses', 'waits', 'timeouts')}
+    lookups = metrics['hits'] + metrics['misses']
+    metrics['hit_ratio'] = metrics['hits'] / lookups if lookups else None
+    return metrics
+
+
+def dossier_cache_metrics_reset():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def dossier_version_bump(patients) -> int:
+    """
+    Change la version des dossiers des `patients` (ids, instances ou queryset `.values('patient')`).
+    À appeler dans la transaction d'écriture : la nouvelle version devient visible au commit, avec les données.
+    Les versions viennent d'une séquence, jamais réutilisées même si la transaction est annulée.
+    """
+    return HealthRecord.objects.filter(patient__in=patients).update(version=_NextVersion())
+
+
+def dossier_cache_key(patient_id, version, etag=None):
+    return f'dossier:{patient_id}:{version}:{etag}' if etag else f'dossier:{patient_id}:{version}'
+
+
+def dossier_cache_get_or_render(patient_id, render, etag=None):
+    """
+    Données sérialisées du dossier du patient, mises en cache sous (patient, version, etag).
+    `render()` calcule les données, ou renvoie None si le dossier est introuvable (rien n'est mis en cache).
+    `etag` (selector.versions.get_health_record_version) couvre les écritures faites hors des services,
+    qui ne changent pas la version : sauvegarde directe d'un sous-examen, lien retiré d'un dossier...
+
+    Protection contre l'effet de meute : un seul lecteur calcule une clé manquante (verrou `cache.add`),
+    les autres attendent son résultat au plus DOSSIER_CACHE_WAIT secondes avant de calculer eux-mêmes.
+    """
+    version = HealthRecord.objects.filter(patient=patient_id).values_list('version', flat=True).first()
+    if version is None:
+        return render()
+
+    cache = caches[DOSSIER_CACHE_ALIAS]
+    key = dossier_cache_key(patient_id, version, etag)
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return data
+    _count('misses')
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, DOSSIER_CACHE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + DOSSIER_CACHE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(DOSSIER_CACHE_POLL_INTERVAL)
+            data = cache.get(key)
+            if data is not None:
+                _count('waits')
+                return data
+        _count('timeouts')
+        return render()
+
+    try:
+        data = render()
+        if data is not None:
+            cache.set(key, data)
+        return data
+    finally:
+        cache.delete(lock_key)
@@ -1,11 +1,184 @@
+import logging
+from collections import Counter, defaultdict
+from functools import partial
+
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
 
+from apps.analytics.models import ExamFact
 from apps.examens.models import (
     BiomicroscopySegmentAnterieur, BiomicroscopySegmentPosterieur, BpSuP, ClinicalExamen, Conclusion, Examens, EyeSide, OcularTension,
     Pachymetry, Perimetry, Plaintes, Refraction, TechnicalExamen, VisualAcuity
 )
-from apps.health_record.models import DriverExperience
+from apps.health_record.models import DriverExperience, HealthRecord
+from selector.analytics import DashboardStatsSelector
+from services.analytics import EXAM_FACT_SECTIONS, dashboard_stats_invalidate, exam_facts_refresh
+from services.dossiers import dossier_version_bump
+from utils.background import run_in_background
+from utils.images import rendition_names
+from utils.models.validation import validate_for_save
+from utils.storage import is_blob
+
+logger = logging.getLogger(__name__)
+
+# Champs fichier des examens cliniques, par relation de ClinicalExamen
+EXAMEN_FILE_FIELDS = {
+    'perimetry': (Perimetry, ('image', 'images')),
+    'bp_sup': (BpSuP, ('retinographie', 'oct', 'autres')),
+}
+
+_TECHNICAL_PARTS = {
+    'visual_acuity': VisualAcuity,
+    'refraction': Refraction,
+    'ocular_tension': OcularTension,
+    'pachymetry': Pachymetry,
+}
+
+
+def _examens_changed(*filters, **lookups):
+    """Après une écriture : table de faits et version des dossiers des Examens filtrés."""
+    exam_facts_refresh(*filters, **lookups)
+    dossier_version_bump(Examens.objects.filter(*filters, **lookups).values('patient'))
+
+
+def _raw_delete(queryset):
+    """DELETE direct, sans Collector : ni SELECT des lignes, ni cascade, ni signaux pre/post_delete."""
+    return queryset._raw_delete(queryset.db)
+
+
+def _columns(rows, width):
+    """Transpose des lignes values_list en `width` ensembles d'identifiants non nuls."""
+    columns = [set() for _ in range(width)]
+    for row in rows:
+        for column, value in zip(columns, row):
+            if value is not None:
+                column.add(value)
+    return columns
+
+
+_EYE_PARTS = {
+    'plaintes': Plaintes,
+    'bp_sg_anterieur': BiomicroscopySegmentAnterieur,
+    'bp_sg_posterieur': BiomicroscopySegmentPosterieur,
+}
+_CLINICAL_PATHS = [
+    'conclusion', 'perimetry', 'bp_sup',
+    *(f'{side}__{part}' for side in ('og', 'od') for part in _EYE_PARTS),
+]
+
+
+def _assign(instance, values):
+    """Affecte les valeurs qui diffèrent de l'instance et retourne les noms des champs modifiés."""
+    changed = set()
+    for name, value in values.items():
+        field = instance._meta.get_field(name)
+        if field.is_relation:
+            # Comparaison sur l'id : pas de requête pour charger l'objet lié
+            current, new = getattr(instance, field.attname), getattr(value, 'pk', value)
+        else:
+            current, new = getattr(instance, name), value
+        if current != new:
+            setattr(instance, name, value)
+            changed.add(name)
+    return changed
+
+
+def _link_examen(examen, **parts):
+    """Rattache l'examen technique/clinique à l'Examens et met à jour is_completed, si besoin (1 UPDATE)."""
+    linked = all(getattr(examen, f'{name}_id') == part.pk for name, part in parts.items())
+    for name, part in parts.items():
+        setattr(examen, name, part)
+    technical, clinical = examen.technical_examen, examen.clinical_examen
+    is_completed = bool(technical and technical.is_completed and clinical and clinical.is_completed)
+    if linked and examen.is_completed == is_completed:
+        return False
+    Examens.objects.filter(pk=examen.pk).update(is_completed=is_completed, modified=timezone.now(), **parts)
+    examen.is_completed = is_completed
+    return True
+
+
+def _validate_root(instance):
+    """
+    Validation d'une racine d'agrégat (sous-classe de Base) sans les requêtes de full_clean() :
+    l'unicité (patient, visite) et l'existence des FK sont garanties par la base (voir _write_root).
+    """
+    instance.clean_fields(exclude=[f.name for f in instance._meta.concrete_fields if f.is_relation])
+    instance.clean()
+
+
+def _write_root(instance, changed):
+    """
+    INSERT de la racine si elle est nouvelle, sinon UPDATE des seules colonnes modifiées.
+    Ni bulk_create() ni update() ne passent par Base.save() : la violation de l'unicité (patient, visite),
+    y compris entre créations concurrentes, est traduite ici de la même façon.
+    """
+    try:
+        if instance.pk is None:
+            type(instance).objects.bulk_create([instance])
+        elif changed:
+            instance.modified = timezone.now()
+            type(instance).objects.filter(pk=instance.pk).update(
+                modified=instance.modified,
+                **{field: getattr(instance, field) for field in changed},
+            )
+    except IntegrityError as e:
+        if instance._is_unique_visite_violation(e):
+            raise instance.unique_visite_error() from e
+        raise
+
+
+class _UnitOfWork:
+    """Écritures d'un agrégat regroupées par modèle : un INSERT multi-lignes et un UPDATE par modèle."""
+
+    def __init__(self):
+        self.creates = defaultdict(list)
+        self.updates = defaultdict(dict)  # model -> {id(instance): (instance, champs)}
+
+    def add(self, instance, fields=()):
+        if instance.pk is None:
+            self.creates[type(instance)].append(instance)
+        elif fields:
+            _, known = self.updates[type(instance)].setdefault(id(instance), (instance, set()))
+            known.update(fields)
+
+    def __bool__(self):
+        return any(self.creates.values()) or any(self.updates.values())
+
+    def flush(self, *models):
+        now = timezone.now()
+        for model in models:
+            if self.creates[model]:
+                model.objects.bulk_create(self.creates.pop(model))
+            if self.updates[model]:
+                instances, fields = [], {'modified'}
+                for instance, instance_fields in self.updates.pop(model).values():
+                    instance.modified = now
+                    instances.append(instance)
+                    fields.update(instance_fields)
+                model.objects.bulk_update(instances, sorted(fields))
+
+
+def delete_media_files(names):
+    """
+    Supprime du stockage les fichiers des examens supprimés et leurs déclinaisons (exécuté en tâche de fond).
+    Les blobs partagés du stockage adressé par le contenu sont laissés à collect_media_blobs.
+    """
+    for name in names:
+        if is_blob(name):
+            continue
+        for target in (name, *rendition_names(name)):
+            try:
+                default_storage.delete(target)
+            except Exception:
+                logger.exception('Impossible de supprimer le fichier %s', target)
+
+
+def _delete_replaced_file(old):
+    """Supprime le fichier remplacé une fois la transaction validée : un rollback le laisse en place."""
+    transaction.on_commit(partial(run_in_background, delete_media_files, [old.name]))
 
 
 class ExamenService:
@@ -14,64 +187,228 @@ class ExamenService:
     @staticmethod
     @transaction.atomic
     def create_examen(patient, visite):
-        if Examens.objects.filter(patient=patient, visite=visite).exists():
-            raise ValidationError("Un examen existe déjà pour ce patient et cette visite")
-        return Examens.objects.create(patient=patient, visite=visite)
+        # Doublon (patient, visite) : ValidationError levée par Examens.save via la contrainte
+        examen = Examens.objects.create(patient=patient, visite=visite)
+        _examens_changed(pk=examen.pk)
+        return examen
 
     @staticmethod
     @transaction.atomic
     def get_or_create_examen(patient, visite):
-        return Examens.objects.get_or_create(
+        examen, created = Examens.objects.get_or_create(
             patient=patient,
             visite=visite,
             defaults={'patient': patient, 'visite': visite}
         )
+        if created:
+            _examens_changed(pk=examen.pk)
+        return examen, created
 
     @staticmethod
     @transaction.atomic
     def complete_examen(examen_id):
         examen = Examens.objects.get(pk=examen_id)
-        examen.full_clean()
+        validate_for_save(examen)
         examen.save()
+        _examens_changed(pk=examen.pk)
         return examen
 
     @staticmethod
-    @transaction.atomic
     def delete_examen_complet(examen_id):
-        try:
-            examen = Examens.objects.get(pk=examen_id)
-            visite = examen.visite
-            patient = examen.patient
-        except Examens.DoesNotExist:
-            raise ValueError(f"L'examen avec l'ID {examen_id} n'existe pas.", code=404)
-
-        try:
-            technical_examen = TechnicalExamen.objects.get(visite=visite, patient=patient)
-            if technical_examen:
-                technical_examen.delete()
-        except TechnicalExamen.DoesNotExist:
-            pass
-        try:
-            clinical_examen = ClinicalExamen.objects.get(visite=visite, patient=patient)
-            if clinical_examen:
-                clinical_examen.delete()
-        except ClinicalExamen.DoesNotExist:
-            pass
-        examen.delete()
-        try:
-            driver_experience = DriverExperience.objects.get(patient=patient, visite=visite)
-            if driver_experience:
-                driver_experience.delete()
-        except DriverExperience.DoesNotExist:
-            pass
+        if not Examens.objects.filter(pk=examen_id).exists():
+            raise ValueError(f"L'examen avec l'ID {examen_id} n'existe pas.")
+        ExamenService.delete_visites(Examens.objects.filter(pk=examen_id))
         return {"detail": f"Examen #{examen_id} et ses dépendances supprimés avec succès."}
 
+    @staticmethod
+    @transaction.atomic
+    def delete_visites(examens):
+        """
+        Supprime en bloc les visites du queryset `examens` avec toutes leurs dépendances
+        (examens technique et clinique, sous-modèles, yeux, expérience de conduite).
+        Le nombre de requêtes est borné quel que soit le nombre de visites : les SELECT des identifiants
+        puis un DELETE par table, sans Collector. Les cascades (liens des dossiers, table de faits) et
+        l'invalidation des statistiques faites par les signaux sont donc explicites ici.
+        Les fichiers médias sont supprimés après le commit, en tâche de fond.
+        """
+        # Tous les identifiants sont lus avant le premier DELETE
+        examen_ids, patient_ids = _columns(examens.values_list('pk', 'patient'), 2)
+        visite_du_lot = Exists(Examens.objects.filter(pk__in=examen_ids, patient=OuterRef('patient'), visite=OuterRef('visite')))
+
+        experience_ids = list(DriverExperience.objects.filter(visite_du_lot).values_list('pk', flat=True))
+        technical_rows = list(TechnicalExamen.objects.filter(visite_du_lot).values_list('pk', *_TECHNICAL_PARTS))
+        clinical_rows = list(
+            ClinicalExamen.objects.filter(visite_du_lot).values_list('pk', 'conclusion', 'perimetry', 'bp_sup', 'og', 'od')
+        )
+        technical_ids, *technical_parts = _columns(technical_rows, len(_TECHNICAL_PARTS) + 1)
+        clinical_ids, conclusion_ids, perimetry_ids, bp_sup_ids, og_ids, od_ids = _columns(clinical_rows, 6)
+        eye_ids = og_ids | od_ids
+        plaintes_ids, anterieur_ids, posterieur_ids = _columns(
+            EyeSide.objects.filter(pk__in=eye_ids).values_list('plaintes', 'bp_sg_anterieur', 'bp_sg_posterieur'), 3
+        )
+
+        media = [
+            name
+            for row in Perimetry.objects.filter(pk__in=perimetry_ids).values_list('image', 'images')
+            for name in row if name
+        ] + [
+            name
+            for row in BpSuP.objects.filter(pk__in=bp_sup_ids).values_list('retinographie', 'oct', 'autres')
+            for name in row if name
+        ]
+
+        dossier_version_bump(patient_ids)
+        deleted = Counter()
+        # Des conteneurs vers les feuilles : chaque DELETE ne trouve plus de ligne qui le référence
+        for model, field, ids in (
+            (HealthRecord.driver_experience.through, 'driverexperience', experience_ids),
+            (HealthRecord.examens.through, 'examens', examen_ids),
+            (ExamFact, 'examen', examen_ids),
+            (DriverExperience, 'pk', experience_ids),
+            (Examens, 'pk', examen_ids),
+            (TechnicalExamen, 'pk', technical_ids),
+            (ClinicalExamen, 'pk', clinical_ids),
+            *((model, 'pk', ids) for model, ids in zip(_TECHNICAL_PARTS.values(), technical_parts)),
+            (Conclusion, 'pk', conclusion_ids),
+            (Perimetry, 'pk', perimetry_ids),
+            (BpSuP, 'pk', bp_sup_ids),
+            (EyeSide, 'pk', eye_ids),
+            (Plaintes, 'pk', plaintes_ids),
+            (BiomicroscopySegmentAnterieur, 'pk', anterieur_ids),
+            (BiomicroscopySegmentPosterieur, 'pk', posterieur_ids),
+        ):
+            if ids:
+                count = _raw_delete(model.objects.filter(**{f'{field}__in': ids}))
+                if count:
+                    deleted[model._meta.label] += count
+
+        if media:
+            transaction.on_commit(partial(run_in_background, delete_media_files, media))
+        sections = list(EXAM_FACT_SECTIONS)
+        if experience_ids:
+            # Remplace le signal post_delete de DriverExperience (apps.analytics.signals)
+            sections += DashboardStatsSelector.EMPLOYEE_SECTION_DEPENDENCIES['health_record.DriverExperience']
+        transaction.on_commit(partial(dashboard_stats_invalidate, sections))
+        return dict(deleted)
+
 
 class ClinicalExamenService:
     """
     Service pour la gestion des examens cliniques
     """
 
+    @staticmethod
+    @transaction.atomic
+    def save_clinical_examen(data, *, examen_id=None, clinical_examen=None, replace=False):
+        """
+        Unité de travail de l'examen clinique : og, od (plaintes et segments), conclusion,
+        perimetry et bp_sup sont enregistrés en une transaction.
+        L'agrégat est chargé en une requête, les lignes d'un même modèle (plaintes et segments
+        des deux yeux) sont écrites en un INSERT multi-lignes et un UPDATE, seules les
+        colonnes modifiées sont écrites.
+
+        :param data: payload imbriqué validé par ClinicalExamenSerializer
+        :param replace: supprime du stockage les fichiers remplacés (perimetry, bp_sup)
+        """
+        data = {name: value for name, value in data.items() if value != {}}
+        examen = None
+
+        if clinical_examen is None:
+            examen = Examens.objects.select_related(
+                'technical_examen', *(f'clinical_examen__{path}' for path in _CLINICAL_PATHS)
+            ).get(pk=examen_id)
+            clinical_examen = examen.clinical_examen
+            if clinical_examen is None:
+                clinical_examen = ClinicalExamen.objects.select_related(*_CLINICAL_PATHS).filter(
+                    patient_id=examen.patient_id, visite=examen.visite
+                ).first() or ClinicalExamen(patient_id=examen.patient_id, visite=examen.visite)
+            data.pop('patient', None)
+            data.pop('visite', None)
+        elif any(
+            getattr(clinical_examen, f'{name}_id') and not ClinicalExamen._meta.get_field(name).is_cached(clinical_examen)
+            for name in ('conclusion', 'perimetry', 'bp_sup', 'og', 'od') if name in data
+        ):
+            clinical_examen = ClinicalExamen.objects.select_related(*_CLINICAL_PATHS).get(pk=clinical_examen.pk)
+
+        parts = {name: data.pop(name) for name in ('og', 'od', 'conclusion', 'perimetry', 'bp_sup') if name in data}
+        changed = _assign(clinical_examen, data)
+        uow = _UnitOfWork()
+
+        eyes = {}
+        for side in ('og', 'od'):
+            if side not in parts:
+                continue
+            eye = getattr(clinical_examen, side) if getattr(clinical_examen, f'{side}_id') else EyeSide()
+            eye_data = parts[side]
+            if eye.pk is None and set(eye_data) != set(_EYE_PARTS):
+                raise ValidationError({side: [f"{name} est requis" for name in _EYE_PARTS if name not in eye_data]})
+            for name, model in _EYE_PARTS.items():
+                if name not in eye_data:
+                    continue
+                part = getattr(eye, name) if getattr(eye, f'{name}_id') else model()
+                fields = _assign(part, eye_data[name])
+                if part.pk is None or fields:
+                    part.full_clean()
+                    uow.add(part, fields)
+                    setattr(eye, name, part)
+            eyes[side] = eye
+
+        conclusion_data = parts.get('conclusion')
+        if conclusion_data is not None:
+            conclusion = clinical_examen.conclusion if clinical_examen.conclusion_id else Conclusion()
+            fields = _assign(conclusion, conclusion_data)
+            if conclusion.pk is None or fields:
+                conclusion.full_clean()
+                uow.add(conclusion, fields)
+            if conclusion.pk is None:
+                clinical_examen.conclusion = conclusion
+                changed.add('conclusion')
+
+        written = bool(uow)
+        # Plaintes et segments des deux yeux : un INSERT et un UPDATE par modèle
+        uow.flush(*_EYE_PARTS.values(), Conclusion)
+        for side, eye in eyes.items():
+            if eye.pk is None:
+                eye.clean_fields(exclude=list(_EYE_PARTS))
+                uow.add(eye)
+                changed.add(side)
+        uow.flush(EyeSide)
+        for side, eye in eyes.items():
+            setattr(clinical_examen, side, eye)
+
+        # Fichiers : un enregistrement par modèle, FileField.pre_save gère le stockage
+        for name, model in (('perimetry', Perimetry), ('bp_sup', BpSuP)):
+            if name not in parts:
+                continue
+            current = getattr(clinical_examen, name) if getattr(clinical_examen, f'{name}_id') else None
+            if current is None:
+                instance = model(**parts[name])
+                validate_for_save(instance)
+                instance.save()
+                setattr(clinical_examen, name, instance)
+                changed.add(name)
+                continue
+            if replace:
+                for field, value in parts[name].items():
+                    old = getattr(current, field)
+                    if old and value and old != value and hasattr(old, 'delete'):
+                        _delete_replaced_file(old)
+            if fields := _assign(current, parts[name]):
+                validate_for_save(current)
+                current.save(update_fields=[*fields, 'modified'])
+                written = True
+
+        if clinical_examen.pk is None or changed:
+            _validate_root(clinical_examen)
+        _write_root(clinical_examen, changed)
+
+        if examen is not None and _link_examen(examen, clinical_examen=clinical_examen):
+            changed.add('examen')
+
+        if changed or written:
+            _examens_changed(clinical_examen=clinical_examen)
+        return clinical_examen
+
     @staticmethod
     @transaction.atomic
     def init_clinical_examen(examen_id):
@@ -84,6 +421,7 @@ class ClinicalExamenService:
         )
         examen.clinical_examen = clinical_examen
         examen.save()
+        _examens_changed(pk=examen.pk)
         return clinical_examen
 
     @staticmethod
@@ -91,7 +429,7 @@ class ClinicalExamenService:
     def create_plaintes(clinical_examen_id, data):
         clinical_examen = ClinicalExamen.objects.get(pk=clinical_examen_id)
         plaintes = Plaintes(**data)
-        plaintes.full_clean()
+        validate_for_save(plaintes)
         plaintes.save()
         clinical_examen.save()
         return plaintes
@@ -102,8 +440,9 @@ class ClinicalExamenService:
         eye = EyeSide.objects.get(pk=eye_side_id)
         for field, value in data.items():
             setattr(eye, field, value)
-        eye.full_clean()
+        validate_for_save(eye)
         eye.save()
+        _examens_changed(Q(clinical_examen__og=eye) | Q(clinical_examen__od=eye))
         return eye
 
     @staticmethod
@@ -113,11 +452,11 @@ class ClinicalExamenService:
         if eye.bp_sg_anterieur:
             for field, value in data.items():
                 setattr(eye.bp_sg_anterieur, field, value)
-            eye.bp_sg_anterieur.full_clean()
+            validate_for_save(eye.bp_sg_anterieur)
             eye.bp_sg_anterieur.save()
         else:
             segment = BiomicroscopySegmentAnterieur(**data)
-            segment.full_clean()
+            validate_for_save(segment)
             segment.save()
             eye.bp_sg_anterieur = segment
             eye.save()
@@ -130,11 +469,11 @@ class ClinicalExamenService:
         if eye.bp_sg_posterieur:
             for field, value in data.items():
                 setattr(eye.bp_sg_posterieur, field, value)
-            eye.bp_sg_posterieur.full_clean()
+            validate_for_save(eye.bp_sg_posterieur)
             eye.bp_sg_posterieur.save()
         else:
             segment = BiomicroscopySegmentPosterieur(**data)
-            segment.full_clean()
+            validate_for_save(segment)
             segment.save()
             eye.bp_sg_posterieur = segment
             eye.save()
@@ -149,16 +488,17 @@ class ClinicalExamenService:
                 if replace:
                     old = getattr(exam.perimetry, field)
                     if old and value and old != value and hasattr(old, 'delete'):
-                        old.delete(save=False)
+                        _delete_replaced_file(old)
                 setattr(exam.perimetry, field, value)
-            exam.perimetry.full_clean()
+            validate_for_save(exam.perimetry)
             exam.perimetry.save()
         else:
             peri = Perimetry(**data)
-            peri.full_clean()
+            validate_for_save(peri)
             peri.save()
             exam.perimetry = peri
             exam.save()
+        _examens_changed(clinical_examen=exam)
         return exam.perimetry
 
     @staticmethod
@@ -170,18 +510,40 @@ class ClinicalExamenService:
                 if replace:
                     old = getattr(exam.bp_sup, field)
                     if old and value and old != value and hasattr(old, 'delete'):
-                        old.delete(save=False)
+                        _delete_replaced_file(old)
                 setattr(exam.bp_sup, field, value)
-            exam.bp_sup.full_clean()
+            validate_for_save(exam.bp_sup)
             exam.bp_sup.save()
         else:
             bp = BpSuP(**data)
-            bp.full_clean()
+            validate_for_save(bp)
             bp.save()
             exam.bp_sup = bp
             exam.save()
         return exam.bp_sup
 
+    @staticmethod
+    @transaction.atomic
+    def attach_file(target, object_id, field, name, file):
+        """
+        Enregistre `file` dans le champ `field` de la Perimetry ou du BpSuP `object_id`
+        (`target` : clé de EXAMEN_FILE_FIELDS) et supprime le fichier remplacé.
+        """
+        model, fields = EXAMEN_FILE_FIELDS[target]
+        if field not in fields:
+            raise ValidationError({'field': f'Champ attendu parmi : {", ".join(fields)}'})
+        instance = model.objects.select_for_update().filter(pk=object_id).first()
+        if instance is None:
+            raise ValidationError({'object_id': 'Objet introuvable'})
+
+        old = getattr(instance, field)
+        if old:
+            _delete_replaced_file(old)
+        getattr(instance, field).save(name, file, save=False)
+        instance.save(update_fields=[field, 'modified'])
+        _examens_changed(**{f'clinical_examen__{target}': instance.pk})
+        return instance
+
     @staticmethod
     @transaction.atomic
     def create_or_update_eye_side(clinical_examen_id, side: str, data: dict):
@@ -196,18 +558,18 @@ class ClinicalExamenService:
             if plaintes_data:
                 for f, v in plaintes_data.items():
                     setattr(current_eye.plaintes, f, v)
-                current_eye.plaintes.full_clean()
+                validate_for_save(current_eye.plaintes)
                 current_eye.plaintes.save()
 
             if sg_ant_data:
                 if current_eye.bp_sg_anterieur:
                     for f, v in sg_ant_data.items():
                         setattr(current_eye.bp_sg_anterieur, f, v)
-                    current_eye.bp_sg_anterieur.full_clean()
+                    validate_for_save(current_eye.bp_sg_anterieur)
                     current_eye.bp_sg_anterieur.save()
                 else:
                     segment = BiomicroscopySegmentAnterieur(**sg_ant_data)
-                    segment.full_clean()
+                    validate_for_save(segment)
                     segment.save()
                     current_eye.bp_sg_anterieur = segment
 
@@ -215,30 +577,30 @@ class ClinicalExamenService:
                 if current_eye.bp_sg_posterieur:
                     for f, v in sg_post_data.items():
                         setattr(current_eye.bp_sg_posterieur, f, v)
-                    current_eye.bp_sg_posterieur.full_clean()
+                    validate_for_save(current_eye.bp_sg_posterieur)
                     current_eye.bp_sg_posterieur.save()
                 else:
                     segment = BiomicroscopySegmentPosterieur(**sg_post_data)
-                    segment.full_clean()
+                    validate_for_save(segment)
                     segment.save()
                     current_eye.bp_sg_posterieur = segment
 
-            current_eye.full_clean()
+            validate_for_save(current_eye)
             current_eye.save()
 
         else:
             plaintes = Plaintes(**plaintes_data)
-            plaintes.full_clean()
+            validate_for_save(plaintes)
             plaintes.save()
             sg_anterieur = None
             sg_posterieur = None
             if sg_ant_data:
                 sg_anterieur = BiomicroscopySegmentAnterieur(**sg_ant_data)
-                sg_anterieur.full_clean()
+                validate_for_save(sg_anterieur)
                 sg_anterieur.save()
             if sg_post_data:
                 sg_posterieur = BiomicroscopySegmentPosterieur(**sg_post_data)
-                sg_posterieur.full_clean()
+                validate_for_save(sg_posterieur)
                 sg_posterieur.save()
 
             eye_side = EyeSide.objects.create(
@@ -249,6 +611,7 @@ class ClinicalExamenService:
             setattr(clinical_examen, side, eye_side)
             clinical_examen.save()
 
+        _examens_changed(clinical_examen=clinical_examen)
         return getattr(clinical_examen, side)
 
     @staticmethod
@@ -262,7 +625,7 @@ class ClinicalExamenService:
             exam.og,
             exam.od
         ])
-        exam.full_clean()
+        validate_for_save(exam)
         exam.save()
         return exam
 
@@ -272,6 +635,73 @@ class TechnicalExamenService:
     Service pour la gestion des examens techniques
     """
 
+    @staticmethod
+    @transaction.atomic
+    def save_technical_examen(data, *, examen_id=None, technical_examen=None):
+        """
+        Unité de travail de l'examen technique : crée ou met à jour l'examen et ses quatre mesures
+        (visual_acuity, refraction, ocular_tension, pachymetry) en une transaction.
+        L'agrégat est chargé une seule fois (select_related), chaque modèle est validé une fois,
+        seules les lignes et colonnes modifiées sont écrites.
+
+        :param data: champs de TechnicalExamen et dict par mesure
+        :param examen_id: création/rattachement depuis un Examens
+        :param technical_examen: mise à jour d'un examen existant (mesures déjà jointes de préférence)
+        """
+        data = dict(data)
+        data.pop('is_completed', None)  # recalculé
+        parts = {name: data.pop(name) for name in _TECHNICAL_PARTS if name in data}
+        examen = None
+        parts_written = False
+
+        if technical_examen is None:
+            examen = Examens.objects.select_related(
+                'clinical_examen', *(f'technical_examen__{name}' for name in _TECHNICAL_PARTS)
+            ).get(pk=examen_id)
+            technical_examen = examen.technical_examen
+            if technical_examen is None:
+                technical_examen = TechnicalExamen.objects.select_related(*_TECHNICAL_PARTS).filter(
+                    patient_id=examen.patient_id, visite=examen.visite
+                ).first() or TechnicalExamen(patient_id=examen.patient_id, visite=examen.visite)
+            data.pop('patient', None)
+            data.pop('visite', None)
+        elif any(
+            getattr(technical_examen, f'{name}_id') and not TechnicalExamen._meta.get_field(name).is_cached(technical_examen)
+            for name in parts
+        ):
+            technical_examen = TechnicalExamen.objects.select_related(*_TECHNICAL_PARTS).get(pk=technical_examen.pk)
+
+        changed = _assign(technical_examen, data)
+        for name, values in parts.items():
+            part = getattr(technical_examen, name) if getattr(technical_examen, f'{name}_id') else None
+            if part is None:
+                part = _TECHNICAL_PARTS[name](**values)
+                validate_for_save(part)
+                part.save()
+                setattr(technical_examen, name, part)
+                changed.add(name)
+                parts_written = True
+            elif part_changed := _assign(part, values):
+                validate_for_save(part)
+                part.save(update_fields=[*part_changed, 'modified'])
+                parts_written = True
+
+        is_completed = bool(technical_examen.completed())
+        if technical_examen.is_completed != is_completed:
+            technical_examen.is_completed = is_completed
+            changed.add('is_completed')
+
+        if technical_examen.pk is None or changed:
+            _validate_root(technical_examen)
+        _write_root(technical_examen, changed)
+
+        if examen is not None and _link_examen(examen, technical_examen=technical_examen):
+            changed.add('examen')
+
+        if changed or parts_written:
+            _examens_changed(technical_examen=technical_examen)
+        return technical_examen
+
     @staticmethod
     @transaction.atomic
     def init_technical_examen(examen_id):
@@ -292,6 +722,7 @@ class TechnicalExamenService:
         )
         examen.technical_examen = technical_examen
         examen.save(update_fields=["technical_examen"])
+        _examens_changed(pk=examen.pk)
         return technical_examen
 
     @staticmethod
@@ -301,14 +732,15 @@ class TechnicalExamenService:
         if technical_examen.visual_acuity:
             for field, value in data.items():
                 setattr(technical_examen.visual_acuity, field, value)
-            technical_examen.visual_acuity.full_clean()
+            validate_for_save(technical_examen.visual_acuity)
             technical_examen.visual_acuity.save()
         else:
             visual = VisualAcuity(**data)
-            visual.full_clean()
+            validate_for_save(visual)
             visual.save()
             technical_examen.visual_acuity = visual
             technical_examen.save()
+        _examens_changed(technical_examen=technical_examen)
         return technical_examen.visual_acuity
 
     @staticmethod
@@ -318,14 +750,15 @@ class TechnicalExamenService:
         if technical_examen.refraction:
             for field, value in data.items():
                 setattr(technical_examen.refraction, field, value)
-            technical_examen.refraction.full_clean()
+            validate_for_save(technical_examen.refraction)
             technical_examen.refraction.save()
         else:
             refr = Refraction(**data)
-            refr.full_clean()
+            validate_for_save(refr)
             refr.save()
             technical_examen.refraction = refr
             technical_examen.save()
+        _examens_changed(technical_examen=technical_examen)
         return technical_examen.refraction
 
     @staticmethod
@@ -335,14 +768,15 @@ class TechnicalExamenService:
         if technical_examen.ocular_tension:
             for field, value in data.items():
                 setattr(technical_examen.ocular_tension, field, value)
-            technical_examen.ocular_tension.full_clean()
+            validate_for_save(technical_examen.ocular_tension)
             technical_examen.ocular_tension.save()
         else:
             tension = OcularTension(**data)
-            tension.full_clean()
+            validate_for_save(tension)
             tension.save()
             technical_examen.ocular_tension = tension
             technical_examen.save()
+        _examens_changed(technical_examen=technical_examen)
         return technical_examen.ocular_tension
 
     @staticmethod
@@ -352,14 +786,15 @@ class TechnicalExamenService:
         if technical_examen.pachymetry:
             for field, value in data.items():
                 setattr(technical_examen.pachymetry, field, value)
-            technical_examen.pachymetry.full_clean()
+            validate_for_save(technical_examen.pachymetry)
             technical_examen.pachymetry.save()
         else:
             pachy = Pachymetry(**data)
-            pachy.full_clean()
+            validate_for_save(pachy)
             pachy.save()
             technical_examen.pachymetry = pachy
             technical_examen.save()
+        _examens_changed(technical_examen=technical_examen)
         return technical_examen.pachymetry
 
     @staticmethod
@@ -367,7 +802,7 @@ class TechnicalExamenService:
     def complete_technical_examen(technical_examen_id):
         technical_examen = TechnicalExamen.objects.get(pk=technical_examen_id)
         technical_examen.is_completed = technical_examen.completed()
-        technical_examen.full_clean()
+        validate_for_save(technical_examen)
         technical_examen.save()
         return technical_examen
 
@@ -382,12 +817,13 @@ class ConclusionService:
         if clinical_examen.conclusion:
             for field, value in data.items():
                 setattr(clinical_examen.conclusion, field, value)
-            clinical_examen.conclusion.full_clean()
+            validate_for_save(clinical_examen.conclusion)
             clinical_examen.conclusion.save()
         else:
             conclusion = Conclusion(**data)
-            conclusion.full_clean()
+            validate_for_save(conclusion)
             conclusion.save()
             clinical_examen.conclusion = conclusion
             clinical_examen.save()
+        _examens_changed(clinical_examen=clinical_examen)
         return clinical_examen.conclusion
\ No newline at end of file
@@ -3,6 +3,7 @@ from django.db import transaction
 from apps.health_record.models import (
     DriverExperience, Antecedent, HealthRecord, Conducteur, Examens
 )
+from services.dossiers import dossier_version_bump
 from services.examens import ClinicalExamenService, ExamenService, TechnicalExamenService
 
 class DriverExperienceService:
@@ -31,6 +32,19 @@ class DriverExperienceService:
             visite=visite,
             defaults=defaults
         )
+        dossier_version_bump([patient_id])
+        return driver_exp
+
+    @staticmethod
+    @transaction.atomic
+    def update_driver_experience(driver_exp, data):
+        """Mise à jour partielle (PATCH) d'une expérience de conduite existante."""
+        patients = {driver_exp.patient_id}
+        for field, value in data.items():
+            setattr(driver_exp, field, value)
+        driver_exp.save()
+        # Un changement de patient invalide aussi l'ancien dossier
+        dossier_version_bump(patients | {driver_exp.patient_id})
         return driver_exp
 
     @staticmethod
@@ -43,6 +57,7 @@ class DriverExperienceService:
     @staticmethod
     @transaction.atomic
     def delete_driver_experience(patient_id, visite=None):
+        dossier_version_bump([patient_id])
         queryset = DriverExperience.objects.filter(patient_id=patient_id)
         if visite is not None:
             experience = queryset.filter(visite=visite).first()
@@ -85,6 +100,19 @@ class AntecedentService:
             defaults=antecedent_data
         )
         print(f"Antecedent {'created' if created else 'updated'} for patient {patient_id}")
+        dossier_version_bump([patient_id])
+        return antecedent
+
+    @staticmethod
+    @transaction.atomic
+    def update_antecedent(antecedent, data):
+        """Mise à jour partielle (PATCH) d'un antécédent existant."""
+        patients = {antecedent.patient_id}
+        for field, value in data.items():
+            setattr(antecedent, field, value)
+        antecedent.save()
+        # Un changement de patient invalide aussi l'ancien dossier
+        dossier_version_bump(patients | {antecedent.patient_id})
         return antecedent
 
     @staticmethod
@@ -122,6 +150,7 @@ class HealthRecordService:
             driver_experience = DriverExperience.objects.filter(pk__in=driver_exp_ids, patient=patient)
             health_record.driver_experience.add(*driver_experience)
 
+        dossier_version_bump([patient_id])
         return health_record
 
     @staticmethod
@@ -186,8 +215,19 @@ class HealthRecordService:
             health_record.driver_experience.add(driver_exp)
 
         health_record.save()
+        dossier_version_bump([patient_id])
         return health_record
 
+    @staticmethod
+    @transaction.atomic
+    def set_risky_patient(patient_id, risky):
+        """Marque ou démarque le patient comme à risque. Lève HealthRecord.DoesNotExist sans dossier."""
+        record = HealthRecord.objects.get(patient_id=patient_id)
+        record.risky_patient = risky
+        record.save()
+        dossier_version_bump([patient_id])
+        return record
+
     @staticmethod
     def get_full_health_record(patient_id):
         """
@@ -213,4 +253,5 @@ class HealthRecordService:
         if examen.patient != health_record.patient:
             raise ValidationError("L'examen ne correspond pas au patient")
         health_record.examens.add(examen)
+        dossier_version_bump([health_record.patient_id])
         return health_record
\ No newline at end of file
@@ -0,0 +1,49 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count
+from django.utils import timezone
+
+from services.examens import EXAMEN_FILE_FIELDS
+from utils.images import rendition_names
+from utils.storage import BLOB_PREFIX, exam_media_storage, stored_blobs
+
+
+def media_blob_references() -> Counter:
+    """Nombre de lignes Perimetry / BpSuP qui référencent chaque blob, une requête par champ fichier."""
+    references = Counter()
+    for model, fields in EXAMEN_FILE_FIELDS.values():
+        for field in fields:
+            references.update(dict(
+                model.objects.filter(**{f'{field}__startswith': BLOB_PREFIX})
+                .order_by().values(field).annotate(total=Count('pk')).values_list(field, 'total')
+            ))
+    return references
+
+
+def media_blobs_collect(*, grace=None, dry_run=False, storage=None) -> dict:
+    """
+    Supprime les blobs qu'aucune ligne ne référence plus, avec leurs déclinaisons.
+    Un blob écrit ou réutilisé depuis moins de `grace` (MEDIA_BLOB_GRACE_HOURS) est conservé :
+    la ligne qui le référence n'est peut-être pas encore validée.
+    """
+    storage = storage or exam_media_storage()
+    if grace is None:
+        grace = timedelta(hours=settings.MEDIA_BLOB_GRACE_HOURS)
+    cutoff = timezone.now() - grace
+    references = media_blob_references()
+    result = {'blobs': 0, 'references': sum(references.values()), 'deleted': 0, 'freed': 0}
+
+    for name in stored_blobs(storage):
+        result['blobs'] += 1
+        if references[name] or storage.get_modified_time(name) > cutoff:
+            continue
+        result['deleted'] += 1
+        result['freed'] += storage.size(name)
+        if not dry_run:
+            storage.delete_blob(name)
+            for rendition in rendition_names(name):
+                default_storage.delete(rendition)
+    return result
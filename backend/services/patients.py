@@ -3,6 +3,8 @@ from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 
 from apps.patients.models import Conducteur, Vehicule
+from services.analytics import exam_facts_refresh
+from services.dossiers import dossier_version_bump
 from services.health_records import HealthRecordService
 
 @transaction.atomic
@@ -36,6 +38,9 @@ def conducteur_update(conducteur: Conducteur, **data) -> Conducteur:
     for attr, value in data.items():
         setattr(conducteur, attr, value)
     conducteur.save()
+    # Sexe, permis et service sont recopiés dans la table de faits des examens
+    exam_facts_refresh(patient=conducteur)
+    dossier_version_bump([conducteur])
     return conducteur
 
 @transaction.atomic
@@ -50,6 +55,7 @@ def validate_vehicule_data(data: dict):
 def vehicule_create(**data) -> Vehicule:
     validate_vehicule_data(data)
     vehicule = Vehicule.objects.create(**data)
+    dossier_version_bump([vehicule.conducteur_id])
     return vehicule
 
 @transaction.atomic
@@ -58,4 +64,11 @@ def vehicule_update(vehicule: Vehicule, **data) -> Vehicule:
     for attr, value in data.items():
         setattr(vehicule, attr, value)
     vehicule.save()
+    dossier_version_bump([vehicule.conducteur_id])
     return vehicule
+
+
+@transaction.atomic
+def vehicule_delete(vehicule: Vehicule):
+    dossier_version_bump([vehicule.conducteur_id])
+    vehicule.delete()
@@ -0,0 +1,101 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Value
+from django.utils import timezone
+
+from apps.patients.models import Conducteur, LicenceExpiryReminder
+from services.authemail import insert_multi_format_emails
+from utils.models.functions import Row
+
+REMINDER_FIELDS = ('id', 'email', 'first_name', 'last_name', 'numero_permis', 'date_peremption_permis')
+
+
+def _due_conducteurs(today, days):
+    """
+    Conducteurs dont le permis expire dans les `days` jours et qui n'ont pas encore reçu, pour cette
+    date de péremption, de rappel d'une fenêtre égale ou plus proche. Balayage d'intervalle sur l'index
+    (date_peremption_permis, id) : seuls les permis de la fenêtre sont lus, pas toute la table.
+    """
+    already_sent = LicenceExpiryReminder.objects.filter(
+        conducteur=OuterRef('pk'),
+        date_peremption_permis=OuterRef('date_peremption_permis'),
+        days_before__lte=days,
+    )
+    return (
+        Conducteur.objects
+        .filter(date_peremption_permis__gte=today, date_peremption_permis__lte=today + timedelta(days=days))
+        .filter(~Exists(already_sent))
+        .order_by('date_peremption_permis', 'id')
+    )
+
+
+def _record_reminders(conducteurs, days):
+    """
+    Trace les rappels du lot (INSERT ... ON CONFLICT DO NOTHING RETURNING) et renvoie les ids des
+    conducteurs dont le rappel vient d'être inséré : ceux déjà tracés par un autre worker sont écartés.
+    """
+    meta = LicenceExpiryReminder._meta
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(meta.get_field(name).column) for name in (
+        'conducteur', 'date_peremption_permis', 'days_before', 'created', 'modified',
+    ))
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) '
+            'SELECT conducteur_id, date_peremption_permis, %s, %s, %s '
+            'FROM unnest(%s::bigint[], %s::date[]) AS chunk (conducteur_id, date_peremption_permis) '
+            f'ON CONFLICT DO NOTHING RETURNING {quote(meta.get_field("conducteur").column)}',
+            [
+                days, now, now,
+                [conducteur['id'] for conducteur in conducteurs],
+                [conducteur['date_peremption_permis'] for conducteur in conducteurs],
+            ],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _remind_chunk(conducteurs, today, days):
+    recorded = _record_reminders(conducteurs, days)
+    # Emails insérés dans la transaction du lot, pour les seuls rappels tracés ici :
+    # ni rappel tracé sans email, ni email sans trace, ni doublon avec un worker concurrent
+    return insert_multi_format_emails('licence_expiry_email', [
+        (conducteur['email'], {**conducteur, 'days_left': (conducteur['date_peremption_permis'] - today).days})
+        for conducteur in conducteurs
+        if conducteur['id'] in recorded
+    ])
+
+
+def licence_expiry_reminders_send(*, today=None, windows=None, chunk_size=None) -> Counter:
+    """
+    Met en file un rappel d'expiration de permis pour chaque conducteur entré dans une fenêtre
+    (LICENCE_EXPIRY_REMINDER_DAYS, ex. J-30 puis J-7). Idempotent : les rappels envoyés sont tracés
+    par (conducteur, date de péremption, fenêtre), un renouvellement du permis relance le cycle.
+
+    Les fenêtres sont traitées de la plus proche à la plus lointaine : un conducteur découvert à J-5
+    ne reçoit que le rappel J-7. Chaque lot est verrouillé (SKIP LOCKED) et validé séparément,
+    plusieurs workers peuvent donc tourner en même temps sans doublon.
+    """
+    today = today or timezone.localdate()
+    chunk_size = chunk_size or settings.LICENCE_EXPIRY_REMINDER_CHUNK_SIZE
+    sent = Counter()
+    for days in sorted(windows or settings.LICENCE_EXPIRY_REMINDER_DAYS):
+        due, position = _due_conducteurs(today, days), None
+        while True:
+            chunk = due
+            if position is not None:
+                chunk = chunk.alias(_keyset=Row('date_peremption_permis', 'id')).filter(
+                    _keyset__gt=Row(*(Value(value) for value in position))
+                )
+            with transaction.atomic():
+                conducteurs = list(
+                    chunk.select_for_update(skip_locked=True).values(*REMINDER_FIELDS)[:chunk_size]
+                )
+                if not conducteurs:
+                    break
+                sent[days] += _remind_chunk(conducteurs, today, days)
+            position = (conducteurs[-1]['date_peremption_permis'], conducteurs[-1]['id'])
+    return sent
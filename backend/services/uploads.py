@@ -0,0 +1,119 @@
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from apps.examens.models import ChunkedUpload
+from services.examens import ClinicalExamenService, EXAMEN_FILE_FIELDS
+
+
+class UploadOffsetConflict(Exception):
+    """Le morceau ne commence pas là où l'envoi s'est arrêté : le client doit reprendre à `offset`."""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload offset is {offset}')
+        self.offset = offset
+
+
+class _PartialFile(File):
+    # FileSystemStorage déplace les fichiers qui exposent temporary_file_path() au lieu de les copier
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def chunked_upload_create(*, user, filename, size, sha256='') -> ChunkedUpload:
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise ValidationError({'size': f'Taille maximale : {settings.CHUNKED_UPLOAD_MAX_SIZE} octets'})
+    upload = ChunkedUpload.objects.create(
+        user=user, filename=os.path.basename(filename), size=size, sha256=sha256.lower()
+    )
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.path, 'wb').close()
+    return upload
+
+
+@transaction.atomic
+def chunked_upload_append(*, upload_id, user, offset, stream, length) -> ChunkedUpload:
+    """
+    Ajoute au fichier partiel les `length` octets lus dans `stream` (le corps de la requête),
+    par blocs de CHUNKED_UPLOAD_BLOCK_SIZE : la mémoire utilisée ne dépend pas de la taille du morceau.
+    Si le client se déconnecte en cours de route, les octets reçus sont conservés et l'envoi reprend
+    à la nouvelle position.
+    """
+    upload = ChunkedUpload.objects.select_for_update().get(pk=upload_id, user=user)
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise ValidationError('Envoi déjà finalisé')
+    if offset != upload.offset:
+        raise UploadOffsetConflict(upload.offset)
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise ValidationError(f'Morceau trop gros (maximum {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE} octets)')
+    if offset + length > upload.size:
+        raise ValidationError('Le morceau dépasse la taille annoncée du fichier')
+
+    written = 0
+    with open(upload.path, 'r+b') as part:
+        # Des octets écrits par une tentative dont la position n'a pas été enregistrée sont écrasés
+        part.seek(offset)
+        part.truncate()
+        while written < length:
+            block = stream.read(min(settings.CHUNKED_UPLOAD_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            part.write(block)
+            written += len(block)
+
+    upload.offset += written
+    upload.save(update_fields=['offset', 'modified'])
+    return upload
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        while block := part.read(settings.CHUNKED_UPLOAD_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@transaction.atomic
+def chunked_upload_finalize(*, upload_id, user, target, object_id, field):
+    """
+    Vérifie que l'envoi est complet (et l'empreinte SHA-256 si elle a été annoncée), puis attache
+    le fichier au champ `field` de la Perimetry ou du BpSuP `object_id` (`target` : perimetry, bp_sup).
+    """
+    upload = ChunkedUpload.objects.select_for_update().get(pk=upload_id, user=user)
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise ValidationError('Envoi déjà finalisé')
+    if target not in EXAMEN_FILE_FIELDS:
+        raise ValidationError({'target': f'Cible attendue parmi : {", ".join(EXAMEN_FILE_FIELDS)}'})
+    if upload.offset != upload.size:
+        raise ValidationError(f'Envoi incomplet : {upload.offset}/{upload.size} octets reçus')
+    if upload.sha256 and _sha256(upload.path) != upload.sha256:
+        raise ValidationError({'sha256': 'Empreinte différente du fichier reçu'})
+
+    with open(upload.path, 'rb') as part:
+        instance = ClinicalExamenService.attach_file(target, object_id, field, upload.filename, _PartialFile(part))
+    upload.status = ChunkedUpload.Status.COMPLETE
+    upload.save(update_fields=['status', 'modified'])
+    return instance
+
+
+def _remove_part(upload):
+    try:
+        os.remove(upload.path)
+    except FileNotFoundError:
+        pass
+
+
+def chunked_uploads_cleanup(*, older_than=None) -> int:
+    """Supprime les envois finalisés et ceux abandonnés depuis `older_than` (CHUNKED_UPLOAD_EXPIRY_HOURS)."""
+    older_than = older_than or timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    uploads = ChunkedUpload.objects.filter(modified__lt=timezone.now() - older_than)
+    for upload in uploads.only('pk'):
+        _remove_part(upload)
+    return uploads.delete()[0]
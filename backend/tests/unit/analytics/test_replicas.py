@@ -0,0 +1,100 @@
+import pytest
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.patients.models import Conducteur
+from apps.users.models import User
+from utils.replicas import ReplicaPinMiddleware, ReplicaRouter, replica_safe, use_replica
+
+router = ReplicaRouter()
+
+
+@replica_safe
+def read_alias():
+    return router.db_for_read(Conducteur)
+
+
+@replica_safe
+def stream_aliases():
+    for _ in range(2):
+        yield router.db_for_read(Conducteur)
+
+
+@pytest.fixture
+def replica(monkeypatch, settings, tmp_path):
+    # Le routeur ne fait que choisir l'alias : aucune requête n'est envoyée au réplica
+    monkeypatch.setattr('utils.replicas.replica_alias', lambda: 'replica')
+    # Cache partagé entre les processus, sans table : un répertoire
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.REPLICA_PIN_CACHE: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    return 'replica'
+
+
+def _middleware_call(method, user, view, status=200):
+    request = getattr(RequestFactory(), method)('/')
+    request.user = user
+    return ReplicaPinMiddleware(lambda request: HttpResponse(view(), status=status))(request)
+
+
+class TestReplicaRouter:
+
+    def test_without_replica_everything_stays_on_default(self):
+        with use_replica():
+            assert router.db_for_read(Conducteur) is None
+        assert router.db_for_write(Conducteur) == 'default'
+
+    def test_only_replica_safe_reads_use_the_replica(self, replica):
+        assert router.db_for_read(Conducteur) is None
+        assert read_alias() == replica
+        assert router.db_for_write(Conducteur) == 'default'
+
+    def test_stream_is_read_on_the_replica(self, replica):
+        stream = stream_aliases()
+        # Itéré après la sortie du selector, comme le corps d'une StreamingHttpResponse
+        assert list(stream) == [replica, replica]
+
+    def test_no_migrations_on_the_replica(self, settings):
+        assert not router.allow_migrate(settings.REPLICA_DATABASE_ALIAS, 'patients')
+        assert router.allow_migrate('default', 'patients')
+
+    @pytest.mark.django_db
+    def test_reads_inside_a_transaction_stay_on_default(self, replica):
+        # Le test tourne dans une transaction sur `default`
+        assert read_alias() is None
+
+
+class TestReadYourWrites:
+
+    def test_user_reads_own_writes_on_default(self, replica):
+        user, other = User(pk=1), User(pk=2)
+        assert _middleware_call('get', user, read_alias).content.decode() == replica
+
+        _middleware_call('post', user, lambda: '', status=201)
+
+        assert _middleware_call('get', user, read_alias).content.decode() == 'None'
+        assert _middleware_call('get', other, read_alias).content.decode() == replica
+
+    def test_failed_write_does_not_pin(self, replica):
+        user = User(pk=1)
+        _middleware_call('post', user, lambda: '', status=400)
+        assert _middleware_call('get', user, read_alias).content.decode() == replica
+
+    def test_no_pin_without_replica(self, settings):
+        user = User(pk=1)
+        _middleware_call('post', user, lambda: '', status=201)
+        assert caches[settings.REPLICA_PIN_CACHE].get(f'replica_pin:{user.pk}') is None
+
+    def test_process_local_pin_cache_is_refused(self, replica, settings):
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.REPLICA_PIN_CACHE: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        }
+        with pytest.raises(ImproperlyConfigured):
+            ReplicaPinMiddleware(lambda request: HttpResponse())
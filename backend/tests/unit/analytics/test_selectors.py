@@ -0,0 +1,84 @@
+import pytest
+from datetime import date
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.analytics.views import admin_dashboard_data
+from apps.users.models import User
+from factories.examens import ExamensFactory
+from factories.health_record import DriverExperienceFactory
+from factories.patients import ConducteurFactory
+from factories.users import UserFactory
+from selector.analytics import DashboardStatsSelector
+from services.analytics import exam_facts_refresh
+from selector.health_record import get_evolution_visites, get_evolution_visites_groupes
+from selector.users import (
+    get_admin_dashboard_stats,
+    get_user_kpis,
+    get_user_roles_distribution,
+    get_users_created_per_month,
+)
+
+
+@pytest.mark.django_db
+class TestEmployeeDashboardQueries:
+
+    def test_one_query_per_table(self, django_assert_num_queries):
+        patient, _ = ConducteurFactory.create_batch(2, type_permis='lourd')
+        ExamensFactory(
+            patient=patient,
+            technical_examen__patient=patient,
+            technical_examen__ocular_tension__od=22,
+            technical_examen__ocular_tension__og=10,
+            clinical_examen__patient=patient,
+            clinical_examen__conclusion__vision='incompatible',
+        )
+        exam_facts_refresh()
+        # Conducteur, ExamFact (tonus), ExamFact (conclusions), HealthRecord, DriverExperience
+        with django_assert_num_queries(5):
+            stats = DashboardStatsSelector.employee_stats()
+        assert stats['nombre_total_patients'] == 2
+        assert stats['distribution_permis'] == [{'type_permis': 'lourd', 'nombre': 2}]
+        assert stats['tonus_superieur_a_21'] == 1
+        assert stats['nombre_incompatibles'] == 1
+
+    def test_evolution_visites_matches_group_by_queries(self):
+        patient = ConducteurFactory()
+        for visite, jour in enumerate([date(2024, 12, 30), date(2025, 1, 2), date(2025, 2, 14)], start=1):
+            DriverExperienceFactory(
+                patient=patient, visite=visite, date_visite=jour, corporel_dommage=False, materiel_dommage=False
+            )
+        groupes = get_evolution_visites_groupes()
+        for group_by in ('mois', 'semaine', 'annee'):
+            assert groupes[f'par_{group_by}'] == get_evolution_visites(group_by=group_by)
+
+
+@pytest.mark.django_db
+class TestAdminDashboardQueries:
+
+    def test_user_kpis_single_query(self, django_assert_num_queries):
+        UserFactory.create_batch(2, role=User.Role.DOCTOR)
+        UserFactory(role=User.Role.ADMIN, is_active=False)
+        with django_assert_num_queries(1):
+            kpis = get_user_kpis()
+        assert kpis['total_users'] == 3
+        assert kpis['doctors'] == 2
+        assert kpis['inactive_users'] == 1
+
+    def test_admin_dashboard_matches_individual_selectors(self):
+        UserFactory.create_batch(2, role=User.Role.TECHNICIAN)
+        UserFactory(role=User.Role.EMPLOYEE)
+        stats = get_admin_dashboard_stats()
+        assert stats['kpis'] == get_user_kpis()
+        assert stats['roles_distribution'] == get_user_roles_distribution()
+        assert stats['users_created_per_month'] == get_users_created_per_month()
+
+    def test_admin_endpoint_query_budget(self, django_assert_num_queries):
+        admin = UserFactory(role=User.Role.ADMIN, is_staff=True)
+        UserFactory.create_batch(3)
+        request = APIRequestFactory().get('/analytics/admin/')
+        force_authenticate(request, user=admin)
+        with django_assert_num_queries(1):
+            response = admin_dashboard_data(request)
+        assert response.status_code == 200
+        assert response.data['kpis']['total_users'] == 4
@@ -0,0 +1,95 @@
+import pytest
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.analytics.models import DashboardStat, ExamFact
+from factories.examens import ExamensFactory
+from factories.patients import ConducteurFactory
+from selector.analytics import DashboardStatsSelector
+from services.analytics import dashboard_stats_get, dashboard_stats_invalidate, dashboard_stats_refresh, exam_facts_refresh
+from services.examens import ConclusionService, TechnicalExamenService
+from services.patients import conducteur_update
+
+
+@pytest.mark.django_db
+class TestDashboardStatsSnapshot:
+
+    def test_first_read_builds_every_section(self):
+        ConducteurFactory.create_batch(2)
+        data = dashboard_stats_get()
+        assert data['nombre_total_patients'] == 2
+        assert data['refreshed_at'] is not None
+        assert DashboardStat.objects.count() == len(DashboardStatsSelector.EMPLOYEE_SECTIONS)
+        assert not DashboardStat.objects.filter(is_stale=True).exists()
+
+    def test_fresh_snapshot_is_served_in_one_query(self, django_assert_num_queries):
+        dashboard_stats_refresh()
+        with django_assert_num_queries(1):
+            dashboard_stats_get()
+
+    def test_write_only_invalidates_dependent_sections(self, django_capture_on_commit_callbacks):
+        examen = ExamensFactory(technical_examen__ocular_tension__od=12, technical_examen__ocular_tension__og=12)
+        dashboard_stats_refresh()
+        with django_capture_on_commit_callbacks(execute=True):
+            TechnicalExamenService.update_ocular_tension(examen.technical_examen_id, {'od': 25})
+        stale = set(DashboardStat.objects.filter(is_stale=True).values_list('name', flat=True))
+        assert stale == {'tonus', 'conclusions'}
+        assert dashboard_stats_get()['tonus_superieur_a_21'] == 1
+
+    def test_expired_section_is_recomputed(self):
+        dashboard_stats_refresh()
+        DashboardStat.objects.filter(name='conducteurs').update(
+            refreshed_at=timezone.now() - timedelta(days=1)
+        )
+        ConducteurFactory()
+        assert dashboard_stats_get()['nombre_total_patients'] == 1
+
+    def test_forced_refresh(self):
+        dashboard_stats_refresh()
+        ConducteurFactory()
+        DashboardStat.objects.update(is_stale=False)
+        assert dashboard_stats_get()['nombre_total_patients'] == 0
+        assert dashboard_stats_get(refresh=True)['nombre_total_patients'] == 1
+
+    def test_invalidate_skips_already_stale_sections(self):
+        dashboard_stats_refresh()
+        assert dashboard_stats_invalidate(['conducteurs']) == 1
+        assert dashboard_stats_invalidate(['conducteurs']) == 0
+
+
+@pytest.mark.django_db
+class TestExamFacts:
+
+    def test_refresh_builds_one_row_per_visit(self):
+        examen = ExamensFactory(
+            technical_examen__ocular_tension__od=23,
+            clinical_examen__og__plaintes__diplopie=True,
+            clinical_examen__conclusion__vision='a_risque',
+        )
+        assert exam_facts_refresh() == 1
+        fact = ExamFact.objects.get()
+        assert (fact.patient_id, fact.visite) == (examen.patient_id, examen.visite)
+        assert fact.tonus_od == 23
+        assert fact.diplopie_og is True
+        assert fact.vision == 'a_risque'
+
+    def test_services_keep_facts_current(self):
+        examen = ExamensFactory()
+        ConclusionService.update_conclusion(examen.clinical_examen_id, {'vision': 'incompatible'})
+        assert ExamFact.objects.get(examen=examen).vision == 'incompatible'
+
+        conducteur_update(examen.patient, type_permis='lourd')
+        assert ExamFact.objects.get(examen=examen).type_permis == 'lourd'
+
+    def test_refresh_is_set_based(self, django_assert_num_queries):
+        ExamensFactory.create_batch(5)
+        # lecture jointe + upsert, quel que soit le nombre de visites
+        with django_assert_num_queries(2):
+            assert exam_facts_refresh(chunk_size=10) == 5
+
+    def test_deleting_the_examen_removes_its_fact(self):
+        examen = ExamensFactory()
+        exam_facts_refresh()
+        examen.delete()
+        assert not ExamFact.objects.exists()
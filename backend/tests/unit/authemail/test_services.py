@@ -128,4 +128,162 @@
 #         """Teste la validation du mot de passe"""
 #         user = UserFactory()
 #         with pytest.raises(ValidationError):
-#             password_change(user=user, password="123")  # Mot de passe trop simple
\ No newline at end of file
+#             password_change(user=user, password="123")  # Mot de passe trop simple
+
+import pytest
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest.mock import patch
+
+from django.core import mail
+from django.utils import timezone
+
+from apps.authemail.models import OutgoingEmail
+from services.authemail import (
+    EMAIL_TEMPLATE_PREFIXES,
+    _email_templates,
+    email_enqueue,
+    email_outbox_deliver,
+    insert_multi_format_emails,
+    render_multi_format_emails,
+    send_multi_format_email,
+    send_multi_format_emails,
+)
+
+
+@pytest.fixture
+def outbox_settings(settings):
+    settings.EMAIL_FROM = 'noreply@example.com'
+    settings.EMAIL_BCC = None
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+    settings.EMAIL_OUTBOX_BACKOFF = 60
+    settings.EMAIL_OUTBOX_MAX_BACKOFF = 3600
+    return settings
+
+
+def _enqueue(django_capture_on_commit_callbacks, count=1):
+    with django_capture_on_commit_callbacks(execute=True):
+        for i in range(count):
+            email_enqueue(subject=f'Code {i}', body='123456', html='<b>123456</b>', to=[f'user{i}@example.com'])
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    def test_enqueue_waits_for_commit(self, outbox_settings, django_capture_on_commit_callbacks, mailoutbox):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            send_multi_format_email('welcome_email', {'email': 'a@example.com', 'password': 'x'}, 'a@example.com')
+        assert not OutgoingEmail.objects.exists()
+        assert len(callbacks) == 1
+
+        callbacks[0]()
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.to == ['a@example.com'] and email.bcc == []
+        assert len(mailoutbox) == 0
+
+    def test_deliver_sends_batch_on_one_connection(self, outbox_settings, django_capture_on_commit_callbacks, mailoutbox):
+        _enqueue(django_capture_on_commit_callbacks, count=3)
+
+        with patch('services.authemail.get_connection', wraps=mail.get_connection) as get_connection:
+            result = email_outbox_deliver(batch_size=10)
+
+        get_connection.assert_called_once()
+        assert result == {'sent': 3, 'retried': 0, 'failed': 0}
+        assert len(mailoutbox) == 3
+        assert mailoutbox[0].alternatives[0][1] == 'text/html'
+        assert not OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists()
+        assert email_outbox_deliver() == {'sent': 0, 'retried': 0, 'failed': 0}
+
+    def test_deliver_respects_batch_size(self, outbox_settings, django_capture_on_commit_callbacks, mailoutbox):
+        _enqueue(django_capture_on_commit_callbacks, count=3)
+        assert email_outbox_deliver(batch_size=2)['sent'] == 2
+        assert email_outbox_deliver(batch_size=2)['sent'] == 1
+
+    def test_failure_is_retried_with_backoff(self, outbox_settings, django_capture_on_commit_callbacks, mailoutbox):
+        _enqueue(django_capture_on_commit_callbacks)
+
+        with patch.object(mail.get_connection().__class__, 'send_messages', side_effect=SMTPServerDisconnected('down')):
+            result = email_outbox_deliver()
+
+        assert result == {'sent': 0, 'retried': 1, 'failed': 0}
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.attempts == 1
+        assert 'SMTPServerDisconnected' in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        # Pas encore l'heure du prochain essai
+        assert email_outbox_deliver()['sent'] == 0
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert email_outbox_deliver()['sent'] == 1
+        assert len(mailoutbox) == 1
+
+    def test_connection_failure_reschedules_batch(self, outbox_settings, django_capture_on_commit_callbacks):
+        _enqueue(django_capture_on_commit_callbacks, count=2)
+        connection = mail.get_connection()
+
+        with patch.object(connection, 'open', side_effect=ConnectionRefusedError('smtp down')):
+            result = email_outbox_deliver(connection=connection)
+
+        assert result == {'sent': 0, 'retried': 2, 'failed': 0}
+        for email in OutgoingEmail.objects.all():
+            assert email.status == OutgoingEmail.Status.PENDING
+            assert email.attempts == 1
+            assert 'ConnectionRefusedError' in email.last_error
+            assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+
+    def test_gives_up_after_max_attempts(self, outbox_settings, django_capture_on_commit_callbacks):
+        _enqueue(django_capture_on_commit_callbacks)
+        OutgoingEmail.objects.update(attempts=outbox_settings.EMAIL_OUTBOX_MAX_ATTEMPTS - 1)
+
+        with patch.object(mail.get_connection().__class__, 'send_messages', side_effect=SMTPServerDisconnected('down')):
+            result = email_outbox_deliver()
+
+        assert result == {'sent': 0, 'retried': 0, 'failed': 1}
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.Status.FAILED
+
+    def test_deliver_with_console_backend(self, outbox_settings, django_capture_on_commit_callbacks, capsys):
+        outbox_settings.EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+        _enqueue(django_capture_on_commit_callbacks)
+
+        assert email_outbox_deliver()['sent'] == 1
+        assert 'Subject: Code 0' in capsys.readouterr().out
+
+
+class TestEmailTemplates:
+    def test_templates_are_compiled_at_startup(self):
+        assert set(EMAIL_TEMPLATE_PREFIXES) <= set(_email_templates)
+
+    def test_batch_rendering(self):
+        rendered = list(render_multi_format_emails('signup_email', [{'code': '111111'}, {'code': '222222'}]))
+
+        assert len(rendered) == 2
+        subject, text_content, html_content = rendered[1]
+        assert subject and '\n' not in subject
+        assert '222222' in text_content and '222222' in html_content
+
+
+@pytest.mark.django_db
+class TestBulkEmails:
+    def test_bulk_enqueue_on_commit(self, outbox_settings, django_capture_on_commit_callbacks, django_assert_num_queries):
+        recipients = [(f'user{i}@example.com', {'code': f'{i:06d}'}) for i in range(5)]
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            assert send_multi_format_emails('signup_email', recipients, batch_size=2) == 5
+        assert not OutgoingEmail.objects.exists()
+
+        with django_assert_num_queries(3):
+            callbacks[0]()
+        emails = OutgoingEmail.objects.order_by('id')
+        assert [email.to for email in emails] == [[address] for address, _ in recipients]
+        assert '000004' in emails[4].body
+
+    def test_bulk_insert_in_current_transaction(self, outbox_settings, django_capture_on_commit_callbacks,
+                                                django_assert_num_queries):
+        recipients = [(f'user{i}@example.com', {'code': f'{i:06d}'}) for i in range(3)]
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            with django_assert_num_queries(2):
+                assert insert_multi_format_emails('signup_email', recipients, batch_size=2) == 3
+        assert callbacks == []
+        assert OutgoingEmail.objects.count() == 3
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from factories.examens import BpSuPFactory, PerimetryFactory
+from serializers.examens import BpSuPSerializer, PerimetrySerializer
+from services.examens import delete_media_files
+from utils.images import RENDITIONS, generate_renditions, rendition_name, rendition_names
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _jpeg(name, size=(3000, 2000)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.mark.django_db
+class TestImageRenditions:
+    def test_renditions_generated_after_commit(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            bp_sup = BpSuPFactory(retinographie=_jpeg('retino.jpg'), oct=None, autres=None)
+        assert not default_storage.exists(rendition_name(bp_sup.retinographie.name, 'thumbnail'))
+
+        for callback in callbacks:
+            callback()
+        for rendition, (size, image_format, _) in RENDITIONS.items():
+            with default_storage.open(rendition_name(bp_sup.retinographie.name, rendition)) as file:
+                image = Image.open(file)
+                assert image.format == image_format
+                assert image.width <= size[0] and image.height <= size[1]
+
+    def test_serializer_exposes_renditions(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            bp_sup = BpSuPFactory(retinographie=_jpeg('retino.jpg', (100, 100)), oct=None, autres=None)
+
+        data = BpSuPSerializer(bp_sup).data
+        assert data['retinographie_renditions']['thumbnail'].endswith('.thumbnail.webp')
+        assert data['retinographie_renditions']['web'].endswith('.web.jpg')
+        assert data['retinographie_renditions']['ready'] is True
+        assert data['oct_renditions'] is None
+
+    def test_urls_do_not_depend_on_generation(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            perimetry = PerimetryFactory(image=_jpeg('perimetry.jpg', (100, 100)), images=None)
+        before = PerimetrySerializer(perimetry).data['image_renditions']
+        assert before['ready'] is False
+        assert before['original'] == perimetry.image.url
+
+        for callback in callbacks:
+            callback()
+        after = PerimetrySerializer(perimetry).data['image_renditions']
+        assert after == {**before, 'ready': True}
+        assert after['thumbnail'] == default_storage.url(rendition_name(perimetry.image.name, 'thumbnail'))
+
+    def test_non_image_files_are_ignored(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            perimetry = PerimetryFactory(images=SimpleUploadedFile('rapport.pdf', b'%PDF-1.4'))
+
+        assert not any(default_storage.exists(name) for name in rendition_names(perimetry.images.name))
+
+    def test_renditions_deleted_with_original(self):
+        # Fichier enregistré avant le stockage adressé par le contenu : supprimé directement
+        name = default_storage.save('media/images/biomicroscopie/retinographie/retino.jpg', _jpeg('retino.jpg', (100, 100)))
+        generate_renditions([name])
+
+        delete_media_files([name])
+        assert not any(default_storage.exists(target) for target in (name, *rendition_names(name)))
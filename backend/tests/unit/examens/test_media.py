@@ -0,0 +1,110 @@
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from factories.examens import BpSuPFactory, PerimetryFactory
+from services.examens import ClinicalExamenService, delete_media_files
+from services.media import media_blob_references, media_blobs_collect
+from utils.images import rendition_names
+from utils.storage import BLOB_PREFIX, exam_media_storage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _age(name, hours=2):
+    past = time.time() - hours * 3600
+    os.utime(exam_media_storage().path(name), (past, past))
+
+
+@pytest.mark.django_db
+class TestContentAddressedStorage:
+    def test_same_content_stored_once(self):
+        first = BpSuPFactory(retinographie=ContentFile(b'retino', name='a.jpg'), oct=None, autres=None)
+        second = BpSuPFactory(retinographie=ContentFile(b'retino', name='b.jpg'), oct=ContentFile(b'retino', name='c.jpg'), autres=None)
+
+        assert first.retinographie.name.startswith(BLOB_PREFIX)
+        assert first.retinographie.name == second.retinographie.name == second.oct.name
+        assert media_blob_references()[first.retinographie.name] == 3
+
+    def test_delete_keeps_shared_blob(self):
+        bp_sup = BpSuPFactory(retinographie=ContentFile(b'retino', name='a.jpg'), oct=None, autres=None)
+        name = bp_sup.retinographie.name
+
+        delete_media_files([name])
+        bp_sup.retinographie.delete(save=False)
+        assert exam_media_storage().exists(name)
+
+    def test_collect_orphans(self):
+        kept = BpSuPFactory(retinographie=ContentFile(b'kept', name='a.jpg'), oct=None, autres=None)
+        orphan = PerimetryFactory(image=ContentFile(b'orphan', name='b.jpg'), images=None)
+        orphan_name = orphan.image.name
+        default_storage.save(rendition_names(orphan_name)[0], ContentFile(b'thumb'))
+        orphan.delete()
+        _age(kept.retinographie.name)
+        _age(orphan_name)
+
+        result = media_blobs_collect()
+
+        assert result == {'blobs': 2, 'references': 1, 'deleted': 1, 'freed': len(b'orphan')}
+        assert not exam_media_storage().exists(orphan_name)
+        assert not default_storage.exists(rendition_names(orphan_name)[0])
+        assert exam_media_storage().exists(kept.retinographie.name)
+
+    def test_recent_orphans_are_kept(self):
+        orphan = PerimetryFactory(image=ContentFile(b'orphan', name='b.jpg'), images=None)
+        orphan.delete()
+
+        assert media_blobs_collect()['deleted'] == 0
+        assert media_blobs_collect(grace=timedelta(0), dry_run=True)['deleted'] == 1
+        assert exam_media_storage().exists(orphan.image.name)
+
+    def test_replace_does_not_rewrite_identical_file(self):
+        perimetry = PerimetryFactory(image=ContentFile(b'scan', name='a.jpg'), images=None)
+        name = perimetry.image.name
+        _age(name)
+        before = os.stat(exam_media_storage().path(name)).st_ino
+
+        ClinicalExamenService.attach_file('perimetry', perimetry.pk, 'image', 'again.jpg', ContentFile(b'scan'))
+
+        perimetry.refresh_from_db()
+        assert perimetry.image.name == name
+        assert os.stat(exam_media_storage().path(name)).st_ino == before
+
+
+@pytest.mark.django_db
+class TestReplacedFiles:
+    @pytest.fixture
+    def legacy(self):
+        # Fichier enregistré avant le stockage adressé par le contenu : supprimé lors d'un remplacement
+        name = default_storage.save('media/images/perimetries_binoculaire/legacy.jpg', ContentFile(b'legacy'))
+        return PerimetryFactory(image=name, images=None)
+
+    def test_replaced_file_is_deleted_after_commit(self, legacy, django_capture_on_commit_callbacks):
+        name = legacy.image.name
+        with django_capture_on_commit_callbacks() as callbacks:
+            ClinicalExamenService.attach_file('perimetry', legacy.pk, 'image', 'new.jpg', ContentFile(b'new'))
+        assert default_storage.exists(name)
+
+        for callback in callbacks:
+            callback()
+        assert not default_storage.exists(name)
+
+    def test_rollback_keeps_replaced_file(self, legacy, django_capture_on_commit_callbacks):
+        name = legacy.image.name
+        with django_capture_on_commit_callbacks(execute=True), pytest.raises(RuntimeError):
+            with transaction.atomic():
+                ClinicalExamenService.attach_file('perimetry', legacy.pk, 'image', 'new.jpg', ContentFile(b'new'))
+                raise RuntimeError
+
+        legacy.refresh_from_db()
+        assert legacy.image.name == name
+        assert default_storage.exists(name)
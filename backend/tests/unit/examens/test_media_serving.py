@@ -0,0 +1,111 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from apps.examens.views import ExamMediaView
+from factories.users import UserFactory
+from utils.storage import exam_media_storage
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_SENDFILE = None
+    return tmp_path
+
+
+@pytest.fixture
+def blob():
+    name = exam_media_storage().save('media/images/biomicroscopie/oct/oct.jpg', ContentFile(CONTENT))
+    return name.removeprefix('media/images/')
+
+
+@pytest.fixture
+def get(db):
+    user = UserFactory()
+
+    def _get(path, authenticate=True, **headers):
+        request = APIRequestFactory().get(f'/media/images/{path}', headers=headers)
+        if authenticate:
+            force_authenticate(request, user=user)
+        return ExamMediaView.as_view()(request, path=path)
+    return _get
+
+
+def _body(response):
+    return b''.join(response.streaming_content)
+
+
+class TestExamMediaServing:
+    def test_full_file_is_streamed(self, get, blob):
+        response = get(blob)
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert _body(response) == CONTENT
+        assert response['Content-Type'] == 'image/jpeg'
+        assert response['Accept-Ranges'] == 'bytes'
+        assert 'immutable' in response['Cache-Control']
+
+    def test_range(self, get, blob):
+        response = get(blob, Range='bytes=100-199')
+
+        assert response.status_code == 206
+        assert response['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+        assert response['Content-Length'] == '100'
+        assert _body(response) == CONTENT[100:200]
+
+    def test_suffix_range(self, get, blob):
+        response = get(blob, Range='bytes=-10')
+        assert _body(response) == CONTENT[-10:]
+
+    def test_unsatisfiable_range(self, get, blob):
+        response = get(blob, Range=f'bytes={len(CONTENT)}-')
+        assert response.status_code == 416
+        assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+    def test_stale_if_range_serves_whole_file(self, get, blob):
+        response = get(blob, Range='bytes=0-9', **{'If-Range': '"stale"'})
+        assert response.status_code == 200
+
+    def test_not_modified(self, get, blob):
+        etag = get(blob)['ETag']
+        assert get(blob, **{'If-None-Match': etag}).status_code == 304
+
+    def test_x_accel_redirect(self, get, blob, settings):
+        settings.MEDIA_SENDFILE = 'x-accel-redirect'
+
+        response = get(blob)
+        assert response['X-Accel-Redirect'] == f'/protected/media/images/{blob}'
+        assert response.content == b''
+
+    def test_legacy_files_are_revalidated(self, get):
+        default_storage.save('media/images/perimetries_binoculaire/old.png', ContentFile(b'png'))
+
+        response = get('perimetries_binoculaire/old.png')
+        assert 'no-cache' in response['Cache-Control']
+
+    def test_authentication_and_missing_files(self, get, blob):
+        assert get(blob, authenticate=False).status_code in (401, 403)
+        assert get('blobs/00/missing.jpg').status_code == 404
+        assert get('../../etc/passwd').status_code == 404
+
+    @pytest.mark.parametrize('url', [
+        '/media/images/../../secret.py',
+        '/media/images/..%2F..%2Fsecret.py',
+        '/media/images/%2e%2e/%2e%2e/secret.py',
+        '/media/images/oct/%2e%2e%2f%2e%2e%2f%2e%2e%2fsecret.py',
+        '/media/images/..%2Fimages%2F..%2F..%2Fsecret.py',
+    ])
+    def test_paths_outside_media_are_not_served(self, db, url, media_root):
+        # Fichier de la racine du stockage (MEDIA_ROOT = '' : le répertoire de l'application)
+        (media_root / 'secret.py').write_bytes(b'SECRET_KEY = "x"')
+        client = APIClient()
+        client.force_authenticate(UserFactory())
+
+        response = client.get(url)
+        assert response.status_code == 404
+        assert b'SECRET_KEY' not in b''.join(getattr(response, 'streaming_content', [response.content]))
@@ -16,7 +16,12 @@ from factories.examens import (
     PerimetryFactory,
     ConclusionFactory
 )
+from factories.patients import ConducteurFactory
+from apps.examens.models import ClinicalExamen, TechnicalExamen
+from apps.health_record.models import DriverExperience
+from utils.models.validation import validate_for_save
 from utils.models.choices import (
+    VisiteChoices,
     HypotonisantValue,
     ChambreAnterieureTransparence,
     Symptomes
@@ -167,6 +172,32 @@ class TestExamensModels:
                 visite=examen.visite
             ).full_clean()
 
+    def test_unique_patient_visite_enforced_by_constraint(self):
+        te = TechnicalExamenFactory()
+        with pytest.raises(ValidationError, match="existe déjà"):
+            TechnicalExamen(patient=te.patient, visite=te.visite).save()
+
+    def test_save_without_uniqueness_query(self, django_assert_num_queries):
+        patient = ConducteurFactory()
+        ce = ClinicalExamen(patient=patient, visite=VisiteChoices.FIRST)
+        # Existence du patient (full_clean) puis INSERT, sans SELECT (patient, visite)
+        with django_assert_num_queries(2):
+            ce.save()
+
+    def test_validated_instance_is_not_revalidated_on_save(self, django_assert_num_queries):
+        experience = DriverExperience(patient=ConducteurFactory(), visite=VisiteChoices.FIRST)
+        validate_for_save(experience)
+        # INSERT seul, sans la vérification d'existence du patient
+        with django_assert_num_queries(1):
+            experience.save()
+        # La marque ne vaut que pour un enregistrement : le save() suivant revalide
+        with django_assert_num_queries(2):
+            experience.save()
+
+    def test_ad_hoc_save_still_validates(self):
+        with pytest.raises(ValidationError):
+            VisualAcuityFactory.build(avsc_od=11).save()
+
     # 9. Tests pour BpSuP (éléments supplémentaires)
     def test_bp_sup_creation(self):
         bp = BpSuPFactory()
@@ -0,0 +1,94 @@
+from contextlib import nullcontext
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.examens.models import Perimetry, Refraction, VisualAcuity
+from apps.examens.rules import (
+    PERIMETRY_RULES, REFRACTION_RULES, REQUIRED_MESSAGE, VISUAL_ACUITY_RULES, validate_rules, validate_rows
+)
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr('apps.examens.rules.np', None)
+    return request.param
+
+
+class TestValidateRules:
+
+    def test_serializer_data_and_model_share_the_rules(self):
+        with pytest.raises(ValidationError) as excinfo:
+            validate_rules(VISUAL_ACUITY_RULES, {'avsc_od': 11, 'avac_og': -1, 'avsc_og': 5})
+        assert set(excinfo.value.message_dict) == {'avsc_od', 'avac_og'}
+
+        with pytest.raises(ValidationError) as excinfo:
+            VisualAcuity(avsc_od=11).clean()
+        assert set(excinfo.value.message_dict) == {'avsc_od'}
+
+    def test_conditional_required_rules(self):
+        validate_rules(REFRACTION_RULES, {'correction_optique': False})
+        with pytest.raises(ValidationError) as excinfo:
+            Refraction(correction_optique=True, od_s=1, od_c=1, od_a=1, og_s=1, og_c=11).clean()
+        assert excinfo.value.message_dict == {'og_c': [REFRACTION_RULES[4].message], 'og_a': [REQUIRED_MESSAGE]}
+
+    def test_exclusive_lower_bound(self):
+        with pytest.raises(ValidationError) as excinfo:
+            validate_rules(PERIMETRY_RULES, {'score_esternmen': 0, 'limite_horizontal': 180})
+        assert set(excinfo.value.message_dict) == {'score_esternmen'}
+
+    def test_batch_checked_instance_skips_rules(self):
+        perimetry = Perimetry(limite_superieure=120)
+        perimetry._measurements_checked = True
+        perimetry.validate_measurements()
+
+
+class TestValidateRows:
+
+    def test_masks_per_row(self, engine):
+        result = validate_rows(VISUAL_ACUITY_RULES, [
+            {'avsc_od': '1.5', 'avac_od': 2},
+            {'avsc_od': '10.5'},
+            None,  # mesure absente de la ligne
+            {'avsc_od': 'abc', 'avac_odg': -0.5},  # type signalé par clean_fields()
+        ])
+        assert list(result.masks['avsc_od']) == [False, True, False, False]
+        assert list(result.invalid) == [False, True, False, True]
+        assert result.invalid_rows() == [1, 3]
+        assert result.row_errors(1) == {'avsc_od': VISUAL_ACUITY_RULES[0].message}
+        assert result.row_errors(3) == {'avac_odg': VISUAL_ACUITY_RULES[5].message}
+
+    def test_conditional_rules(self, engine):
+        complete = {field: '0' for field in ('od_s', 'od_c', 'od_a', 'og_s', 'og_c', 'og_a')}
+        result = validate_rows(REFRACTION_RULES, [
+            {'correction_optique': False},
+            {'correction_optique': True, **complete},
+            {'correction_optique': True, **complete, 'og_a': None},
+        ])
+        assert result.invalid_rows() == [2]
+        assert result.row_errors(2) == {'og_a': REQUIRED_MESSAGE}
+
+    @pytest.mark.parametrize('value,applies', [
+        ('0', False), ('f', False), ('False', False), ('false', False), (0, False), ('', False),
+        ('1', True), ('t', True), ('True', True), ('true', True), (1, True),
+    ])
+    def test_condition_is_read_like_a_boolean_field(self, engine, value, applies):
+        # Valeur brute d'un CSV : '0' ne déclenche pas les règles conditionnelles
+        result = validate_rows(REFRACTION_RULES, [{'correction_optique': value}])
+        assert result.invalid_rows() == ([0] if applies else [])
+        with pytest.raises(ValidationError) if applies else nullcontext():
+            validate_rules(REFRACTION_RULES, {'correction_optique': value})
+
+    def test_matches_row_by_row_rules(self, engine):
+        rows = [{'score_esternmen': value, 'limite_superieure': 45} for value in (0, 0.5, 100, 100.5, None)]
+        result = validate_rows(PERIMETRY_RULES, rows)
+        for index, row in enumerate(rows):
+            try:
+                validate_rules(PERIMETRY_RULES, row)
+                expected = {}
+            except ValidationError as e:
+                expected = {field: messages[0] for field, messages in e.message_dict.items()}
+            assert result.row_errors(index) == expected
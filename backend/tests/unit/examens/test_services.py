@@ -0,0 +1,165 @@
+from decimal import Decimal
+
+import factory
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.analytics.models import ExamFact
+from apps.examens.models import ClinicalExamen, EyeSide, Examens, Plaintes, TechnicalExamen, VisualAcuity
+from apps.health_record.models import DriverExperience
+from factories.examens import (
+    BiomicroscopySegmentAnterieurFactory, BiomicroscopySegmentPosterieurFactory, ClinicalExamenFactory,
+    ConclusionFactory, ExamensFactory, OcularTensionFactory, PachymetryFactory, PerimetryFactory, PlaintesFactory,
+    RefractionFactory, TechnicalExamenFactory, VisiteExamensFactory, VisualAcuityFactory
+)
+from factories.health_record import DriverExperienceFactory
+from serializers.examens import TechnicalExamenSerializer
+from services.examens import ClinicalExamenService, ExamenService, TechnicalExamenService
+
+
+@pytest.mark.django_db
+class TestTechnicalExamenUnitOfWork:
+    PARTS = {
+        'visual_acuity': VisualAcuityFactory,
+        'refraction': RefractionFactory,
+        'ocular_tension': OcularTensionFactory,
+        'pachymetry': PachymetryFactory,
+    }
+
+    def payload(self):
+        return {name: factory.build(dict, FACTORY_CLASS=part_factory) for name, part_factory in self.PARTS.items()}
+
+    def test_create_from_examen_query_budget(self, django_assert_max_num_queries):
+        examen = ExamensFactory(technical_examen=None)
+        # examen + recherche (patient, visite), 4 INSERT mesures, INSERT examen technique,
+        # UPDATE examen, table de faits (2), version du dossier, savepoint (2)
+        with django_assert_max_num_queries(13):
+            technical_examen = TechnicalExamenService.save_technical_examen(self.payload(), examen_id=examen.id)
+        assert technical_examen.is_completed is True
+        examen.refresh_from_db()
+        assert examen.technical_examen_id == technical_examen.pk
+        assert TechnicalExamen.objects.filter(patient=examen.patient, visite=examen.visite).count() == 1
+
+    def test_serializer_create_query_budget(self, django_assert_max_num_queries):
+        examen = ExamensFactory(technical_examen=None)
+        serializer = TechnicalExamenSerializer(
+            data={**self.payload(), 'patient': examen.patient_id, 'visite': examen.visite},
+            context={'examen_id': examen.id},
+        )
+        assert serializer.is_valid(), serializer.errors
+        with django_assert_max_num_queries(13):
+            technical_examen = serializer.save()
+        assert serializer.data['visual_acuity']['id'] == technical_examen.visual_acuity_id
+
+    def test_update_writes_only_changed_rows(self, django_assert_max_num_queries, django_assert_num_queries):
+        technical_examen = TechnicalExamenFactory(visual_acuity__avsc_od=Decimal('1.000'))
+        loaded = TechnicalExamen.objects.select_related('visual_acuity', 'refraction', 'ocular_tension', 'pachymetry').get(
+            pk=technical_examen.pk
+        )
+        # UPDATE acuité visuelle, table de faits (2), version du dossier, savepoint (2)
+        with django_assert_max_num_queries(6):
+            TechnicalExamenService.save_technical_examen(
+                {'visual_acuity': {'avsc_od': Decimal('2.500')}}, technical_examen=loaded
+            )
+        assert VisualAcuity.objects.get(pk=technical_examen.visual_acuity_id).avsc_od == Decimal('2.500')
+
+        # Rien n'a changé : aucune écriture
+        with django_assert_num_queries(2):
+            TechnicalExamenService.save_technical_examen(
+                {'visual_acuity': {'avsc_od': Decimal('2.500')}}, technical_examen=loaded
+            )
+
+    def test_visite_change_onto_existing_visite_is_a_validation_error(self):
+        existing = TechnicalExamenFactory(visite=1)
+        other = TechnicalExamenFactory(patient=existing.patient, visite=2)
+        with pytest.raises(ValidationError, match='existe déjà'):
+            TechnicalExamenService.save_technical_examen({'visite': 1}, technical_examen=other)
+
+    def test_duplicate_create_is_a_validation_error(self):
+        existing = TechnicalExamenFactory()
+        # Création concurrente : l'instance a été construite avant que l'autre ne soit enregistrée
+        duplicate = TechnicalExamen(patient_id=existing.patient_id, visite=existing.visite)
+        with pytest.raises(ValidationError, match='existe déjà'):
+            TechnicalExamenService.save_technical_examen(self.payload(), technical_examen=duplicate)
+        assert TechnicalExamen.objects.filter(patient=existing.patient, visite=existing.visite).count() == 1
+
+
+@pytest.mark.django_db
+class TestClinicalExamenUnitOfWork:
+    def eye_payload(self):
+        return {
+            'plaintes': factory.build(dict, FACTORY_CLASS=PlaintesFactory),
+            'bp_sg_anterieur': factory.build(dict, FACTORY_CLASS=BiomicroscopySegmentAnterieurFactory),
+            'bp_sg_posterieur': factory.build(dict, FACTORY_CLASS=BiomicroscopySegmentPosterieurFactory),
+        }
+
+    def test_create_full_aggregate_query_budget(self, django_assert_max_num_queries):
+        examen = ExamensFactory(clinical_examen=None)
+        data = {
+            'og': self.eye_payload(),
+            'od': self.eye_payload(),
+            'conclusion': factory.build(dict, FACTORY_CLASS=ConclusionFactory),
+            'perimetry': factory.build(dict, FACTORY_CLASS=PerimetryFactory, image=None, images=None),
+        }
+        # examen + recherche (patient, visite), un INSERT par modèle (plaintes, 2 segments, conclusion,
+        # yeux, périmétrie, examen clinique), UPDATE examen, table de faits (2), version du dossier, savepoint (2)
+        with django_assert_max_num_queries(15):
+            clinical_examen = ClinicalExamenService.save_clinical_examen(data, examen_id=examen.id)
+
+        clinical_examen = ClinicalExamen.objects.get(pk=clinical_examen.pk)
+        assert clinical_examen.og.plaintes.eye_symptom == data['og']['plaintes']['eye_symptom']
+        assert clinical_examen.od_id != clinical_examen.og_id
+        assert clinical_examen.conclusion.vision == data['conclusion']['vision']
+        examen.refresh_from_db()
+        assert examen.clinical_examen_id == clinical_examen.pk
+
+    def test_update_both_eyes_in_one_statement(self, django_assert_max_num_queries):
+        clinical_examen = ClinicalExamenFactory(og__plaintes__diplopie=False, od__plaintes__diplopie=False)
+        loaded = ClinicalExamen.objects.select_related('og__plaintes', 'od__plaintes').get(pk=clinical_examen.pk)
+        plaintes = {'diplopie': True, 'diplopie_type': 'binoculaire'}
+        data = {'og': {'plaintes': dict(plaintes)}, 'od': {'plaintes': dict(plaintes)}}
+        # UPDATE plaintes (2 lignes), table de faits (2), version du dossier, savepoint (2)
+        with django_assert_max_num_queries(6):
+            ClinicalExamenService.save_clinical_examen(data, clinical_examen=loaded)
+        assert Plaintes.objects.filter(diplopie=True, diplopie_type='binoculaire').count() == 2
+
+    def test_new_eye_requires_every_part(self):
+        examen = ExamensFactory(clinical_examen=None)
+        with pytest.raises(ValidationError):
+            ClinicalExamenService.save_clinical_examen({'og': {'plaintes': {}}}, examen_id=examen.id)
+
+
+@pytest.mark.django_db
+class TestDeleteVisites:
+    def test_delete_examen_complet_removes_every_dependency(self, django_capture_on_commit_callbacks):
+        examen = VisiteExamensFactory()
+        DriverExperienceFactory(
+            patient=examen.patient, visite=examen.visite,
+            corporel_dommage=False, corporel_dommage_type=None, materiel_dommage=False, materiel_dommage_type=None,
+        )
+        autre = VisiteExamensFactory()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ExamenService.delete_examen_complet(examen.id)
+
+        assert list(Examens.objects.values_list('pk', flat=True)) == [autre.pk]
+        assert TechnicalExamen.objects.count() == 1
+        assert ClinicalExamen.objects.count() == 1
+        assert VisualAcuity.objects.count() == 1
+        assert EyeSide.objects.count() == 2
+        assert Plaintes.objects.count() == 2
+        assert not DriverExperience.objects.filter(patient=examen.patient).exists()
+        assert not ExamFact.objects.filter(examen_id=examen.id).exists()
+
+    def test_delete_examen_complet_unknown(self):
+        with pytest.raises(ValueError, match="n'existe pas"):
+            ExamenService.delete_examen_complet(0)
+
+    def test_query_count_does_not_grow_with_visits(self, django_assert_max_num_queries):
+        VisiteExamensFactory.create_batch(10)
+        # SELECT des identifiants (7), version des dossiers, un DELETE par table (liens des dossiers,
+        # table de faits, 16 modèles), savepoint (2)
+        with django_assert_max_num_queries(29):
+            deleted = ExamenService.delete_visites(Examens.objects.all())
+        assert deleted['examens.Examens'] == 10
+        assert deleted['examens.Plaintes'] == 20
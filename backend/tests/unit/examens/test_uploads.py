@@ -0,0 +1,115 @@
+import hashlib
+import io
+import os
+
+import pytest
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.examens.models import ChunkedUpload
+from factories.examens import BpSuPFactory
+from factories.users import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def upload_dirs(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.CHUNKED_UPLOAD_DIR = str(tmp_path / 'partial')
+    settings.CHUNKED_UPLOAD_BLOCK_SIZE = 1024
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(UserFactory())
+    return client
+
+
+def _jpeg():
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), 'blue').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def _append(client, upload_id, offset, chunk):
+    return client.generic(
+        'PATCH', f'/examens/uploads/{upload_id}/', chunk,
+        content_type='application/octet-stream', headers={'Upload-Offset': str(offset)},
+    )
+
+
+def _init(client, content, **extra):
+    response = client.post('/examens/uploads/', {'filename': 'oct.jpg', 'size': len(content), **extra}, format='json')
+    assert response.status_code == 201
+    return response.data['id']
+
+
+@pytest.mark.django_db
+class TestChunkedUpload:
+    def test_upload_in_chunks_and_attach(self, client):
+        content = _jpeg()
+        bp_sup = BpSuPFactory(oct=None)
+        upload_id = _init(client, content, sha256=hashlib.sha256(content).hexdigest())
+
+        for offset in range(0, len(content), 3000):
+            response = _append(client, upload_id, offset, content[offset:offset + 3000])
+            assert response.status_code == 200
+            assert response['Upload-Offset'] == str(min(offset + 3000, len(content)))
+
+        response = client.post(
+            f'/examens/uploads/{upload_id}/finalize/',
+            {'target': 'bp_sup', 'object_id': bp_sup.pk, 'field': 'oct'}, format='json',
+        )
+        assert response.status_code == 200
+        bp_sup.refresh_from_db()
+        with bp_sup.oct.open('rb') as file:
+            assert file.read() == content
+        assert response.data['oct'].endswith(os.path.basename(bp_sup.oct.name))
+        assert ChunkedUpload.objects.get(pk=upload_id).status == ChunkedUpload.Status.COMPLETE
+
+    def test_resume_after_offset_conflict(self, client):
+        content = _jpeg()
+        upload_id = _init(client, content)
+        _append(client, upload_id, 0, content[:1000])
+
+        response = _append(client, upload_id, 500, content[500:1500])
+        assert response.status_code == 409
+        assert response['Upload-Offset'] == '1000'
+
+        response = client.get(f'/examens/uploads/{upload_id}/')
+        assert response.data['offset'] == 1000
+
+    def test_chunk_past_declared_size(self, client):
+        upload_id = _init(client, b'12345')
+        assert _append(client, upload_id, 0, b'123456').status_code == 400
+
+    def test_finalize_requires_complete_upload(self, client):
+        content = _jpeg()
+        bp_sup = BpSuPFactory()
+        upload_id = _init(client, content)
+        _append(client, upload_id, 0, content[:100])
+
+        response = client.post(
+            f'/examens/uploads/{upload_id}/finalize/',
+            {'target': 'bp_sup', 'object_id': bp_sup.pk, 'field': 'oct'}, format='json',
+        )
+        assert response.status_code == 400
+
+    def test_checksum_mismatch(self, client):
+        content = _jpeg()
+        bp_sup = BpSuPFactory()
+        upload_id = _init(client, content, sha256='0' * 64)
+        _append(client, upload_id, 0, content)
+
+        response = client.post(
+            f'/examens/uploads/{upload_id}/finalize/',
+            {'target': 'bp_sup', 'object_id': bp_sup.pk, 'field': 'oct'}, format='json',
+        )
+        assert response.status_code == 400
+
+    def test_uploads_are_private(self, client):
+        upload_id = _init(client, b'12345')
+        other = APIClient()
+        other.force_authenticate(UserFactory())
+        assert other.get(f'/examens/uploads/{upload_id}/').status_code == 404
@@ -0,0 +1,130 @@
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.examens.models import Examens, TechnicalExamen, VisualAcuity
+from apps.health_record.views import ExamImportView
+from apps.health_record.models import HealthRecord
+from apps.patients.models import Conducteur
+from factories.patients import ConducteurFactory
+from services.bulk_import import ExamImportService, iter_import_rows
+
+
+def patient_payload(numero, **kwargs):
+    return {
+        'numero_permis': numero,
+        'email': f'{numero.lower()}@example.com',
+        'first_name': 'Awa',
+        'last_name': 'Diop',
+        'phone_number': kwargs.pop('phone_number', f'+22177{numero[-7:]}'),
+        'date_naissance': '1990-01-01',
+        'type_permis': 'leger',
+        'date_delivrance_permis': str(date.today() - timedelta(days=365)),
+        'date_peremption_permis': str(date.today() + timedelta(days=365)),
+        'transporteur_professionnel': True,
+        'service': 'Public',
+        'type_instruction_suivie': 'Française',
+        'niveau_instruction': 'Secondaire',
+        'annees_experience': 5,
+        **kwargs,
+    }
+
+
+def technical_payload(avsc_od='1.000'):
+    return {
+        'visual_acuity': {
+            'avsc_od': avsc_od, 'avsc_og': '1.000', 'avsc_odg': '1.000',
+            'avac_od': '1.000', 'avac_og': '1.000', 'avac_odg': '1.000',
+        },
+        'ocular_tension': {'od': 15.0, 'og': 16.0},
+    }
+
+
+def jsonl(*rows):
+    return io.StringIO('\n'.join(json.dumps(row) for row in rows))
+
+
+class TestIterImportRows:
+
+    def test_csv_columns_are_nested(self):
+        stream = io.StringIO('patient.numero_permis,visite,technical_examen.ocular_tension.od\nSN0000001,1,\n')
+        [(number, row)] = list(iter_import_rows(stream, 'csv'))
+        assert number == 2
+        assert row == {'patient': {'numero_permis': 'SN0000001'}, 'visite': '1', 'technical_examen': {'ocular_tension': {}}}
+
+    def test_invalid_json_is_reported_per_line(self):
+        rows = list(iter_import_rows(io.StringIO('{"visite": 1}\n{oops\n'), 'jsonl'))
+        assert rows[0] == (1, {'visite': 1})
+        assert isinstance(rows[1][1], Exception)
+
+
+class TestExamImportView:
+
+    def test_view_is_excluded_from_request_transaction(self):
+        # Sinon les transactions par lot d'import_file ne seraient que des savepoints
+        assert DEFAULT_DB_ALIAS in ExamImportView.as_view()._non_atomic_requests
+
+
+@pytest.mark.django_db
+class TestExamImportService:
+
+    def test_imports_new_patients_and_links_health_record(self):
+        report = ExamImportService.import_stream(jsonl(
+            {'patient': patient_payload('SN1000001'), 'visite': 1, 'technical_examen': technical_payload()},
+            {'patient': {'numero_permis': 'SN1000001'}, 'visite': 2, 'technical_examen': technical_payload()},
+        ), 'jsonl')
+
+        assert report.as_dict()['failed'] == 0
+        assert report.imported == 2
+        patient = Conducteur.objects.get(numero_permis='SN1000001')
+        assert TechnicalExamen.objects.filter(patient=patient).count() == 2
+        record = HealthRecord.objects.get(patient=patient)
+        assert set(record.examens.values_list('visite', flat=True)) == {1, 2}
+
+    def test_invalid_rows_are_rejected_without_blocking_the_batch(self):
+        patient = ConducteurFactory()
+        report = ExamImportService.import_stream(jsonl(
+            {'patient': {'numero_permis': patient.numero_permis}, 'visite': 1, 'technical_examen': technical_payload('42')},
+            {'patient': {'numero_permis': patient.numero_permis}, 'visite': 9},
+            {'patient': {'numero_permis': patient.numero_permis}, 'visite': 2, 'technical_examen': technical_payload()},
+        ), 'jsonl')
+
+        assert report.imported == 1
+        assert [error['row'] for error in report.errors] == [1, 2]
+        assert 'visual_acuity' in report.errors[0]['errors']
+        assert list(Examens.objects.filter(patient=patient).values_list('visite', flat=True)) == [2]
+
+    def test_existing_visit_is_updated_in_place(self):
+        patient = ConducteurFactory()
+        row = {'patient': {'numero_permis': patient.numero_permis}, 'visite': 1, 'technical_examen': technical_payload()}
+        ExamImportService.import_stream(jsonl(row), 'jsonl')
+
+        row['technical_examen'] = {'visual_acuity': {'avsc_od': '2.500'}}
+        report = ExamImportService.import_stream(jsonl(row), 'jsonl')
+
+        assert report.errors == []
+        assert VisualAcuity.objects.get().avsc_od == pytest.approx(2.5)
+        assert TechnicalExamen.objects.filter(patient=patient, visite=1).count() == 1
+
+    def test_duplicate_new_patient_email_is_rejected(self):
+        existing = ConducteurFactory()
+        report = ExamImportService.import_stream(jsonl(
+            {'patient': patient_payload('SN1000002', email=existing.email), 'visite': 1},
+        ), 'jsonl')
+
+        assert report.imported == 0
+        assert 'patient.email' in report.errors[0]['errors']
+
+    def test_query_count_does_not_grow_with_rows(self, django_assert_max_num_queries):
+        patients = ConducteurFactory.create_batch(10)
+        rows = [
+            {'patient': {'numero_permis': patient.numero_permis}, 'visite': 1, 'technical_examen': technical_payload()}
+            for patient in patients
+        ]
+        with django_assert_max_num_queries(20):
+            report = ExamImportService.import_stream(jsonl(*rows), 'jsonl')
+        assert report.imported == 10
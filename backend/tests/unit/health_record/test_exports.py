@@ -0,0 +1,45 @@
+import csv
+import io
+
+import pytest
+
+from factories.examens import ExamensFactory
+from factories.health_record import DriverExperienceFactory
+from factories.patients import VehiculeFactory
+from selector.exports import EXPORT_COLUMNS, export_visits
+from utils.exports import stream_csv
+
+
+def read_csv(chunks):
+    return list(csv.DictReader(io.StringIO(''.join(chunks))))
+
+
+class TestStreamCsv:
+
+    def test_lists_and_empty_values_are_flattened(self):
+        rows = read_csv(stream_csv(['a', 'b'], iter([(['x', 'y'], None)])))
+        assert rows == [{'a': 'x|y', 'b': ''}]
+
+
+@pytest.mark.django_db
+class TestExportVisits:
+
+    def test_one_row_per_visit_with_joined_tables(self):
+        examen = ExamensFactory(visite=1)
+        sans_dommage = {'corporel_dommage': False, 'materiel_dommage': False}
+        DriverExperienceFactory(patient=examen.patient, visite=1, km_parcourus=1200, **sans_dommage)
+        DriverExperienceFactory(patient=examen.patient, visite=2, **sans_dommage)
+        VehiculeFactory.create_batch(2, conducteur=examen.patient)
+
+        [row] = read_csv(export_visits('csv'))
+
+        assert list(row) == [column.name for column in EXPORT_COLUMNS]
+        assert row['patient.numero_permis'] == examen.patient.numero_permis
+        assert row['driver_experience.km_parcourus'] == '1200.0'
+        assert len(row['vehicules.immatriculation'].split('|')) == 2
+        assert row['technical_examen.visual_acuity.avsc_od'] == str(examen.technical_examen.visual_acuity.avsc_od)
+
+    def test_export_is_a_single_query(self, django_assert_num_queries):
+        ExamensFactory.create_batch(3)
+        with django_assert_num_queries(1):
+            assert len(read_csv(export_visits('csv', chunk_size=2))) == 3
@@ -0,0 +1,248 @@
+import pytest
+
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from django.core.cache import caches
+from django.test import RequestFactory
+from django.urls import reverse
+
+from api.prefetch import prefetch_plan
+from api.transactions import ReadOnlyRequestsWSGIHandler
+from apps.health_record.urls import health_record_list, health_record_patient
+from factories.health_record import DriverExperienceFactory, HealthRecordFactory
+from factories.patients import ConducteurFactory, VehiculeFactory
+from factories.users import UserFactory
+from serializers.health_records import HealthRecordSerializer
+from selector.versions import get_health_record_version
+from services.dossiers import DOSSIER_CACHE_ALIAS, dossier_cache_key, dossier_cache_metrics, dossier_cache_metrics_reset
+from services.health_records import AntecedentService, DriverExperienceService, HealthRecordService
+from utils.models.choices import EtatConducteurChoices, VisiteChoices
+
+
+@pytest.fixture
+def api_get():
+    user = UserFactory()
+
+    def get(view, url, headers=None, **kwargs):
+        request = APIRequestFactory().get(url, headers=headers)
+        force_authenticate(request, user=user)
+        return view(request, **kwargs)
+
+    return get
+
+
+def health_record():
+    """Dossier complet (3 visites) dont les expériences de conduite sont valides et sans aléa."""
+    patient = ConducteurFactory()
+    experiences = [
+        DriverExperienceFactory(patient=patient, visite=visite, corporel_dommage=False, materiel_dommage=False)
+        for visite in (1, 2, 3)
+    ]
+    return HealthRecordFactory(patient=patient, driver_experience=experiences)
+
+
+@pytest.fixture(autouse=True)
+def dossier_cache():
+    caches[DOSSIER_CACHE_ALIAS].clear()
+    dossier_cache_metrics_reset()
+    return caches[DOSSIER_CACHE_ALIAS]
+
+
+class TestHealthRecordPrefetchPlan:
+
+    def test_plan_covers_nested_serializers(self):
+        plan = prefetch_plan(HealthRecordSerializer)
+        assert set(plan.select_related) == {'patient', 'antecedant'}
+        prefetch = dict(plan.prefetch)
+        assert set(prefetch) == {'examens', 'driver_experience', 'patient__vehicule_set'}
+        assert 'clinical_examen__og__bp_sg_posterieur' in prefetch['examens'].select_related
+        assert 'technical_examen__visual_acuity' in prefetch['examens'].select_related
+
+
+@pytest.mark.django_db
+class TestHealthRecordQueryBudget:
+
+    def test_list_query_count_does_not_grow_with_records(self, api_get, django_assert_num_queries):
+        for record in HealthRecordFactory.create_batch(3):
+            VehiculeFactory(conducteur=record.patient)
+        # count + dossiers (patient, antécédent) + examens + expériences + véhicules
+        with django_assert_num_queries(5):
+            response = api_get(health_record_list, '/health-records/')
+            response.render()
+        assert response.data['count'] == 3
+
+    def test_patient_query_budget(self, api_get, django_assert_num_queries):
+        record = HealthRecordFactory()
+        # version (ETag) + version du cache + dossier (patient, antécédent) + examens + expériences + véhicules
+        with django_assert_num_queries(6):
+            response = api_get(health_record_patient, f'/health-records/patient/{record.patient_id}/',
+                               patient_id=record.patient_id)
+            response.render()
+        assert len(response.data['examens']) == 3
+
+
+@pytest.mark.django_db
+class TestHealthRecordConditionalGet:
+
+    def get_patient(self, api_get, record, **headers):
+        return api_get(health_record_patient, f'/health-records/patient/{record.patient_id}/',
+                       headers=headers, patient_id=record.patient_id)
+
+    def test_etag_match_returns_304_without_loading_record(self, api_get, django_assert_num_queries):
+        record = health_record()
+        response = self.get_patient(api_get, record)
+        assert response.status_code == 200
+        assert response['Last-Modified']
+
+        # Seule la requête de version est exécutée
+        with django_assert_num_queries(1):
+            response = self.get_patient(api_get, record, if_none_match=response['ETag'])
+        assert response.status_code == 304
+
+    def test_sub_exam_change_invalidates_etag(self, api_get):
+        record = health_record()
+        etag = self.get_patient(api_get, record)['ETag']
+
+        examen = record.examens.exclude(clinical_examen=None).first()
+        examen.clinical_examen.og.plaintes.save()
+
+        response = self.get_patient(api_get, record, if_none_match=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_removed_visit_invalidates_etag(self, api_get):
+        record = health_record()
+        etag = self.get_patient(api_get, record)['ETag']
+
+        record.examens.remove(record.examens.order_by('created').first())
+
+        response = self.get_patient(api_get, record, if_none_match=etag)
+        assert response.status_code == 200
+        assert len(response.data['examens']) == 2
+
+    def test_unknown_patient_is_404(self, api_get):
+        response = api_get(health_record_patient, '/health-records/patient/0/', patient_id=0)
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestDossierCache:
+
+    def get_patient(self, api_get, record):
+        response = api_get(health_record_patient, f'/health-records/patient/{record.patient_id}/',
+                           patient_id=record.patient_id)
+        response.render()
+        return response
+
+    def test_second_view_is_served_from_cache(self, api_get, django_assert_num_queries):
+        record = health_record()
+        first = self.get_patient(api_get, record)
+
+        # version (ETag) + version du cache, sans recharger le graphe
+        with django_assert_num_queries(2):
+            second = self.get_patient(api_get, record)
+        assert second.data == first.data
+        assert dossier_cache_metrics()['hits'] == 1
+        assert dossier_cache_metrics()['misses'] == 1
+
+    def test_service_write_changes_the_version(self, api_get):
+        record = health_record()
+        self.get_patient(api_get, record)
+
+        AntecedentService.create_or_update_antecedent(record.patient_id, {'pathologie_ophtalmologique': 'Glaucome'})
+
+        response = self.get_patient(api_get, record)
+        assert response.data['antecedant']['pathologie_ophtalmologique'] == 'Glaucome'
+        assert dossier_cache_metrics()['misses'] == 2
+
+    def test_concurrent_reader_waits_for_the_computation(self, api_get, dossier_cache, monkeypatch):
+        record = health_record()
+        expected = self.get_patient(api_get, record).data
+        record.refresh_from_db()
+        key = dossier_cache_key(record.patient_id, record.version, get_health_record_version(record.patient_id).etag)
+        dossier_cache.delete(key)
+
+        # Un autre lecteur tient le verrou et publie le résultat pendant l'attente
+        dossier_cache.add(f'{key}:lock', 1)
+        monkeypatch.setattr('services.dossiers.time.sleep', lambda seconds: dossier_cache.set(key, expected))
+
+        assert self.get_patient(api_get, record).data == expected
+        assert dossier_cache_metrics()['waits'] == 1
+
+
+@pytest.mark.django_db
+class TestDossierCacheHttpWrites:
+    """Les écritures de l'API invalident le dossier en cache (régression : versions non changées)."""
+
+    @pytest.fixture
+    def client(self):
+        client = APIClient()
+        client.force_authenticate(UserFactory())
+        return client
+
+    @pytest.fixture
+    def patient_id(self):
+        patient_id = ConducteurFactory().pk
+        antecedent = AntecedentService.create_or_update_antecedent(patient_id, {'pathologie_ophtalmologique': 'Aucune'})
+        experience = DriverExperienceService.create_or_update_driver_experience(
+            patient_id, VisiteChoices.FIRST,
+            {'etat_conducteur': EtatConducteurChoices.ACTIF, 'corporel_dommage': False, 'materiel_dommage': False}
+        )
+        HealthRecordService.create_or_update_health_record(patient_id, antecedent.id, [experience.id])
+        return patient_id
+
+    def get_patient(self, client, patient_id):
+        response = client.get(reverse('health-record-patient', kwargs={'patient_id': patient_id}))
+        assert response.status_code == 200
+        return response.data
+
+    def test_set_risky_patient(self, client, patient_id):
+        assert self.get_patient(client, patient_id)['risky_patient'] is False
+
+        response = client.post(reverse('set-risky-patient'), {'patient_id': patient_id, 'risky_patient': True},
+                               format='json')
+        assert response.status_code == 200
+
+        assert self.get_patient(client, patient_id)['risky_patient'] is True
+
+    def test_antecedent_patch(self, client, patient_id):
+        antecedent_id = self.get_patient(client, patient_id)['antecedant']['id']
+
+        response = client.patch(reverse('antecedent-detail', kwargs={'pk': antecedent_id}),
+                                {'pathologie_ophtalmologique': 'Glaucome'}, format='json')
+        assert response.status_code == 200
+
+        assert self.get_patient(client, patient_id)['antecedant']['pathologie_ophtalmologique'] == 'Glaucome'
+
+    def test_driver_experience_patch(self, client, patient_id):
+        experience_id = self.get_patient(client, patient_id)['driver_experience'][0]['id']
+
+        response = client.patch(reverse('driver-exp-detail', kwargs={'pk': experience_id}),
+                                {'km_parcourus': 12000}, format='json')
+        assert response.status_code == 200
+
+        assert self.get_patient(client, patient_id)['driver_experience'][0]['km_parcourus'] == 12000
+
+
+class TestReadOnlyRequests:
+
+    def _view(self, method, path):
+        handler = ReadOnlyRequestsWSGIHandler()
+        request = getattr(RequestFactory(), method)(path)
+        view = handler.resolve_request(request).func
+        return view, handler.make_view_atomic(view)
+
+    def test_get_is_not_wrapped_in_a_transaction(self):
+        view, wrapped = self._view('get', '/health-records/')
+        assert wrapped is view
+
+    def test_writes_keep_the_request_transaction(self):
+        view, wrapped = self._view('post', '/health-records/')
+        assert wrapped is not view
+        # La vue partagée entre les méthodes n'est pas modifiée
+        get_view, _ = self._view('get', '/health-records/')
+        assert not hasattr(get_view.__wrapped__, '_non_atomic_requests')
+
+    def test_get_that_writes_keeps_the_request_transaction(self):
+        view, wrapped = self._view('get', reverse('sync-health-record', kwargs={'patient_id': 1, 'visite': 1}))
+        assert wrapped is not view
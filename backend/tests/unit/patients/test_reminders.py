@@ -0,0 +1,96 @@
+import pytest
+from datetime import date, timedelta
+
+from apps.authemail.models import OutgoingEmail
+from apps.patients.models import Conducteur, LicenceExpiryReminder
+from services.reminders import REMINDER_FIELDS, _remind_chunk, licence_expiry_reminders_send
+from factories.patients import ConducteurFactory
+
+TODAY = date(2026, 3, 1)
+
+
+def _expiring_in(days, **kwargs):
+    return ConducteurFactory(date_peremption_permis=TODAY + timedelta(days=days), **kwargs)
+
+
+@pytest.fixture
+def send(settings, django_capture_on_commit_callbacks):
+    settings.EMAIL_FROM = 'noreply@example.com'
+    settings.EMAIL_BCC = None
+
+    def _send(today=TODAY, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return licence_expiry_reminders_send(today=today, windows=[30, 7], **kwargs)
+    return _send
+
+
+@pytest.mark.django_db
+class TestLicenceExpiryReminders:
+    def test_only_drivers_in_a_window_are_reminded(self, send):
+        soon = _expiring_in(20)
+        _expiring_in(45)
+        _expiring_in(-1)
+
+        assert send() == {30: 1}
+        email = OutgoingEmail.objects.get()
+        assert email.to == [soon.email]
+        assert soon.numero_permis in email.body and '20 jours' in email.body
+
+    def test_emails_are_written_with_the_reminders(self, settings, django_capture_on_commit_callbacks):
+        settings.EMAIL_FROM = 'noreply@example.com'
+        settings.EMAIL_BCC = None
+        _expiring_in(20)
+
+        # Rien n'attend le commit : emails et traces sont validés par la transaction du lot
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            assert licence_expiry_reminders_send(today=TODAY, windows=[30]) == {30: 1}
+        assert callbacks == []
+        assert OutgoingEmail.objects.count() == LicenceExpiryReminder.objects.count() == 1
+
+    def test_reminder_recorded_by_another_worker_is_not_emailed(self, send):
+        recorded, pending = _expiring_in(20), _expiring_in(21)
+        conducteurs = list(
+            Conducteur.objects.filter(pk__in=[recorded.pk, pending.pk]).order_by('pk').values(*REMINDER_FIELDS)
+        )
+        # Tracé par un worker concurrent entre la sélection du lot et son insertion
+        LicenceExpiryReminder.objects.create(
+            conducteur=recorded, date_peremption_permis=recorded.date_peremption_permis, days_before=30
+        )
+
+        assert _remind_chunk(conducteurs, TODAY, 30) == 1
+        assert OutgoingEmail.objects.get().to == [pending.email]
+        assert LicenceExpiryReminder.objects.count() == 2
+
+    def test_no_duplicates(self, send):
+        _expiring_in(20)
+        send()
+        assert send() == {}
+        assert OutgoingEmail.objects.count() == 1
+
+    def test_closest_window_only(self, send):
+        conducteur = _expiring_in(5)
+
+        assert send() == {7: 1}
+        assert send() == {}
+        assert list(conducteur.licence_reminders.values_list('days_before', flat=True)) == [7]
+
+    def test_next_window_and_renewal(self, send):
+        conducteur = _expiring_in(20)
+        send()
+        assert send(today=TODAY + timedelta(days=14)) == {7: 1}
+
+        conducteur.date_peremption_permis += timedelta(days=365 * 5)
+        conducteur.save()
+        conducteur.date_peremption_permis = TODAY + timedelta(days=25)
+        conducteur.save()
+        # Nouvelle date de péremption : le cycle de rappels recommence
+        assert send() == {30: 1}
+        assert LicenceExpiryReminder.objects.count() == 3
+
+    def test_chunks(self, send, django_assert_max_num_queries):
+        for days in range(1, 8):
+            _expiring_in(days)
+
+        with django_assert_max_num_queries(25):
+            assert send(chunk_size=3) == {7: 7}
+        assert OutgoingEmail.objects.count() == 7
@@ -0,0 +1,115 @@
+import pytest
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.patients.urls import conducteur_list, list_vehicules
+from factories.patients import ConducteurFactory, VehiculeFactory
+from factories.users import UserFactory
+
+
+@pytest.fixture
+def api_get():
+    user = UserFactory()
+
+    def get(view, url):
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        return response
+
+    return get
+
+
+@pytest.mark.django_db
+class TestPatientsQueryBudget:
+
+    def test_conducteur_list(self, api_get, django_assert_num_queries):
+        for conducteur in ConducteurFactory.create_batch(5):
+            VehiculeFactory.create_batch(2, conducteur=conducteur)
+        # count + conducteurs + véhicules
+        with django_assert_num_queries(3):
+            response = api_get(conducteur_list, '/patients/')
+        assert response.data['count'] == 5
+
+    def test_vehicule_list(self, api_get, django_assert_num_queries):
+        VehiculeFactory.create_batch(5)
+        # count + véhicules joints à leur conducteur
+        with django_assert_num_queries(2):
+            response = api_get(list_vehicules, '/patients/vehicules/')
+        assert response.data['count'] == 5
+
+
+@pytest.mark.django_db
+class TestPatientSearch:
+
+    def test_recherche_sans_accents(self, api_get):
+        helene = ConducteurFactory(first_name='Hélène', last_name='Ndiaye')
+        ConducteurFactory(first_name='Moussa', last_name='Diop')
+        response = api_get(conducteur_list, '/patients/?search=helene')
+        assert [row['id'] for row in response.data['results']] == [helene.id]
+
+    def test_recherche_floue_sur_le_nom(self, api_get):
+        ndiaye = ConducteurFactory(first_name='Awa', last_name='Ndiaye')
+        response = api_get(conducteur_list, '/patients/?search=ndiay')
+        assert [row['id'] for row in response.data['results']] == [ndiaye.id]
+
+    def test_prefixe_numero_permis(self, api_get):
+        conducteur = ConducteurFactory(numero_permis='SN20231234')
+        ConducteurFactory(numero_permis='XX20231234')
+        response = api_get(conducteur_list, '/patients/?search=sn2023')
+        assert [row['id'] for row in response.data['results']] == [conducteur.id]
+
+    def test_classement_par_pertinence(self, api_get):
+        exact = ConducteurFactory(first_name='Fatou', last_name='Fall')
+        proche = ConducteurFactory(first_name='Fatoumata', last_name='Fall')
+        # Sans classement, l'ordre par défaut (-created) placerait `proche` en premier
+        response = api_get(conducteur_list, '/patients/?search=fatou')
+        assert [row['id'] for row in response.data['results']] == [exact.id, proche.id]
+
+    def test_prefixe_immatriculation(self, api_get):
+        vehicule = VehiculeFactory(immatriculation='DK-1234-AB')
+        VehiculeFactory(immatriculation='TH-1234-AB')
+        response = api_get(list_vehicules, '/patients/vehicules/?search=dk-12')
+        assert [row['id'] for row in response.data['results']] == [vehicule.id]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_parcours_complet_sans_doublon(self, api_get):
+        conducteurs = ConducteurFactory.create_batch(5)
+        ids, url = [], '/patients/?cursor=&limit=2'
+        while url:
+            response = api_get(conducteur_list, url)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        assert ids == [conducteur.id for conducteur in reversed(conducteurs)]
+
+    def test_page_precedente(self, api_get):
+        ConducteurFactory.create_batch(5)
+        first = api_get(conducteur_list, '/patients/?cursor=&limit=2')
+        second = api_get(conducteur_list, first.data['next'])
+        assert first.data['previous'] is None
+        previous = api_get(conducteur_list, second.data['previous'])
+        assert previous.data['results'] == first.data['results']
+
+    def test_requetes_par_page(self, api_get, django_assert_max_num_queries):
+        for conducteur in ConducteurFactory.create_batch(5):
+            VehiculeFactory.create_batch(2, conducteur=conducteur)
+        first = api_get(conducteur_list, '/patients/?cursor=&limit=2')
+        # estimation du nombre (pg_class, puis EXPLAIN tant que la table n'est pas analysée) + page + véhicules
+        with django_assert_max_num_queries(4):
+            response = api_get(conducteur_list, first.data['next'])
+        assert len(response.data['results']) == 2
+        assert 'count' in response.data
+
+    def test_curseur_invalide(self, api_get):
+        response = api_get(conducteur_list, '/patients/?cursor=invalide')
+        assert response.status_code == 404
+
+    def test_sans_curseur_limit_offset(self, api_get):
+        ConducteurFactory.create_batch(3)
+        response = api_get(conducteur_list, '/patients/?limit=2&offset=2')
+        assert response.data['count'] == 3
+        assert len(response.data['results']) == 1
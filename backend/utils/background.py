@@ -0,0 +1,29 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+    thread_name_prefix='background-task',
+)
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Exécute `func` dans un thread de fond, hors du cycle requête/réponse.
+    Réservé aux tâches sans accès base (fichiers, stockage) ; exécution immédiate
+    si BACKGROUND_TASKS_ALWAYS_EAGER (tests).
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_ALWAYS_EAGER', False):
+        return _run(func, args, kwargs)
+    return _executor.submit(_run, func, args, kwargs)
@@ -0,0 +1,126 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dépendance optionnelle, seul l'export Parquet en a besoin
+    pa = pq = None
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : write() renvoie la ligne au lieu de la stocker."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '|'.join(str(item) for item in value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_csv(header, rows):
+    """Génère le CSV ligne par ligne (mémoire constante)."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def parquet_available():
+    return pa is not None
+
+
+def _parquet_type(field):
+    internal_type = field.get_internal_type()
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    if internal_type in ('AutoField', 'BigAutoField', 'IntegerField', 'PositiveIntegerField',
+                         'PositiveSmallIntegerField', 'SmallIntegerField', 'BigIntegerField'):
+        return pa.int64()
+    if internal_type == 'FloatField':
+        return pa.float64()
+    if internal_type == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if internal_type == 'DateField':
+        return pa.date32()
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal_type == 'ArrayField':
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def _parquet_value(value, arrow_type):
+    if value is None:
+        return None
+    if pa.types.is_string(arrow_type):
+        return str(value)
+    if isinstance(value, Decimal) and not pa.types.is_decimal(arrow_type):
+        return float(value)
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Sortie binaire dont on vide le contenu après chaque row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def stream_parquet(columns, rows, row_group_size):
+    """
+    Génère un fichier Parquet par row groups de `row_group_size` lignes ; le schéma est déduit
+    des champs de modèle, seul le row group courant est gardé en mémoire.
+    `columns` : liste de (nom, champ de modèle).
+    """
+    if pa is None:
+        raise RuntimeError("L'export Parquet nécessite pyarrow")
+    schema = pa.schema([(name, _parquet_type(field)) for name, field in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(_table(schema, batch))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(_table(schema, batch))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _table(schema, rows):
+    arrays = [
+        pa.array([_parquet_value(row[index], column.type) for row in rows], type=column.type)
+        for index, column in enumerate(schema)
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
@@ -15,3 +15,37 @@ def generate_random_plate_number():
     number = f"{random.randint(1000, 9999)}-{random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}{random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
     return f"{prefix}-{number}"
 
+
+
+def bulk_create_conducteurs(count, batch_size=10_000):
+    """Insère `count` conducteurs par lots (jeux de données des benchmarks), sans passer par full_clean()."""
+    from datetime import date, timedelta
+
+    from faker import Faker
+
+    from apps.patients.models import Conducteur
+
+    fake = Faker('fr_FR')
+    first_names = [fake.first_name() for _ in range(2000)]
+    last_names = [fake.last_name() for _ in range(2000)]
+    today = date.today()
+    for start in range(0, count, batch_size):
+        Conducteur.objects.bulk_create([
+            Conducteur(
+                email=f'conducteur{i}@example.com',
+                first_name=random.choice(first_names),
+                last_name=random.choice(last_names),
+                phone_number=f'+22177{i:07d}',
+                date_naissance=date(1990, 1, 1),
+                numero_permis=f'SN-{i:08d}',
+                type_permis='leger',
+                date_delivrance_permis=today - timedelta(days=365),
+                date_peremption_permis=today + timedelta(days=365),
+                transporteur_professionnel=False,
+                service='Public',
+                type_instruction_suivie='Française',
+                niveau_instruction='Secondaire',
+                annees_experience=5,
+            )
+            for i in range(start, min(start + batch_size, count))
+        ])
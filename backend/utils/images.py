@@ -0,0 +1,70 @@
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Déclinaisons d'une image : (taille maximale, format, options d'enregistrement Pillow)
+RENDITIONS = {
+    'thumbnail': ((320, 320), 'WEBP', {'quality': 80, 'method': 4}),
+    'web': ((1600, 1600), 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def rendition_name(name, rendition):
+    """Chemin de la déclinaison, à côté de l'original : retino.png -> retino.thumbnail.webp."""
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{rendition}.{_EXTENSIONS[RENDITIONS[rendition][1]]}'
+
+
+def rendition_names(name):
+    return [rendition_name(name, rendition) for rendition in RENDITIONS]
+
+
+def _render(image, size, image_format, options):
+    rendition = image.copy()
+    rendition.thumbnail(size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    rendition.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_renditions(names, storage=default_storage, force=False):
+    """
+    Crée les déclinaisons (miniature, version web) des images `names` (exécuté en tâche de fond).
+    Les images déjà déclinées sont sautées sauf si `force`, les fichiers qui ne sont pas
+    des images (PDF de périmétrie...) sont ignorés.
+    """
+    for name in names:
+        if not force and all(storage.exists(target) for target in rendition_names(name)):
+            continue
+        try:
+            with storage.open(name) as file, Image.open(file) as image:
+                image = ImageOps.exif_transpose(image).convert('RGB')
+                for rendition, (size, image_format, options) in RENDITIONS.items():
+                    target = rendition_name(name, rendition)
+                    storage.delete(target)
+                    storage.save(target, ContentFile(_render(image, size, image_format, options)))
+        except UnidentifiedImageError:
+            continue
+        except Exception:
+            logger.exception('Impossible de créer les déclinaisons de %s', name)
+
+
+def rendition_urls(file, storage=default_storage):
+    """
+    URL de chaque déclinaison de `file`, de l'original (`original`) et `ready`, vrai une fois les
+    déclinaisons créées. Les URL ne dépendent que du nom du fichier : un dossier en cache ou un ETag
+    ne les rend pas périmées. Tant que `ready` est faux, le client affiche l'original.
+    """
+    if not file:
+        return None
+    targets = rendition_names(file.name)
+    urls = {rendition: storage.url(target) for rendition, target in zip(RENDITIONS, targets)}
+    # Déclinaisons écrites dans l'ordre de RENDITIONS : la dernière présente, toutes le sont
+    return {**urls, 'original': file.url, 'ready': storage.exists(targets[-1])}
@@ -0,0 +1,19 @@
+from django.db.models import Field, Func, TextField
+
+
+class ImmutableUnaccent(Func):
+    """
+    unaccent() est STABLE et ne peut pas servir dans un index : f_unaccent est une version IMMUTABLE
+    créée par la migration patients 0002, utilisable dans les index d'expression et les recherches.
+    """
+    function = 'f_unaccent'
+    output_field = TextField()
+
+
+class Row(Func):
+    """
+    Constructeur de ligne Postgres : Row('created', 'id') < Row(Value(d), Value(1)) compile en
+    (created, id) < (d, 1), une seule condition servie par un index composite (created, id).
+    """
+    template = '(%(expressions)s)'
+    output_field = Field()
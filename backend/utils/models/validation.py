@@ -0,0 +1,30 @@
+class ValidatedSaveMixin:
+    """
+    Modèle dont save() valide l'instance (filet de sécurité des enregistrements ponctuels : shell,
+    admin, fixtures). Une instance que la couche service vient de valider par validate_for_save()
+    n'est pas revalidée par le save() suivant.
+    """
+    _validated = False
+
+    def clean_for_save(self):
+        """Validation faite par save() ; surchargée quand une partie est garantie par la base."""
+        self.full_clean()
+
+    def save(self, *args, **kwargs):
+        if self._validated:
+            # La marque ne vaut que pour un enregistrement
+            self._validated = False
+        else:
+            self.clean_for_save()
+        return super().save(*args, **kwargs)
+
+
+def validate_for_save(instance):
+    """
+    Valide `instance` comme son save() le ferait et la marque validée : le save() qui suit immédiatement
+    ne refait ni les contrôles ni les requêtes (existence des FK, unicité). À n'appeler qu'après la
+    dernière modification de l'instance. Sur un modèle sans ValidatedSaveMixin, équivaut à full_clean().
+    """
+    clean = getattr(instance, 'clean_for_save', instance.full_clean)
+    clean()
+    instance._validated = True
@@ -0,0 +1,154 @@
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_safe = ContextVar('replica_safe', default=False)
+_current_request = ContextVar('replica_request', default=None)
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Caches dont le contenu n'est pas vu des autres processus : l'épinglage n'y vaudrait que pour un worker
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def replica_alias():
+    """Alias du réplica s'il est configuré (DATABASES), sinon None : tout reste sur `default`."""
+    alias = settings.REPLICA_DATABASE_ALIAS
+    return alias if alias in settings.DATABASES else None
+
+
+def check_replica_pin_cache():
+    """
+    Refuse un réplica dont le cache d'épinglage (REPLICA_PIN_CACHE) est propre au processus :
+    la lecture qui suit une écriture est souvent servie par un autre worker.
+    """
+    backend = settings.CACHES[settings.REPLICA_PIN_CACHE]['BACKEND']
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"REPLICA_PIN_CACHE ({settings.REPLICA_PIN_CACHE}) utilise {backend}, propre au processus : "
+            "choisir un cache partagé entre les workers pour utiliser le réplica."
+        )
+
+
+def _pin_key(user):
+    return f'replica_pin:{user.pk}'
+
+
+def replica_pin(user):
+    """Après une écriture de `user` : ses lectures restent sur `default` pendant REPLICA_PIN_SECONDS."""
+    caches[settings.REPLICA_PIN_CACHE].set(_pin_key(user), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def replica_pinned():
+    """Vrai si l'utilisateur de la requête courante a écrit récemment (lit ses propres écritures)."""
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated or replica_alias() is None:
+        return False
+    if not hasattr(request, '_replica_pinned'):
+        # Hors bloc replica_safe : un cache en base est lu sur `default`, sans repasser par le routeur
+        token = _replica_safe.set(False)
+        try:
+            request._replica_pinned = caches[settings.REPLICA_PIN_CACHE].get(_pin_key(user)) is not None
+        finally:
+            _replica_safe.reset(token)
+    return request._replica_pinned
+
+
+@contextmanager
+def use_replica():
+    """Les lectures du bloc peuvent aller sur le réplica (voir ReplicaRouter)."""
+    token = _replica_safe.set(True)
+    try:
+        yield
+    finally:
+        _replica_safe.reset(token)
+
+
+def _iterate_on_replica(iterator):
+    with use_replica():
+        yield from iterator
+
+
+def replica_safe(func):
+    """
+    Déclare un selector ou une méthode de vue tolérant un léger retard de réplication :
+    ses lectures vont sur le réplica. Un générateur renvoyé (export en flux) est lu sur le réplica
+    pendant toute son itération.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Décidé à l'appel : un flux lu après la fin de la requête garde le même choix
+        if replica_pinned():
+            return func(*args, **kwargs)
+        with use_replica():
+            result = func(*args, **kwargs)
+        if inspect.isgenerator(result):
+            return _iterate_on_replica(result)
+        return result
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Écritures et migrations sur `default`. Lectures sur le réplica seulement dans un bloc
+    replica_safe, hors transaction en cours sur `default` et si l'utilisateur n'a pas écrit récemment.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_safe.get():
+            return None
+        alias = replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block or replica_pinned():
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mêmes données des deux côtés
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != settings.REPLICA_DATABASE_ALIAS
+
+
+class ReplicaPinMiddleware:
+    """Expose la requête au routeur et épingle sur `default` l'utilisateur qui vient d'écrire."""
+
+    def __init__(self, get_response):
+        if replica_alias():
+            check_replica_pin_cache()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        # request.user est celui authentifié par DRF (JWT compris), recopié sur la requête Django
+        user = getattr(request, 'user', None)
+        if (request.method not in READ_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated and replica_alias()):
+            replica_pin(user)
+        return response
+
+
+class ReplicaListMixin:
+    """ViewSet : list() (filtres, recherche, pagination) lit sur le réplica."""
+
+    @replica_safe
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import posixpath
+import re
+from functools import cache
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
+BLOB_PREFIX = 'media/images/blobs/'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage adressé par le contenu : un fichier est enregistré sous son empreinte SHA-256
+    (media/images/blobs/ab/abcdef....jpg) quel que soit son upload_to. Un contenu déjà présent
+    n'est pas réécrit, plusieurs lignes partagent alors le même fichier.
+
+    Un blob peut être partagé : delete() ne le supprime pas, la commande collect_media_blobs
+    efface ceux qu'aucune ligne ne référence plus. Les fichiers enregistrés avant ce stockage
+    (hors BLOB_PREFIX) sont supprimés normalement.
+    """
+
+    def blob_name(self, digest, name):
+        extension = posixpath.splitext(name)[1].lower()
+        return f'{BLOB_PREFIX}{digest[:2]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if content.seekable():
+            content.seek(0)
+
+        name = self.blob_name(digest.hexdigest(), name)
+        if self.exists(name):
+            # Rafraîchit la date : le ramasse-miettes épargne les blobs récemment réutilisés
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def delete(self, name):
+        if is_blob(name):
+            return
+        super().delete(name)
+
+    def delete_blob(self, name):
+        super().delete(name)
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+_BLOB_FILENAME = re.compile(r'[0-9a-f]{64}(\.\w+)?')
+
+
+def stored_blobs(storage):
+    """Noms des blobs présents dans `storage` (sans leurs déclinaisons)."""
+    if not storage.exists(BLOB_PREFIX):
+        return
+    directories, _ = storage.listdir(BLOB_PREFIX)
+    for directory in directories:
+        for filename in storage.listdir(f'{BLOB_PREFIX}{directory}')[1]:
+            if _BLOB_FILENAME.fullmatch(filename):
+                yield f'{BLOB_PREFIX}{directory}/{filename}'
+
+
+@cache
+def exam_media_storage():
+    """Stockage des fichiers d'examen (EXAM_MEDIA_STORAGE), appelable passé aux FileField."""
+    return import_string(settings.EXAM_MEDIA_STORAGE)()
@@ -30,6 +30,7 @@ export type DashboardApiResponse = {
   nombre_incompatibles: number
   patients_risque_dossier: number
   evolution_visites: EvolutionVisites
+  refreshed_at: string
 }
 
 